@@ -0,0 +1,64 @@
+"""
+SpineRip Account Snapshot - Cached Account & Positions
+One consistent account/positions view per scan cycle instead of a REST call per decision
+"""
+
+import time
+import threading
+
+
+class AccountSnapshot:
+    """Account and positions fetched together, reused until the TTL expires or invalidate()"""
+    
+    def __init__(self, fetch_account, fetch_positions, ttl=30):
+        """fetch_account() -> dict, fetch_positions() -> list of positions (with .symbol)"""
+        self.fetch_account = fetch_account
+        self.fetch_positions = fetch_positions
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.fetched_at = None
+        self.refreshes = 0
+        self._account = None
+        self._positions = []
+        self._by_symbol = {}
+    
+    def is_stale(self):
+        """True when the snapshot has to be refetched"""
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > self.ttl
+    
+    def invalidate(self):
+        """Force a refetch on next access (call after orders fill)"""
+        with self.lock:
+            self.fetched_at = None
+    
+    def refresh(self):
+        """Fetch account and positions now"""
+        with self.lock:
+            self._account = self.fetch_account()
+            self._positions = list(self.fetch_positions())
+            self._by_symbol = {position.symbol: position for position in self._positions}
+            self.fetched_at = time.monotonic()
+            self.refreshes += 1
+    
+    def _current(self):
+        """Refresh if stale (under the lock)"""
+        if self.is_stale():
+            self.refresh()
+    
+    def account(self):
+        """Account info dict from the current snapshot"""
+        with self.lock:
+            self._current()
+            return self._account
+    
+    def positions(self):
+        """Open positions from the current snapshot"""
+        with self.lock:
+            self._current()
+            return list(self._positions)
+    
+    def position(self, symbol):
+        """Open position for a symbol, or None (O(1) lookup)"""
+        with self.lock:
+            self._current()
+            return self._by_symbol.get(symbol)
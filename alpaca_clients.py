@@ -0,0 +1,172 @@
+"""
+SpineRip Alpaca Clients - Shared Connection Pools
+One keep-alive HTTP session per credential set, shared by the bot, the AI and the tracker
+"""
+
+import os
+import threading
+import importlib.metadata
+
+
+DEFAULT_POOL_SIZE = 10  # Connections kept alive per host (covers the bot's 8 data workers)
+DEFAULT_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+
+# alpaca-py has no public hook for the HTTP session: RESTClient sends through its private _session and
+# retries on its own (_retry). Both are unchanged in every release checked (0.8.0, 0.20.0, 0.30.0, 0.40.0,
+# 0.43.5, 0.44.0); outside that range, or if the attributes change, clients keep their stock session
+SESSION_PATCH_VERSIONS = ((0, 8), (0, 44))  # inclusive (major, minor) range
+
+# Point every client at another server (e.g. alpaca_stub.AlpacaStubServer) without code changes
+TRADING_URL_ENV = 'ALPACA_TRADING_URL'
+DATA_URL_ENV = 'ALPACA_DATA_URL'
+
+
+def _alpaca_version():
+    """Installed alpaca-py version as (major, minor), or None"""
+    try:
+        return tuple(int(part) for part in importlib.metadata.version('alpaca-py').split('.')[:2])
+    except (importlib.metadata.PackageNotFoundError, ValueError):
+        return None
+
+
+def can_share_session(client):
+    """True when the client's private session and retry count have the shape the registry replaces"""
+    import requests
+    version = _alpaca_version()
+    low, high = SESSION_PATCH_VERSIONS
+    return (
+        version is not None and low <= version <= high
+        and isinstance(getattr(client, '_session', None), requests.Session)
+        and isinstance(getattr(client, '_retry', None), int)
+    )
+
+
+class ClientRegistry:
+    """Builds Alpaca REST clients once per credential set; clients of one account share a pooled session"""
+    
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5,
+                 trading_url=None, data_url=None):
+        """Pool size per host, default request timeout, retries with exponential backoff, optional base URLs"""
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.trading_url = trading_url or os.getenv(TRADING_URL_ENV)
+        self.data_url = data_url or os.getenv(DATA_URL_ENV)
+        self.sessions = {}  # (api_key, api_secret) -> requests.Session
+        self.clients = {}  # (kind, api_key, api_secret, paper) -> client
+        self.lock = threading.Lock()
+        self._warned = False
+    
+    def _new_session(self):
+        """Keep-alive session with a sized pool, a default timeout and retries on idempotent calls"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # Connection failures are retried for every method (nothing was sent); 429/5xx only for
+        # idempotent ones, since OrderExecutor already retries submissions against their client_order_id
+        retry = Retry(
+            total=self.retries, backoff_factor=self.backoff, status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS, respect_retry_after_header=True, raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        
+        request = session.request
+        timeout = self.timeout
+        
+        def request_with_timeout(method, url, **kwargs):
+            kwargs.setdefault('timeout', timeout)
+            return request(method, url, **kwargs)
+        
+        session.request = request_with_timeout
+        return session
+    
+    def session(self, api_key, api_secret):
+        """The pooled session for a credential set"""
+        key = (api_key, api_secret)
+        with self.lock:
+            if key not in self.sessions:
+                self.sessions[key] = self._new_session()
+            return self.sessions[key]
+    
+    def _client(self, kind, api_key, api_secret, paper, build):
+        """Cached client of one kind, wired to the credential set's session"""
+        key = (kind, api_key, api_secret, paper)
+        with self.lock:
+            client = self.clients.get(key)
+        if client is not None:
+            return client
+        
+        client = build()
+        if can_share_session(client):
+            client._session = self.session(api_key, api_secret)
+            client._retry = 0  # the session retries with backoff; skip alpaca-py's fixed 3 s sleeps
+        elif not self._warned:
+            self._warned = True
+            low, high = ('.'.join(map(str, version)) for version in SESSION_PATCH_VERSIONS)
+            print(f"⚠️  Shared Alpaca sessions need alpaca-py {low}-{high}: clients keep their own "
+                  f"(no shared pool, timeouts or backoff)")
+        with self.lock:
+            return self.clients.setdefault(key, client)
+    
+    def trading(self, api_key, api_secret, paper=True):
+        """Shared TradingClient"""
+        from alpaca.trading.client import TradingClient
+        return self._client('trading', api_key, api_secret, paper, lambda: TradingClient(
+            api_key, api_secret, paper=paper, url_override=self.trading_url
+        ))
+    
+    def data(self, api_key, api_secret):
+        """Shared StockHistoricalDataClient"""
+        from alpaca.data.historical import StockHistoricalDataClient
+        return self._client('data', api_key, api_secret, None, lambda: StockHistoricalDataClient(
+            api_key, api_secret, url_override=self.data_url
+        ))
+    
+    def close(self):
+        """Close every pooled connection and forget the clients"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+            self.clients.clear()
+        for session in sessions:
+            session.close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Process-wide registry (created with defaults on first use)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
+
+
+def configure(**options):
+    """Replace the process-wide registry (ClientRegistry options); existing sessions are closed"""
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, ClientRegistry(**options)
+    if previous is not None:
+        previous.close()
+    return _registry
+
+
+def trading_client(api_key, api_secret, paper=True):
+    """Shared TradingClient from the process-wide registry"""
+    return get_registry().trading(api_key, api_secret, paper)
+
+
+def data_client(api_key, api_secret):
+    """Shared StockHistoricalDataClient from the process-wide registry"""
+    return get_registry().data(api_key, api_secret)
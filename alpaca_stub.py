@@ -0,0 +1,243 @@
+"""
+SpineRip Alpaca Stub - Local HTTP Server
+Serves the Alpaca REST endpoints the bot uses from a FakeBroker, for offline tests and benchmarks
+"""
+
+import json
+import uuid
+import threading
+from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+
+from fake_broker import FakeBroker, FakeAPIError
+
+
+def _iso(value):
+    """ISO timestamp (or None)"""
+    return value.isoformat() if value is not None else None
+
+
+def _number(value):
+    """Decimal string the Alpaca API uses for prices and quantities (or None)"""
+    return str(value) if value is not None else None
+
+
+def order_json(order):
+    """FakeBroker order -> Alpaca order JSON"""
+    return {
+        'id': order.id,
+        'client_order_id': order.client_order_id,
+        'created_at': _iso(order.submitted_at),
+        'updated_at': _iso(order.filled_at or order.submitted_at),
+        'submitted_at': _iso(order.submitted_at),
+        'filled_at': _iso(order.filled_at),
+        'asset_class': 'us_equity',
+        'symbol': order.symbol,
+        'qty': order.qty,
+        'filled_qty': order.filled_qty,
+        'filled_avg_price': order.filled_avg_price,
+        'order_class': order.order_class,
+        'order_type': order.type,
+        'type': order.type,
+        'side': order.side,
+        'time_in_force': 'day',
+        'limit_price': _number(order.limit_price),
+        'stop_price': _number(order.stop_price),
+        'status': order.status,
+        'extended_hours': False,
+        'legs': [order_json(leg) for leg in order.legs] or None
+    }
+
+
+def _order_request(body):
+    """Order JSON body -> the attribute shape FakeBroker.submit_order reads"""
+    return SimpleNamespace(
+        symbol=body['symbol'],
+        qty=body['qty'],
+        side=body['side'],
+        type=body.get('type', 'market'),
+        order_class=body.get('order_class'),
+        client_order_id=body.get('client_order_id'),
+        limit_price=float(body['limit_price']) if body.get('limit_price') is not None else None,
+        take_profit=SimpleNamespace(limit_price=float(body['take_profit']['limit_price'])) if body.get('take_profit') else None,
+        stop_loss=SimpleNamespace(stop_price=float(body['stop_loss']['stop_price'])) if body.get('stop_loss') else None
+    )
+
+
+class AlpacaStubServer:
+    """Threaded keep-alive HTTP server on 127.0.0.1 answering the trading and market data APIs"""
+    
+    def __init__(self, broker=None, bars=None, port=0):
+        """Serve `broker` (default: a fresh FakeBroker) and {symbol: bar DataFrame} on `port` (0: any free port)"""
+        self.broker = broker or FakeBroker()
+        self.bars = bars or {}
+        self.requests = 0
+        self.connections = 0
+        self._failures = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+    
+    @property
+    def url(self):
+        """Base URL to hand to ClientRegistry (or the ALPACA_TRADING_URL/ALPACA_DATA_URL variables)"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def fail_next(self, count=1, status_code=503):
+        """Answer the next `count` requests with an error status before they reach the broker"""
+        with self.lock:
+            self._failures.extend([status_code] * count)
+    
+    def start(self):
+        """Serve in a background thread"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down"""
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _handler_class(self):
+        """Request handler bound to this server"""
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+            disable_nagle_algorithm = True  # small replies on a reused connection would wait on delayed ACKs
+            
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send(self, status, payload=None):
+                body = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def _dispatch(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                url = urlparse(self.path)
+                query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                
+                with stub.lock:
+                    stub.requests += 1
+                    failure = stub._failures.pop(0) if stub._failures else None
+                if failure:
+                    return self._send(failure, {'code': failure, 'message': 'simulated server error'})
+                
+                try:
+                    status, payload = stub.route(method, url.path, query, body)
+                except FakeAPIError as e:
+                    status, payload = e.status_code, {'code': e.status_code, 'message': str(e)}
+                except (KeyError, ValueError) as e:
+                    status, payload = 422, {'code': 422, 'message': f"invalid request: {e}"}
+                self._send(status, payload)
+            
+            def do_GET(self):
+                self._dispatch('GET')
+            
+            def do_POST(self):
+                self._dispatch('POST')
+            
+            def do_DELETE(self):
+                self._dispatch('DELETE')
+        
+        return Handler
+    
+    def route(self, method, path, query, body):
+        """(status, JSON payload) for one request"""
+        broker = self.broker
+        if method == 'GET' and path == '/v2/account':
+            account = broker.get_account()
+            return 200, {
+                'id': str(uuid.uuid5(uuid.NAMESPACE_URL, self.url)), 'account_number': 'STUB',
+                'status': 'ACTIVE', 'currency': 'USD', 'cash': account.cash,
+                'buying_power': account.buying_power, 'portfolio_value': account.portfolio_value,
+                'equity': account.equity, 'last_equity': account.last_equity
+            }
+        if method == 'GET' and path == '/v2/positions':
+            return 200, [{
+                'asset_id': str(uuid.uuid5(uuid.NAMESPACE_OID, p.symbol)), 'symbol': p.symbol,
+                'exchange': 'NASDAQ', 'asset_class': 'us_equity', 'qty': p.qty, 'side': p.side,
+                'avg_entry_price': p.avg_entry_price, 'current_price': p.current_price,
+                'market_value': p.market_value, 'cost_basis': p.cost_basis,
+                'unrealized_pl': p.unrealized_pl, 'unrealized_plpc': p.unrealized_plpc
+            } for p in broker.get_all_positions()]
+        if method == 'GET' and path == '/v2/account/portfolio/history':
+            return 200, self._portfolio_history(query)
+        if method == 'POST' and path == '/v2/orders':
+            return 200, order_json(broker.submit_order(_order_request(body)))
+        if method == 'GET' and path == '/v2/orders:by_client_order_id':
+            return 200, order_json(broker.get_order_by_client_id(query['client_order_id']))
+        if method == 'GET' and path == '/v2/orders':
+            symbols = query.get('symbols')
+            request = SimpleNamespace(symbols=symbols.split(',') if symbols else None)
+            return 200, [order_json(order) for order in broker.get_orders(request)]
+        if path.startswith('/v2/orders/'):
+            order_id = path.rsplit('/', 1)[1]
+            if method == 'DELETE':
+                broker.cancel_order_by_id(order_id)
+                return 204, None
+            return 200, order_json(broker.get_order_by_id(order_id))
+        if method == 'GET' and path == '/v2/assets':
+            return 200, [{
+                'id': str(uuid.uuid5(uuid.NAMESPACE_OID, symbol)), 'class': 'us_equity', 'exchange': 'NASDAQ',
+                'symbol': symbol, 'status': 'active', 'tradable': True, 'marginable': True,
+                'shortable': True, 'easy_to_borrow': True, 'fractionable': True
+            } for symbol in sorted(self.bars)]
+        if method == 'GET' and path == '/v2/stocks/bars':
+            return 200, self._bars(query)
+        return 404, {'code': 404, 'message': f"no stub route for {method} {path}"}
+    
+    def _portfolio_history(self, query):
+        """Daily points at the broker's current equity"""
+        days = int(query.get('period', '30D').rstrip('DWMA') or 30)
+        equity = float(self.broker.get_account().equity)
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        timestamps = [int((today - timedelta(days=days - 1 - i)).timestamp()) for i in range(days)]
+        return {
+            'timestamp': timestamps, 'equity': [equity] * days, 'profit_loss': [0.0] * days,
+            'profit_loss_pct': [0.0] * days, 'base_value': equity, 'timeframe': query.get('timeframe', '1D')
+        }
+    
+    def _bars(self, query):
+        """Minute bars from the configured frames, filtered to [start, end] (one page)"""
+        import pandas as pd
+        start = pd.Timestamp(query['start']) if 'start' in query else None
+        end = pd.Timestamp(query['end']) if 'end' in query else None
+        bars = {}
+        for symbol in query.get('symbols', '').split(','):
+            df = self.bars.get(symbol)
+            if df is None:
+                continue
+            rows = df
+            if start is not None:
+                rows = rows[pd.DatetimeIndex(rows['timestamp']) >= start]
+            if end is not None:
+                rows = rows[pd.DatetimeIndex(rows['timestamp']) <= end]
+            bars[symbol] = [{
+                't': ts.isoformat(), 'o': float(o), 'h': float(h), 'l': float(l), 'c': float(c),
+                'v': float(v), 'n': 0, 'vw': float(c)
+            } for ts, o, h, l, c, v in zip(pd.DatetimeIndex(rows['timestamp']), rows['open'], rows['high'],
+                                            rows['low'], rows['close'], rows['volume'])]
+        return {'bars': bars, 'next_page_token': None}
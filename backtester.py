@@ -0,0 +1,264 @@
+"""
+SpineRip Backtester - Historical Strategy Replay
+Replays cached minute bars through the AI signal rules and bot risk settings
+"""
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from trading_ai import compute_technicals, score_signals
+from strategy_engine import DEFAULT_STRATEGY, get_strategy
+
+
+def _prepare_frame(df, strategy=DEFAULT_STRATEGY):
+    """Indicators, confidence and time keys for one symbol's bars"""
+    if 'rsi' not in df.columns:
+        df = compute_technicals(df.copy(), columns=get_strategy(strategy).indicator_columns)
+    
+    timestamps = pd.DatetimeIndex(df['timestamp']).as_unit('ns')
+    local = timestamps.tz_convert('America/New_York') if timestamps.tz is not None else timestamps
+    
+    return {
+        'timestamp': timestamps.asi8,
+        'day': local.normalize().asi8,
+        'close': df['close'].to_numpy(dtype=float),
+        'confidence': score_signals(df, strategy)['confidence']
+    }
+
+
+class Backtester:
+    """Vectorized backtest of SpineRipBot's trading rules"""
+    
+    def __init__(self, confidence_threshold=30, position_size_percent=10, stop_loss_percent=2,
+                 take_profit_percent=4, max_trades_per_day=10, starting_cash=10000.00,
+                 strategy=DEFAULT_STRATEGY):
+        """Initialize with the same parameters SpineRipBot trades with"""
+        self.confidence_threshold = confidence_threshold
+        self.position_size_percent = position_size_percent
+        self.stop_loss_percent = stop_loss_percent
+        self.take_profit_percent = take_profit_percent
+        self.max_trades_per_day = max_trades_per_day
+        self.starting_cash = starting_cash
+        self.strategy = strategy
+    
+    @classmethod
+    def from_bot(cls, bot, starting_cash=10000.00):
+        """Backtest with a bot's current settings"""
+        return cls(
+            confidence_threshold=bot.confidence_threshold,
+            position_size_percent=bot.position_size_percent,
+            stop_loss_percent=bot.stop_loss_percent,
+            take_profit_percent=bot.take_profit_percent,
+            max_trades_per_day=bot.max_trades_per_day,
+            starting_cash=starting_cash,
+            strategy=bot.strategy
+        )
+    
+    def prepare(self, frames, workers=1):
+        """Compute indicators and confidence for every symbol"""
+        symbols = list(frames)
+        if workers > 1 and len(symbols) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                prepared = list(pool.map(_prepare_frame, [frames[s] for s in symbols], [self.strategy] * len(symbols)))
+        else:
+            prepared = [_prepare_frame(frames[s], self.strategy) for s in symbols]
+        return dict(zip(symbols, prepared))
+    
+    def _find_exit(self, data, entry, entry_price):
+        """First bar after entry that hits stop loss, take profit or a sell signal"""
+        close = data['close']
+        confidence = data['confidence']
+        stop_price = entry_price * (1 - self.stop_loss_percent / 100)
+        target_price = entry_price * (1 + self.take_profit_percent / 100)
+        
+        # Scan forward in growing chunks so long holds stay vectorized
+        start = entry + 1
+        size = 256
+        while start < len(close):
+            end = min(len(close), start + size)
+            hit = (
+                (close[start:end] <= stop_price) |
+                (close[start:end] >= target_price) |
+                (confidence[start:end] <= -self.confidence_threshold)
+            )
+            if hit.any():
+                index = start + int(np.argmax(hit))
+                if close[index] <= stop_price:
+                    return index, 'stop_loss'
+                if close[index] >= target_price:
+                    return index, 'take_profit'
+                return index, 'sell_signal'
+            start = end
+            size *= 4
+        
+        return None, 'open'
+    
+    def _next_entry(self, data, after):
+        """Index of the first buy signal at or after `after`"""
+        entries = data['entries']
+        position = np.searchsorted(entries, after)
+        return int(entries[position]) if position < len(entries) else None
+    
+    def _push_entry(self, events, symbol, data, after):
+        """Schedule a symbol's next buy signal"""
+        index = self._next_entry(data, after)
+        if index is not None:
+            heapq.heappush(events, (int(data['timestamp'][index]), 1, symbol, index))
+    
+    def run(self, frames, workers=1):
+        """Run the backtest over {symbol: bars DataFrame}"""
+        return self.simulate(self.prepare(frames, workers=workers))
+    
+    def simulate(self, prepared, trades=True):
+        """Replay prepared symbols ({symbol: prepare() arrays}) with these settings (trades=False: statistics only)"""
+        # Settings only pick entries and exits, so prepared arrays can be shared across runs
+        prepared = {
+            symbol: dict(data, entries=np.flatnonzero(data['confidence'] >= self.confidence_threshold))
+            for symbol, data in prepared.items()
+        }
+        
+        # Events are (timestamp, kind, symbol, index); exits (kind 0) sort before entries
+        events = []
+        for symbol, data in prepared.items():
+            self._push_entry(events, symbol, data, 0)
+        
+        cash = self.starting_cash
+        trades_per_day = {}
+        open_trades = {}
+        closed = []
+        
+        while events:
+            timestamp, kind, symbol, index = heapq.heappop(events)
+            data = prepared[symbol]
+            
+            if kind == 0:
+                # Exit: sell the whole position at the bar's close
+                trade = open_trades.pop(symbol)
+                exit_price = float(data['close'][index])
+                cash += trade['shares'] * exit_price
+                trade['exit_time'] = timestamp
+                trade['exit_price'] = exit_price
+                closed.append(trade)
+                self._push_entry(events, symbol, data, index)
+                continue
+            
+            day = int(data['day'][index])
+            if trades_per_day.get(day, 0) >= self.max_trades_per_day:
+                # Daily cap reached: skip to the symbol's first signal on a later day
+                later = np.searchsorted(data['day'][data['entries']], day, side='right')
+                if later < len(data['entries']):
+                    self._push_entry(events, symbol, data, int(data['entries'][later]))
+                continue
+            
+            price = float(data['close'][index])
+            position_value = cash * (self.position_size_percent / 100)
+            shares = max(int(position_value / price), 1)
+            if shares * price > cash:
+                # Not even one share is affordable: no margin, so wait for the symbol's next signal
+                self._push_entry(events, symbol, data, index + 1)
+                continue
+            cash -= shares * price
+            trades_per_day[day] = trades_per_day.get(day, 0) + 1
+            
+            trade = {
+                'symbol': symbol,
+                'entry_time': timestamp,
+                'shares': shares,
+                'entry_price': price,
+                'exit_reason': 'open'
+            }
+            open_trades[symbol] = trade
+            
+            exit_index, reason = self._find_exit(data, index, price)
+            trade['exit_reason'] = reason
+            if exit_index is not None:
+                heapq.heappush(events, (int(data['timestamp'][exit_index]), 0, symbol, exit_index))
+        
+        # Mark positions still open at the end of the data
+        for symbol, trade in open_trades.items():
+            data = prepared[symbol]
+            trade['exit_time'] = int(data['timestamp'][-1])
+            trade['exit_price'] = float(data['close'][-1])
+            cash += trade['shares'] * trade['exit_price']
+            closed.append(trade)
+        
+        return self._summarize(closed, cash, trades=trades)
+    
+    def run_cached(self, symbols, bar_cache, days=365, workers=1):
+        """Backtest symbols straight from the local bar cache"""
+        start = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=days)
+        frames = {symbol: bar_cache.load(symbol, start=start) for symbol in symbols}
+        frames = {symbol: df for symbol, df in frames.items() if len(df) > 0}
+        return self.run(frames, workers=workers)
+    
+    def _summarize(self, closed, final_cash, trades=True):
+        """Performance statistics, plus the trade list as a DataFrame when `trades`"""
+        closed = sorted(closed, key=lambda trade: trade['exit_time'])
+        shares = np.array([trade['shares'] for trade in closed], dtype=float)
+        entry_price = np.array([trade['entry_price'] for trade in closed], dtype=float)
+        exit_price = np.array([trade['exit_price'] for trade in closed], dtype=float)
+        pnl = (exit_price - entry_price) * shares
+        
+        # Drawdown on the realized equity curve
+        equity = self.starting_cash + np.cumsum(pnl)
+        peaks = np.maximum.accumulate(np.concatenate([[self.starting_cash], equity]))[1:]
+        drawdown = ((equity - peaks) / peaks * 100).min() if len(equity) else 0.0
+        
+        total_trades = len(closed)
+        winning = int((pnl > 0).sum())
+        losing = int((pnl < 0).sum())
+        
+        result = {
+            'total_trades': total_trades,
+            'winning_trades': winning,
+            'losing_trades': losing,
+            'win_rate': (winning / total_trades * 100) if total_trades > 0 else 0,
+            'total_pnl': float(pnl.sum()),
+            'final_cash': final_cash,
+            'return_pct': (final_cash / self.starting_cash - 1) * 100,
+            'max_drawdown_pct': float(drawdown)
+        }
+        if not trades:
+            return result
+        
+        columns = ['symbol', 'entry_time', 'exit_time', 'shares', 'entry_price', 'exit_price', 'exit_reason']
+        trades_df = pd.DataFrame(closed, columns=columns)
+        trades_df['entry_time'] = pd.to_datetime(trades_df['entry_time'].astype('int64'), utc=True)
+        trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'].astype('int64'), utc=True)
+        trades_df['pnl'] = pnl
+        trades_df['pnl_percent'] = (trades_df['exit_price'] / trades_df['entry_price'] - 1) * 100
+        return {'trades': trades_df, **result}
+
+
+def demo():
+    """Demo the backtester on generated data"""
+    import time
+    from trading_ai import SpineRipAI
+    
+    print("\n" + "="*60)
+    print("⏪ SPINERIP BACKTESTER")
+    print("="*60 + "\n")
+    
+    ai = SpineRipAI()
+    watchlist = ai.get_watchlist()['High Volume']
+    frames = {symbol: ai.get_market_data(symbol, days=30) for symbol in watchlist}
+    
+    backtester = Backtester(confidence_threshold=15)
+    started = time.perf_counter()
+    result = backtester.run(frames)
+    elapsed = time.perf_counter() - started
+    
+    bars = sum(len(df) for df in frames.values())
+    print(f"\n📊 Replayed {bars:,} bars across {len(frames)} symbols in {elapsed:.2f}s")
+    print(f"🔁 Trades: {result['total_trades']} ({result['winning_trades']} 🟢 / {result['losing_trades']} 🔴)")
+    print(f"🎯 Win Rate: {result['win_rate']:.1f}%")
+    print(f"💰 Total P&L: ${result['total_pnl']:+,.2f} ({result['return_pct']:+.2f}%)")
+    print(f"📉 Max Drawdown: {result['max_drawdown_pct']:.2f}%")
+    print("\n" + "="*60 + "\n")
+
+
+if __name__ == "__main__":
+    demo()
@@ -0,0 +1,202 @@
+"""
+SpineRip Bar Buffer - Fixed-Memory Bar Store
+Array-backed per-symbol ring buffers for OHLCV bars and their indicator values
+"""
+
+import threading
+
+import numpy as np
+
+from indicator_engine import INDICATOR_COLUMNS
+
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+RING_FIELDS = PRICE_FIELDS + INDICATOR_COLUMNS
+
+
+def ring_dtype(value_dtype=np.float32):
+    """Record layout: int64 nanosecond timestamp plus one value per field"""
+    return np.dtype([('timestamp', 'i8')] + [(field, value_dtype) for field in RING_FIELDS])
+
+
+class BarRing:
+    """Most recent `capacity` bars for one symbol in a single preallocated array"""
+    
+    def __init__(self, capacity=30 * 390, value_dtype=np.float32, slack=None):
+        """Allocate capacity plus slack rows (slack keeps the window contiguous)"""
+        self.capacity = capacity
+        self.slack = slack or max(capacity // 4, 1)
+        self.records = np.empty(capacity + self.slack, dtype=ring_dtype(value_dtype))
+        self.start = 0
+        self.end = 0
+        self.pending = 0  # newest rows that don't have indicator values yet
+        self.indicator_state = None  # IndicatorState continuing the last analyzed row
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return self.end - self.start
+    
+    @property
+    def nbytes(self):
+        """Memory held by this buffer (fixed at construction)"""
+        return self.records.nbytes
+    
+    def last_timestamp(self):
+        """Nanosecond timestamp of the newest bar, or None"""
+        return int(self.records['timestamp'][self.end - 1]) if self.end > self.start else None
+    
+    def _make_room(self, rows):
+        """Slide the newest bars to the front once the slack is used up"""
+        if self.end + rows <= len(self.records):
+            return
+        
+        keep = min(len(self), self.capacity - rows)
+        self.records[:keep] = self.records[self.end - keep:self.end]
+        self.start = 0
+        self.end = keep
+        self.pending = min(self.pending, keep)
+    
+    def _trim(self):
+        """Drop bars older than the capacity window"""
+        if len(self) > self.capacity:
+            self.start = self.end - self.capacity
+            self.pending = min(self.pending, self.capacity)
+    
+    def append(self, timestamp, open_, high, low, close, volume):
+        """Add one bar; returns False if it isn't newer than the last one"""
+        last = self.last_timestamp()
+        if last is not None and timestamp <= last:
+            return False
+        
+        self._make_room(1)
+        row = self.records[self.end]
+        row['timestamp'] = timestamp
+        row['open'] = open_
+        row['high'] = high
+        row['low'] = low
+        row['close'] = close
+        row['volume'] = volume
+        for field in INDICATOR_COLUMNS:
+            row[field] = np.nan
+        
+        self.end += 1
+        self.pending += 1
+        self._trim()
+        return True
+    
+    def append_bar(self, bar):
+        """Add a streamed alpaca-py Bar (or anything with the same attributes)"""
+        import pandas as pd
+        return self.append(
+            pd.Timestamp(bar.timestamp).value,
+            bar.open, bar.high, bar.low, bar.close, bar.volume
+        )
+    
+    def extend(self, df):
+        """Bulk-add the bars of a frame that are newer than the buffer"""
+        import pandas as pd
+        timestamps = pd.DatetimeIndex(df['timestamp']).as_unit('ns').asi8
+        last = self.last_timestamp()
+        first = 0 if last is None else int(np.searchsorted(timestamps, last, side='right'))
+        first = max(first, len(timestamps) - self.capacity)
+        rows = len(timestamps) - first
+        if rows <= 0:
+            return 0
+        
+        self._make_room(rows)
+        block = self.records[self.end:self.end + rows]
+        block['timestamp'] = timestamps[first:]
+        
+        # Frames already run through analyze_technicals bring their indicators along
+        analyzed = all(field in df.columns for field in INDICATOR_COLUMNS)
+        for field in RING_FIELDS:
+            if field in df.columns:
+                block[field] = df[field].to_numpy(dtype=float)[first:]
+            else:
+                block[field] = np.nan
+        
+        self.end += rows
+        self.pending = 0 if analyzed and self.pending == 0 else self.pending + rows
+        self._trim()
+        return rows
+    
+    def append_many(self, timestamps, open_, high, low, close, volume):
+        """Bulk-add bars from arrays (those not newer than the buffer are skipped); returns rows added"""
+        last = self.last_timestamp()
+        first = 0 if last is None else int(np.searchsorted(timestamps, last, side='right'))
+        first = max(first, len(timestamps) - self.capacity)
+        rows = len(timestamps) - first
+        if rows <= 0:
+            return 0
+        
+        self._make_room(rows)
+        block = self.records[self.end:self.end + rows]
+        block['timestamp'] = timestamps[first:]
+        for field, values in zip(PRICE_FIELDS, (open_, high, low, close, volume)):
+            block[field] = values[first:]
+        for field in INDICATOR_COLUMNS:
+            block[field] = np.nan
+        
+        self.end += rows
+        self.pending += rows
+        self._trim()
+        return rows
+    
+    def view(self, bars=None):
+        """Zero-copy view of the newest bars (all buffered bars by default)"""
+        start = self.start if bars is None else max(self.start, self.end - bars)
+        return self.records[start:self.end]
+    
+    def column(self, field):
+        """Zero-copy view of one field across the buffered bars"""
+        return self.records[field][self.start:self.end]
+    
+    def latest(self):
+        """Newest bar as a record (fields read like a DataFrame row)"""
+        return self.records[self.end - 1]
+    
+    def to_frame(self):
+        """Copy the buffered bars into a DataFrame (for pandas-based consumers)"""
+        import pandas as pd
+        window = self.view()
+        df = pd.DataFrame({field: window[field].astype(float) for field in RING_FIELDS})
+        df.insert(0, 'timestamp', pd.to_datetime(window['timestamp'], unit='ns', utc=True))
+        return df
+
+
+class BarStore:
+    """Symbol -> BarRing map with a fixed per-symbol footprint"""
+    
+    def __init__(self, capacity=30 * 390, value_dtype=np.float32):
+        """Every symbol gets a ring of the same capacity and value type"""
+        self.capacity = capacity
+        self.value_dtype = value_dtype
+        self.rings = {}
+        self.lock = threading.Lock()
+    
+    def __contains__(self, symbol):
+        return symbol in self.rings
+    
+    def __len__(self):
+        return len(self.rings)
+    
+    def get(self, symbol):
+        """Ring for a symbol, allocated on first use"""
+        ring = self.rings.get(symbol)
+        if ring is None:
+            with self.lock:
+                ring = self.rings.setdefault(symbol, BarRing(self.capacity, self.value_dtype))
+        return ring
+    
+    def drop(self, symbol):
+        """Release a symbol's buffer"""
+        self.rings.pop(symbol, None)
+    
+    @property
+    def nbytes(self):
+        """Total memory held by all buffers"""
+        return sum(ring.nbytes for ring in self.rings.values())
+    
+    def bytes_per_symbol(self):
+        """Memory one more watched symbol will cost"""
+        return (self.capacity + max(self.capacity // 4, 1)) * ring_dtype(self.value_dtype).itemsize
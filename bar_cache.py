@@ -0,0 +1,317 @@
+"""
+SpineRip Bar Cache - Local Minute Bar Store
+Persists fetched bars on disk and only requests bars newer than the cache
+"""
+
+import os
+import json
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+# One structured record per minute bar, stored as <symbol>/<YYYY-MM-DD>.npy
+BAR_DTYPE = np.dtype([
+    ('timestamp', 'i8'),  # nanoseconds since epoch, UTC
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+    ('trade_count', 'f8'),
+    ('vwap', 'f8')
+])
+
+BAR_FIELDS = [name for name in BAR_DTYPE.names if name != 'timestamp']
+
+# Exchange calendar shared by the screener, the tracker and the synthetic sessions
+BARS_PER_DAY = 390  # 9:30 AM - 4:00 PM ET
+EXTENDED_BARS_PER_DAY = 960  # 4:00 AM - 8:00 PM ET, Alpaca minute bars include extended hours
+NS_PER_MINUTE = 60_000_000_000
+EXCHANGE_TZ = ZoneInfo('America/New_York')
+
+
+def session_bounds(first, last):
+    """UTC epoch-ns [open, close) of each New York weekday session between two epoch-ns instants, oldest first"""
+    # No holiday calendar: a holiday is a session without bars
+    day = datetime.fromtimestamp(first / 1e9, EXCHANGE_TZ).date()
+    end = datetime.fromtimestamp(last / 1e9, EXCHANGE_TZ).date()
+    bounds = []
+    while day <= end:
+        if day.weekday() < 5:
+            open_ = int(datetime(day.year, day.month, day.day, 9, 30, tzinfo=EXCHANGE_TZ).timestamp()) * 1_000_000_000
+            bounds.append((open_, open_ + BARS_PER_DAY * NS_PER_MINUTE))
+        day += timedelta(days=1)
+    return np.array(bounds, dtype=np.int64).reshape(-1, 2)
+
+
+def minute_bars_request(symbols, start):
+    """Alpaca minute bars request (alpaca-py is only imported once bars are actually fetched)"""
+    from alpaca.data.requests import StockBarsRequest
+    from alpaca.data.timeframe import TimeFrame
+    return StockBarsRequest(symbol_or_symbols=symbols, timeframe=TimeFrame.Minute, start=start)
+
+
+def split_bars(df):
+    """Split a multi-symbol Alpaca bars frame into per-symbol frames without copying"""
+    import pandas as pd
+    if df is None or len(df) == 0:
+        return {}
+    
+    if isinstance(df.index, pd.MultiIndex):
+        symbols = df.index.get_level_values('symbol').to_numpy()
+    else:
+        symbols = df['symbol'].to_numpy()
+    
+    # Alpaca returns each symbol as one contiguous block, so slice by position
+    bounds = np.flatnonzero(symbols[1:] != symbols[:-1]) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [len(df)]])
+    
+    if len(starts) != len(set(symbols[starts])):
+        # Interleaved rows: fall back to a grouped split
+        flat = df.reset_index() if isinstance(df.index, pd.MultiIndex) else df
+        return {symbol: frame.reset_index(drop=True) for symbol, frame in flat.groupby('symbol', sort=False)}
+    
+    frames = {}
+    for begin, end in zip(starts, ends):
+        frame = df.iloc[begin:end]
+        frames[symbols[begin]] = frame.reset_index() if isinstance(df.index, pd.MultiIndex) else frame
+    return frames
+
+
+def to_records(df):
+    """Convert an Alpaca bars frame (indexed or flat) to BAR_DTYPE records"""
+    import pandas as pd
+    if 'timestamp' not in df.columns:
+        df = df.reset_index()
+    
+    timestamps = pd.to_datetime(df['timestamp'], utc=True)
+    records = np.empty(len(df), dtype=BAR_DTYPE)
+    records['timestamp'] = pd.DatetimeIndex(timestamps).as_unit('ns').asi8
+    
+    for field in BAR_FIELDS:
+        if field in df.columns:
+            records[field] = df[field].to_numpy(dtype=float)
+        else:
+            records[field] = np.nan
+    
+    return records
+
+
+class BarCache:
+    """On-disk, per-symbol/per-day minute bar store with delta fetch"""
+    
+    def __init__(self, cache_dir=None, keep_days=365):
+        """Initialize cache directory (defaults to .bar_cache next to this file)"""
+        # keep_days: sync() prunes day files older than this (or the synced window, if longer),
+        # so backtests over cached history keep a year by default
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(__file__), '.bar_cache')
+        self.keep_days = keep_days
+        self._pruned = {}  # symbol -> UTC date of its last prune
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _symbol_dir(self, symbol):
+        """Directory holding one symbol's day files"""
+        return os.path.join(self.cache_dir, symbol.upper())
+    
+    def _day_files(self, symbol):
+        """Sorted list of (day, path) for a symbol"""
+        folder = self._symbol_dir(symbol)
+        if not os.path.isdir(folder):
+            return []
+        
+        return [
+            (name[:-4], os.path.join(folder, name))
+            for name in sorted(os.listdir(folder))
+            if name.endswith('.npy')
+        ]
+    
+    def _load_meta(self, symbol):
+        """Load fetch coverage metadata for a symbol"""
+        path = os.path.join(self._symbol_dir(symbol), 'meta.json')
+        if not os.path.exists(path):
+            return {}
+        
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_meta(self, symbol, meta):
+        """Save fetch coverage metadata for a symbol"""
+        path = os.path.join(self._symbol_dir(symbol), 'meta.json')
+        with open(path, 'w') as f:
+            json.dump(meta, f, indent=2)
+    
+    def last_timestamp(self, symbol):
+        """Timestamp of the newest cached bar (UTC), or None"""
+        import pandas as pd
+        files = self._day_files(symbol)
+        if not files:
+            return None
+        
+        records = np.load(files[-1][1], mmap_mode='r')
+        if len(records) == 0:
+            return None
+        return pd.Timestamp(int(records['timestamp'][-1]), unit='ns', tz='UTC')
+    
+    def append(self, symbol, df):
+        """Merge new bars into the day files (newer rows win on duplicates)"""
+        if df is None or len(df) == 0:
+            return 0
+        
+        records = to_records(df)
+        folder = self._symbol_dir(symbol)
+        os.makedirs(folder, exist_ok=True)
+        
+        days = (records['timestamp'] // 86_400_000_000_000).astype('datetime64[D]')
+        for day in np.unique(days):
+            chunk = records[days == day]
+            path = os.path.join(folder, f"{day}.npy")
+            
+            if os.path.exists(path):
+                chunk = np.concatenate([chunk, np.load(path)])
+            
+            # Keep the first occurrence (the new bar) of each timestamp, sorted
+            _, first = np.unique(chunk['timestamp'], return_index=True)
+            chunk = chunk[first]
+            
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, chunk)
+            os.replace(tmp_path, path)
+        
+        return len(records)
+    
+    def load_records(self, symbol, start=None):
+        """Load cached bars (optionally from start) as BAR_DTYPE records"""
+        start_ns = start_day = None
+        if start is not None:
+            import pandas as pd
+            start = pd.Timestamp(start)
+            start = start.tz_localize('UTC') if start.tz is None else start.tz_convert('UTC')
+            start_ns = start.value
+            start_day = str(start.date())
+        
+        chunks = []
+        for day, path in self._day_files(symbol):
+            if start_day is not None and day < start_day:
+                continue
+            chunks.append(np.load(path, mmap_mode='r'))
+        
+        records = np.concatenate(chunks) if chunks else np.empty(0, dtype=BAR_DTYPE)
+        if start_ns is not None:
+            records = records[records['timestamp'] >= start_ns]
+        return records
+    
+    def load(self, symbol, start=None):
+        """Load cached bars (optionally from start) as a DataFrame"""
+        import pandas as pd
+        records = self.load_records(symbol, start=start)
+        df = pd.DataFrame({field: records[field] for field in BAR_FIELDS})
+        df.insert(0, 'timestamp', pd.to_datetime(records['timestamp'], unit='ns', utc=True))
+        df.insert(0, 'symbol', symbol)
+        return df
+    
+    def get_bars(self, data_client, symbol, days=30, now=None):
+        """Return `days` of minute bars, fetching only what the cache is missing"""
+        return self.get_bars_many(data_client, [symbol], days=days, now=now)[symbol]
+    
+    def get_bars_many(self, data_client, symbols, days=30, now=None, chunk_size=100):
+        """Return `days` of minute bars per symbol using batched delta requests"""
+        start = self.sync(data_client, symbols, days=days, now=now, chunk_size=chunk_size)
+        return {symbol: self.load(symbol, start=start) for symbol in symbols}
+    
+    def get_records_many(self, data_client, symbols, days=30, now=None, chunk_size=100):
+        """get_bars_many as BAR_DTYPE records (no DataFrame per symbol; for screening thousands)"""
+        start = self.sync(data_client, symbols, days=days, now=now, chunk_size=chunk_size)
+        return {symbol: self.load_records(symbol, start=start) for symbol in symbols}
+    
+    def sync(self, data_client, symbols, days=30, now=None, chunk_size=100):
+        """Fetch whatever the cache is missing for the last `days`; returns the window start"""
+        import pandas as pd
+        now = now or datetime.now(timezone.utc)
+        start = now - timedelta(days=days)
+        start_ns = pd.Timestamp(start).value
+        
+        # Work out where each symbol's fetch has to start
+        plan = []
+        uncovered = []
+        for symbol in symbols:
+            meta = self._load_meta(symbol)
+            last = self.last_timestamp(symbol)
+            covered = meta.get('covered_from') is not None and meta['covered_from'] <= start_ns
+            
+            # Delta fetch when the cache already covers the window, full fetch otherwise
+            # (symbols without bars resume from where the last empty fetch ended)
+            if covered and last is not None:
+                fetch_start = last.to_pydatetime() + timedelta(minutes=1)
+            elif covered and meta.get('fetched_to') is not None:
+                fetch_start = pd.Timestamp(meta['fetched_to'], unit='ns', tz='UTC').to_pydatetime()
+            else:
+                fetch_start = start
+            
+            if not covered:
+                uncovered.append((symbol, meta))
+            if fetch_start <= now:
+                plan.append((fetch_start, symbol))
+        
+        # Full and delta fetches are batched separately so a cold symbol
+        # doesn't drag warm ones back to the start of the window
+        plan.sort()
+        full = [item for item in plan if item[0] == start]
+        delta = [item for item in plan if item[0] != start]
+        received = set()
+        for group in (full, delta):
+            for i in range(0, len(group), chunk_size):
+                chunk = group[i:i + chunk_size]
+                request = minute_bars_request([symbol for _, symbol in chunk], chunk[0][0])
+                bars = data_client.get_stock_bars(request)
+                for symbol, frame in split_bars(bars.df).items():
+                    if self.append(symbol, frame):
+                        received.add(symbol)
+        
+        # Coverage is recorded even when a symbol returned nothing, so it isn't refetched in full
+        metas = dict(uncovered)
+        for meta in metas.values():
+            meta['covered_from'] = start_ns
+        now_ns = pd.Timestamp(now).value
+        for _, symbol in plan:
+            if symbol not in received and self.last_timestamp(symbol) is None:
+                metas.setdefault(symbol, self._load_meta(symbol))['fetched_to'] = now_ns
+        for symbol, meta in metas.items():
+            os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+            self._save_meta(symbol, meta)
+        
+        # Drop day files past the retention window (once per symbol per day)
+        today = now.date()
+        for symbol in symbols:
+            if self._pruned.get(symbol) != today:
+                self.prune(symbol, keep_days=max(self.keep_days, days), now=now)
+                self._pruned[symbol] = today
+        
+        return start
+    
+    def prune(self, symbol, keep_days=30, now=None):
+        """Delete day files older than keep_days"""
+        import pandas as pd
+        cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=keep_days)).date()
+        removed = 0
+        
+        for day, path in self._day_files(symbol):
+            if day < str(cutoff):
+                os.remove(path)
+                removed += 1
+        
+        # The cache no longer covers the pruned days, so a longer window refetches them
+        if removed:
+            meta = self._load_meta(symbol)
+            cutoff_ns = pd.Timestamp(cutoff, tz='UTC').value
+            if meta.get('covered_from') is not None and meta['covered_from'] < cutoff_ns:
+                meta['covered_from'] = cutoff_ns
+                self._save_meta(symbol, meta)
+        
+        return removed
@@ -0,0 +1,196 @@
+"""
+SpineRip Bar Stream - Event-Driven Market Data
+Pushes live bars into per-symbol buffers and analyzes only the symbol that changed
+"""
+
+import time
+import queue
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+
+from bar_buffer import BarStore
+
+
+BAR_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap']
+
+
+class ReplayStream:
+    """Local stand-in for StockDataStream that replays recorded bars"""
+    
+    def __init__(self, frames, speed=0.0):
+        """Replay {symbol: DataFrame}, sleeping `speed` seconds between bars"""
+        self.frames = frames
+        self.speed = speed
+        self.handler = None
+        self.symbols = set()
+        self.running = False
+    
+    def subscribe_bars(self, handler, *symbols):
+        """Register the async bar handler for symbols"""
+        self.handler = handler
+        self.symbols.update(symbols)
+    
+    def run(self):
+        """Replay every bar in timestamp order (blocks until done or stopped)"""
+        self.running = True
+        asyncio.run(self._replay())
+        self.running = False
+    
+    def stop(self):
+        """Stop the replay after the current bar"""
+        self.running = False
+    
+    async def _replay(self):
+        """Feed bars to the handler in timestamp order"""
+        frames = [
+            df.reindex(columns=BAR_COLUMNS).assign(symbol=symbol)
+            for symbol, df in self.frames.items()
+            if symbol in self.symbols
+        ]
+        if not frames:
+            return
+        
+        bars = pd.concat(frames, ignore_index=True).sort_values('timestamp', kind='stable')
+        for row in bars.itertuples(index=False):
+            if not self.running:
+                break
+            await self.handler(SimpleNamespace(**row._asdict()))
+            if self.speed:
+                await asyncio.sleep(self.speed)
+
+
+class BarStreamer:
+    """Event-driven scanner: analyze a symbol as soon as a new bar arrives"""
+    
+    def __init__(self, bot, symbols, stream, history_days=30, position_check_interval=60, coalesce=True):
+        """Initialize with a SpineRipBot, its watchlist and a bar stream"""
+        # coalesce: bars arriving while a symbol waits are folded into one decision (live: keeps up
+        # with the feed); False analyzes every bar in the handler, pausing the stream (replays)
+        self.bot = bot
+        self.symbols = list(symbols)
+        self.stream = stream
+        self.history_days = history_days
+        self.position_check_interval = position_check_interval
+        self.store = BarStore(capacity=history_days * 390)
+        for symbol in self.symbols:
+            self.store.get(symbol)
+        
+        self.coalesce = coalesce
+        self.pending = queue.Queue()  # symbols to analyze, and bars for the simulated broker
+        self.queued = {}  # symbol -> arrival time of the oldest unprocessed bar
+        self.lock = threading.Lock()
+        self.running = False
+        self.decisions = 0
+        self.total_latency = 0.0
+        self.last_position_check = time.monotonic()
+    
+    def seed_history(self):
+        """Fill buffers with recent history so the first bar can be analyzed"""
+        frames = self.bot.ai.get_market_data_many(self.symbols, days=self.history_days)
+        for symbol, df in frames.items():
+            if symbol in self.store:
+                ring = self.store.get(symbol)
+                with ring.lock:
+                    ring.extend(df)
+    
+    async def on_bar(self, bar):
+        """Stream handler: buffer the bar and queue its symbol (coalescing repeats)"""
+        if bar.symbol not in self.store:
+            return
+        ring = self.store.get(bar.symbol)
+        with ring.lock:
+            if not ring.append_bar(bar):
+                return
+        
+        if not self.coalesce:
+            if self.bot.broker is not None:
+                self.bot.broker.on_bar(bar)  # demo orders fill against the stream
+            self._decide(bar.symbol, time.perf_counter())
+            return
+        
+        # Demo fills are reported from the worker, in order with its decisions
+        if self.bot.broker is not None:
+            self.pending.put(bar)
+        with self.lock:
+            if bar.symbol in self.queued:
+                return
+            self.queued[bar.symbol] = time.perf_counter()
+        self.pending.put(bar.symbol)
+    
+    def analyze(self, symbol):
+        """Indicators for the symbol's new bars (in place) and its signal"""
+        ring = self.store.get(symbol)
+        timer = self.bot.instrumentation.timer
+        with ring.lock:
+            with timer('indicators', symbol):
+                bars = self.bot.ai.indicator_engine.update_ring(ring)
+            with timer('signal', symbol):
+                signal = self.bot.ai.generate_signal(bars, strategy=self.bot.strategy)
+            if self.bot.multi_timeframe:
+                with timer('timeframes', symbol):
+                    self.bot.confirm_signal(symbol, bars, signal)
+            return signal
+    
+    def _decide(self, symbol, arrived):
+        """Analyze a symbol, trade its signal and run the periodic position check"""
+        try:
+            signal = self.analyze(symbol)
+            self.bot.execute_signal(symbol, signal)
+        except Exception as e:
+            print(f"❌ Error analyzing {symbol}: {str(e)}")
+        
+        self.decisions += 1
+        self.total_latency += time.perf_counter() - arrived
+        self.bot.instrumentation.observe('bar_to_decision', time.perf_counter() - arrived, symbol)
+        
+        if time.monotonic() - self.last_position_check >= self.position_check_interval:
+            with self.bot.instrumentation.timer('check_positions'):
+                self.bot.check_positions()
+            self.last_position_check = time.monotonic()
+        
+        self.bot.save_checkpoint(self.store, force=False)
+    
+    def _worker(self):
+        """Analyze queued symbols and trade, one at a time"""
+        while self.running or not self.pending.empty():
+            try:
+                item = self.pending.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            if not isinstance(item, str):
+                self.bot.broker.on_bar(item)  # demo orders fill against the stream
+                continue
+            
+            with self.lock:
+                arrived = self.queued.pop(item)
+            self._decide(item, arrived)
+    
+    def run(self):
+        """Seed history, then process bars until the stream ends or is interrupted"""
+        self.seed_history()
+        self.running = True
+        worker = threading.Thread(target=self._worker, name="bar-stream-worker", daemon=True)
+        worker.start()
+        
+        self.stream.subscribe_bars(self.on_bar, *self.symbols)
+        try:
+            self.stream.run()
+        except KeyboardInterrupt:
+            self.stream.stop()
+        finally:
+            self.running = False
+            worker.join()
+        
+        average = (self.total_latency / self.decisions * 1000) if self.decisions else 0
+        print(f"\n📡 Stream decisions: {self.decisions} (avg bar-to-decision {average:.1f} ms)")
+        print(f"🧮 Bar buffers: {self.store.nbytes / 1e6:.1f} MB for {len(self.store)} symbols")
+
+
+def create_stream(api_key, api_secret):
+    """Live Alpaca minute bar stream"""
+    from alpaca.data.live import StockDataStream
+    return StockDataStream(api_key, api_secret)
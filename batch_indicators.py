@@ -0,0 +1,179 @@
+"""
+SpineRip Batch Indicators - Watchlist-Scale Technical Analysis
+Computes analyze_technicals' indicators for many symbols at once on 2-D (symbol x bar) arrays
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import INDICATOR_COLUMNS
+from indicator_kernels import get_backend, get_kernels, wilder_last
+from indicator_registry import compute_indicators
+
+
+INPUT_FIELDS = ['high', 'low', 'close', 'volume']
+
+# Carried Wilder sums, so IndicatorState.from_frame can skip re-deriving them
+CARRY_FIELDS = ['avg_gain', 'avg_loss', 'tr_sum', 'dmp_sum', 'dmn_sum']
+
+
+def compute_batch(high, low, close, volume, backend=None):
+    """Registry indicators for (symbols, bars) inputs (shorter rows left-padded with NaN); returns ({column: 2-D array}, carry)"""
+    columns = compute_indicators(
+        high, low, close, volume, columns=INDICATOR_COLUMNS + ['true_range', 'plus_dm', 'minus_dm'], backend=backend
+    )
+    close = np.asarray(close, dtype=float)
+    starts = np.argmax(~np.isnan(close), axis=1)
+    
+    change = np.diff(close, axis=1, prepend=np.nan)
+    carry = {
+        'avg_gain': wilder_last(np.where(change > 0, change, 0.0), starts),
+        'avg_loss': wilder_last(np.where(change < 0, -change, 0.0), starts),
+        'tr_sum': wilder_last(columns.pop('true_range'), starts, cumulative=True),
+        'dmp_sum': wilder_last(columns.pop('plus_dm'), starts, cumulative=True),
+        'dmn_sum': wilder_last(columns.pop('minus_dm'), starts, cumulative=True)
+    }
+    return columns, carry
+
+
+def stack_frames(frames):
+    """Stack every frame's inputs as one (symbols, bars) batch; shorter frames are left-padded with NaN"""
+    symbols = list(frames)
+    n_bars = max((len(df) for df in frames.values()), default=0)
+    stacked = np.full((len(INPUT_FIELDS), len(symbols), n_bars), np.nan)
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        for i, field in enumerate(INPUT_FIELDS):
+            stacked[i, row, n_bars - len(df):] = df[field].to_numpy(dtype=float)
+    return symbols, stacked
+
+
+def _compute_into(inputs, outputs, carries, start, stop, backend=None):
+    """Fill output rows [start, stop) from input rows"""
+    columns, carry = compute_batch(*inputs[:, start:stop], backend=backend)
+    for j, col in enumerate(INDICATOR_COLUMNS):
+        outputs[start:stop, :, j] = columns[col]
+    for j, field in enumerate(CARRY_FIELDS):
+        carries[start:stop, j] = carry[field]
+
+
+def _shard_worker(names, shape, start, stop, backend):
+    """Process-pool entry point: attach to shared memory and compute a shard in place"""
+    n_symbols, n_bars = shape
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        inputs = np.ndarray((len(INPUT_FIELDS), n_symbols, n_bars), dtype=float, buffer=blocks[0].buf)
+        outputs = np.ndarray((n_symbols, n_bars, len(INDICATOR_COLUMNS)), dtype=float, buffer=blocks[1].buf)
+        carries = np.ndarray((n_symbols, len(CARRY_FIELDS)), dtype=float, buffer=blocks[2].buf)
+        _compute_into(inputs, outputs, carries, start, stop, backend)
+        del inputs, outputs, carries
+    finally:
+        for block in blocks:
+            block.close()
+    return stop - start
+
+
+class BatchIndicators:
+    """Stacks a watchlist into 2-D arrays and computes every indicator in one pass"""
+    
+    def __init__(self, workers=1, min_shard=64, backend=None):
+        """workers > 1 shards symbols across processes sharing memory (not pickled frames); backend: see indicator_kernels"""
+        self.workers = workers
+        self.min_shard = min_shard
+        self.backend = backend
+        self._pool = None
+    
+    def _get_pool(self):
+        """Lazily start the process pool"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+    
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+    
+    def _compute(self, stacked, backend):
+        """(outputs, carries) for a stacked batch, sharded when it pays off"""
+        n_symbols, n_bars = stacked.shape[1:]
+        shards = min(self.workers, n_symbols // self.min_shard)
+        
+        if shards <= 1:
+            outputs = np.empty((n_symbols, n_bars, len(INDICATOR_COLUMNS)))
+            carries = np.empty((n_symbols, len(CARRY_FIELDS)))
+            _compute_into(stacked, outputs, carries, 0, n_symbols, backend)
+            return outputs, carries
+        
+        sizes = [stacked.nbytes, n_symbols * n_bars * len(INDICATOR_COLUMNS) * 8, n_symbols * len(CARRY_FIELDS) * 8]
+        blocks = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        try:
+            inputs = np.ndarray(stacked.shape, dtype=float, buffer=blocks[0].buf)
+            inputs[:] = stacked
+            bounds = np.linspace(0, n_symbols, shards + 1).astype(int)
+            pool = self._get_pool()
+            futures = [
+                pool.submit(_shard_worker, [block.name for block in blocks], (n_symbols, n_bars), start, stop, backend)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+            
+            outputs = np.ndarray((n_symbols, n_bars, len(INDICATOR_COLUMNS)), dtype=float, buffer=blocks[1].buf).copy()
+            carries = np.ndarray((n_symbols, len(CARRY_FIELDS)), dtype=float, buffer=blocks[2].buf).copy()
+            del inputs
+            return outputs, carries
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    
+    def compute(self, frames):
+        """{symbol: (indicator block (bars x columns), carry dict or None under pandas-ta)} for raw bar frames"""
+        # Resolved here so worker processes run the same backend as the caller
+        backend = self.backend or get_backend()
+        if get_kernels(backend) is None:
+            # pandas-ta has no batch form: each frame runs alone and its state is rebuilt from the columns
+            from trading_ai import pandas_ta_technicals
+            return {
+                symbol: (pandas_ta_technicals(df.copy())[INDICATOR_COLUMNS].to_numpy(dtype=float), None)
+                for symbol, df in frames.items()
+            }
+        
+        symbols, stacked = stack_frames(frames)
+        outputs, carries = self._compute(stacked, backend)
+        n_bars = stacked.shape[2]
+        return {
+            symbol: (outputs[row, n_bars - len(frames[symbol]):], dict(zip(CARRY_FIELDS, carries[row].tolist())))
+            for row, symbol in enumerate(symbols)
+        }
+    
+    def analyze(self, frames):
+        """Like analyze_technicals for every frame: ({symbol: DataFrame}, {symbol: carry})"""
+        analyzed = {}
+        carries = {}
+        for symbol, (block, carry) in self.compute(frames).items():
+            df = frames[symbol]
+            indicators = pd.DataFrame(block, columns=INDICATOR_COLUMNS, index=df.index)
+            analyzed[symbol] = pd.concat([df.drop(columns=INDICATOR_COLUMNS, errors='ignore'), indicators], axis=1)
+            carries[symbol] = carry
+        return analyzed, carries
+
+
+def analyze_many(frames, workers=1, backend=None):
+    """One-shot BatchIndicators.analyze (starts and stops its own pool)"""
+    batch = BatchIndicators(workers=workers, backend=backend)
+    try:
+        return batch.analyze(frames)
+    finally:
+        batch.shutdown()
+
+
+def default_workers():
+    """Worker processes worth starting on this machine"""
+    return min(4, os.cpu_count() or 1)
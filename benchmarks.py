@@ -0,0 +1,540 @@
+"""
+SpineRip Benchmarks - Analysis & Scan Pipeline Timings
+Reproducible timings with a stored baseline and regression thresholds
+"""
+
+import os
+import io
+import sys
+import json
+import random
+import time
+import platform
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import BARS_PER_DAY
+from synthetic_data import SyntheticMarketData
+from fake_broker import FakeBroker
+from order_executor import OrderExecutor
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+DEFAULT_THRESHOLD = 0.5  # fail when a case gets more than 50% slower than baseline (shared VMs drift ~35%)
+DEFAULT_MIN_DELTA = 0.001  # ...and more than 1 ms slower (sub-millisecond jitter isn't a regression)
+RECHECK_REPEAT = 9  # minimum rounds when saving a baseline or re-timing a case that looks like a regression
+
+BAR_COUNTS = [390, 5 * BARS_PER_DAY, 30 * BARS_PER_DAY]
+WATCHLIST_SIZES = [1, 10, 50]
+POSITION_COUNTS = [2, 100, 1000]
+HISTORY_POINTS = [5 * 252, 5 * 252 * BARS_PER_DAY]  # five years of daily / minute equity
+UNIVERSE_SIZES = [1000, 5000]
+
+# Fresh-interpreter start-ups, the way cron runs the tools ('python' alone is the floor)
+STARTUP_COMMANDS = {
+    'python': ['-c', 'pass'],
+    'import=license_manager': ['-c', 'import license_manager'],
+    'import=portfolio_tracker': ['-c', 'import portfolio_tracker'],
+    'import=trading_ai': ['-c', 'import trading_ai'],
+    'import=trading_bot': ['-c', 'import trading_bot'],
+    'cli=license_manager info': ['license_manager.py', 'info'],
+    'bot=demo': ['-c', 'from trading_bot import SpineRipBot; SpineRipBot()']
+}
+
+
+class StubDataClient:
+    """Offline StockHistoricalDataClient: serves generated bars for any request"""
+    
+    def __init__(self, days=30):
+        self.generator = SyntheticMarketData()
+        self.frames = {}
+        self.days = days
+    
+    def get_stock_bars(self, request):
+        symbols = request.symbol_or_symbols
+        symbols = symbols if isinstance(symbols, list) else [symbols]
+        
+        parts = []
+        for symbol in symbols:
+            if symbol not in self.frames:
+                frame = self.generator.generate(symbol, days=self.days)
+                frame.index = pd.MultiIndex.from_arrays([[symbol] * len(frame), frame.pop('timestamp')], names=['symbol', 'timestamp'])
+                self.frames[symbol] = frame
+            parts.append(self.frames[symbol])
+        
+        return SimpleNamespace(df=pd.concat(parts))
+
+
+class StubTradingClient:
+    """Offline TradingClient: fixed account, N open positions, instant fills"""
+    
+    def __init__(self, positions=2):
+        rng = np.random.default_rng(7)
+        entry = rng.uniform(20, 500, positions)
+        current = entry * rng.uniform(0.9, 1.1, positions)
+        qty = rng.integers(1, 100, positions)
+        self.positions = [
+            SimpleNamespace(
+                symbol=f"SYM{i}", qty=str(qty[i]), side='long',
+                avg_entry_price=str(entry[i]), current_price=str(current[i]),
+                market_value=str(qty[i] * current[i]), cost_basis=str(qty[i] * entry[i]),
+                unrealized_pl=str(qty[i] * (current[i] - entry[i])),
+                unrealized_plpc=str(current[i] / entry[i] - 1)
+            )
+            for i in range(positions)
+        ]
+        self.orders = 0
+    
+    def get_account(self):
+        return SimpleNamespace(
+            cash='10000.00', buying_power='40000.00', portfolio_value='12500.00',
+            equity='12500.00', last_equity='10000.00'
+        )
+    
+    def get_all_positions(self):
+        return self.positions
+    
+    def submit_order(self, order):
+        self.orders += 1
+        return SimpleNamespace(id=f"bench_{self.orders}", status='filled')
+    
+    def get_portfolio_history(self, history_filter=None):
+        days = int(history_filter.period.rstrip('D'))
+        start = int(time.time()) - days * 86400
+        equity = [10000 + i * 50.0 for i in range(days)]
+        return SimpleNamespace(
+            timestamp=[start + i * 86400 for i in range(days)],
+            equity=equity,
+            profit_loss=[value - 10000 for value in equity],
+            profit_loss_pct=[(value - 10000) / 100 for value in equity]
+        )
+
+
+def measure(func, setup=None, repeat=5, min_time=0.2):
+    """Median seconds per call over `repeat` rounds (loops per round auto-scaled)"""
+    # Median rather than best: the gate compares like with like and one lucky round can't set the bar
+    if setup:
+        setup()
+    started = time.perf_counter()
+    func()
+    loops = max(1, int(min_time / max(time.perf_counter() - started, 1e-9)))
+    if setup:
+        loops = 1  # setup has to run before every call
+    
+    rounds = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        rounds.append((time.perf_counter() - started) / loops)
+    return float(np.median(rounds))
+
+
+def _stub_bot(watchlist_size):
+    """SpineRipBot running its live code paths against the offline stubs"""
+    from trading_bot import SpineRipBot
+    
+    bot = SpineRipBot(api_key='benchmark', api_secret='benchmark')
+    bot.trading_client = FakeBroker()
+    bot.ai.trading_client = bot.trading_client
+    bot.order_executor = OrderExecutor(bot.trading_client, on_fill=bot._on_fill)
+    bot.ai.data_client = StubDataClient()
+    bot.ai.bar_cache = None
+    bot.confidence_threshold = 0  # every signal goes through order placement
+    bot.max_trades_per_day = float('inf')
+    bot.indicator_workers = 1
+    bot.portfolio_history = None
+    watchlist = [f"SYM{i}" for i in range(watchlist_size)]
+    return bot, watchlist
+
+
+def _run_python(args):
+    """Run a new interpreter in this directory and wait for it to exit"""
+    subprocess.run([sys.executable] + args, cwd=os.path.dirname(os.path.abspath(__file__)),
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+
+def _warm_bot(bot, watchlist, save=False):
+    """Scan once so the bot has indicator state to checkpoint (and write the checkpoint)"""
+    if not bot.ai.indicator_engine.states:
+        bot.scan_watchlist(watchlist)
+    if save and not bot.checkpoint.exists():
+        bot.save_checkpoint()
+
+
+def _fresh_account(url):
+    """get_account through a client of its own (new session and connection), as before the registry"""
+    from alpaca.trading.client import TradingClient
+    client = TradingClient('benchmark', 'benchmark', url_override=url)
+    try:
+        return client.get_account()
+    finally:
+        client._session.close()
+
+
+def _compute_indicators(df, backend, columns=None):
+    """Indicator columns from one backend (pandas-ta always computes all of them)"""
+    from indicator_registry import compute_frame
+    from trading_ai import pandas_ta_technicals
+    
+    if backend == 'pandas-ta':
+        return pandas_ta_technicals(df.copy())
+    return compute_frame(df, columns=columns, backend=backend)
+
+
+def _resample_full(df, timeframes, minutes):
+    """Every timeframe rebuilt from all minute bars with DataFrame.resample (what the cache avoids per cycle)"""
+    indexed = df.set_index('timestamp')
+    aggregations = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    return {timeframe: indexed.resample(f"{minutes[timeframe]}min").agg(aggregations).dropna()
+            for timeframe in timeframes}
+
+
+def _simulated_session(frames, orders):
+    """Bracket orders spread over the symbols' first half, then every bar fed to a fresh simulated broker"""
+    from sim_broker import SimulatedBroker, order_request
+    
+    broker = SimulatedBroker(cash=1e12)
+    bars = {symbol: list(zip(pd.DatetimeIndex(df['timestamp']).as_unit('ns').asi8.tolist(),
+                             *(df[f].tolist() for f in ('open', 'high', 'low', 'close', 'volume'))))
+            for symbol, df in frames.items()}
+    half = min(len(rows) for rows in bars.values()) // 2
+    per_bar = -(-orders // (half * len(bars)))
+    submitted = 0
+    for row in range(len(bars[next(iter(bars))])):
+        for symbol, rows in bars.items():
+            broker.update(symbol, *rows[row])
+            for _ in range(per_bar if row < half else 0):
+                if submitted < orders:
+                    price = rows[row][4]
+                    broker.submit_order(order_request(symbol, 1, 'buy', order_class='bracket',
+                                                      take_profit=price * 1.01, stop_loss=price * 0.99))
+                    submitted += 1
+    return broker
+
+
+def benchmark_cases(quick=False, pattern=None):
+    """Yield (name, func, setup) for every benchmark case (only building those matching pattern)"""
+    from trading_ai import SpineRipAI, compute_technicals, SIGNAL_COLUMNS
+    from batch_indicators import analyze_many
+    from indicator_kernels import available_backends
+    from portfolio_tracker import PortfolioTracker
+    from bot_checkpoint import BotCheckpoint
+    from portfolio_history import PortfolioHistory
+    from alpaca_clients import ClientRegistry
+    from alpaca_stub import AlpacaStubServer
+    from market_scanner import MarketScanner
+    from bar_cache import to_records
+    from multi_timeframe import MultiTimeframe, TIMEFRAMES, DEFAULT_TIMEFRAMES
+    from optimizer import Optimizer, DEFAULT_SPACE, sample
+    
+    def wanted(*names):
+        """Whether any of these cases was asked for (fixtures are only built for those)"""
+        return pattern is None or any(pattern in name for name in names)
+    
+    for label, args in STARTUP_COMMANDS.items():
+        if wanted(f"startup[{label}]"):
+            yield (f"startup[{label}]", lambda args=args: _run_python(args), None)
+    
+    ai = SpineRipAI()
+    bar_counts = BAR_COUNTS[:2] if quick else BAR_COUNTS
+    watchlist_sizes = WATCHLIST_SIZES[:2] if quick else WATCHLIST_SIZES
+    position_counts = POSITION_COUNTS[:2] if quick else POSITION_COUNTS
+    history_points = HISTORY_POINTS[:1] if quick else HISTORY_POINTS
+    universe_sizes = UNIVERSE_SIZES[:1] if quick else UNIVERSE_SIZES
+    
+    for bars in bar_counts:
+        days = bars // BARS_PER_DAY
+        if wanted(f"get_market_data[days={days}]"):
+            yield (f"get_market_data[days={days}]",
+                   lambda days=days: (ai.demo_data.clear(), ai.get_market_data('AAPL', days=days)), None)
+    
+    history = ai.market_generator.generate('AAPL', days=31)
+    for bars in bar_counts:
+        df = history.iloc[-bars:].reset_index(drop=True)
+        if wanted(f"analyze_technicals[bars={bars}]"):
+            yield (f"analyze_technicals[bars={bars}]",
+                   lambda df=df: ai.analyze_technicals(df.copy()), None)
+    
+    # Every indicator column on each backend that can run here, then only what signals read
+    for backend in available_backends():
+        for bars in bar_counts:
+            df = history.iloc[-bars:].reset_index(drop=True)
+            if wanted(f"compute_indicators[backend={backend},bars={bars}]"):
+                yield (f"compute_indicators[backend={backend},bars={bars}]",
+                       lambda df=df, backend=backend: _compute_indicators(df, backend), None)
+    for bars in bar_counts:
+        df = history.iloc[-bars:].reset_index(drop=True)
+        if wanted(f"compute_indicators[columns=signal,bars={bars}]"):
+            yield (f"compute_indicators[columns=signal,bars={bars}]",
+                   lambda df=df: _compute_indicators(df, 'numpy', SIGNAL_COLUMNS), None)
+    
+    # One trading session arriving a bar at a time on top of `bars` of history
+    for bars in bar_counts:
+        if not wanted(f"analyze_technicals_incremental[bars={bars},new=390]"):
+            continue
+        windows = [history.iloc[i:i + bars] for i in range(len(history) - bars - BARS_PER_DAY, len(history) - bars + 1)]
+        primed = compute_technicals(windows[0].copy())
+        yield (f"analyze_technicals_incremental[bars={bars},new=390]",
+               lambda windows=windows: [ai.analyze_technicals(w, symbol='AAPL') for w in windows[1:]],
+               lambda primed=primed: ai.indicator_engine.adopt('AAPL', primed))
+    
+    # Higher timeframes for the same session: folded in bar by bar vs one pandas resample per bar
+    for bars in bar_counts:
+        names = (f"resample_timeframes[bars={bars},new=390]", f"resample_timeframes_full[bars={bars}]")
+        if not wanted(*names):
+            continue
+        windows = [history.iloc[i:i + bars] for i in range(len(history) - bars - BARS_PER_DAY, len(history) - bars + 1)]
+        timeframes = MultiTimeframe(ai.indicator_engine)
+        if wanted(names[0]):
+            yield (names[0],
+                   lambda windows=windows, timeframes=timeframes: [timeframes.update('AAPL', w) for w in windows[1:]],
+                   lambda windows=windows, timeframes=timeframes: (timeframes.drop('AAPL'),
+                                                                   timeframes.update('AAPL', windows[0])))
+        if wanted(names[1]):
+            yield (names[1], lambda df=windows[-1]: _resample_full(df, DEFAULT_TIMEFRAMES, TIMEFRAMES), None)
+    
+    for bars in bar_counts:
+        names = (f"generate_signal[bars={bars}]", f"score_signals[bars={bars}]", f"evaluate_strategies[bars={bars}]")
+        if not wanted(*names):
+            continue
+        analyzed = compute_technicals(history.iloc[-bars:].reset_index(drop=True))
+        for name, method in zip(names, (ai.generate_signal, ai.score_signals, ai.evaluate_strategies)):
+            if wanted(name):
+                yield (name, lambda df=analyzed, method=method: method(df), None)
+    
+    # Cold start for a whole watchlist as one 2-D batch (5 sessions per symbol)
+    session = history.iloc[-5 * BARS_PER_DAY:].reset_index(drop=True)
+    for size in watchlist_sizes:
+        if wanted(f"batch_indicators[symbols={size}]"):
+            frames = {f"SYM{i}": session for i in range(size)}
+            yield (f"batch_indicators[symbols={size}]", lambda frames=frames: analyze_many(frames), None)
+    
+    # Parameter sweep on 5 symbols x 5 sessions: indicators once per symbol, confidence once per length setting
+    if wanted("optimize_sweep[configs=32,symbols=5]"):
+        sweep_frames = {f"SYM{i}": session for i in range(5)}
+        configs = sample(DEFAULT_SPACE, 32, random.Random(0))
+        yield ("optimize_sweep[configs=32,symbols=5]",
+               lambda: Optimizer(sweep_frames, folds=2, workers=1).evaluate(configs), None)
+    
+    # Simulated broker: bracket orders filled and exited against streamed bars
+    if wanted("sim_broker_session[orders=2000,symbols=5]"):
+        broker_frames = {f"SIM{i}": ai.market_generator.generate(f"SIM{i}", days=2) for i in range(5)}
+        yield ("sim_broker_session[orders=2000,symbols=5]",
+               lambda: _simulated_session(broker_frames, 2000), None)
+    
+    # Screener prefilters and ranking over bar records (2 sessions per symbol, 100 distinct paths)
+    if wanted(*(f"screen_universe[symbols={size}]" for size in universe_sizes)):
+        records = [to_records(ai.market_generator.generate(f"SCAN{i}", days=2)) for i in range(100)]
+        for size in universe_sizes:
+            if wanted(f"screen_universe[symbols={size}]"):
+                bars = {f"SCAN{i}": records[i % len(records)] for i in range(size)}
+                scanner = MarketScanner(ai)
+                yield (f"screen_universe[symbols={size}]", lambda scanner=scanner, bars=bars: scanner.rank(bars), None)
+    
+    for size in watchlist_sizes:
+        names = (f"analyze_and_trade[watchlist={size}]", f"scan_watchlist[watchlist={size}]")
+        if not wanted(*names):
+            continue
+        bot, watchlist = _stub_bot(size)
+        if wanted(names[0]):
+            yield (names[0], lambda bot=bot, watchlist=watchlist: [bot.analyze_and_trade(s) for s in watchlist], None)
+        if wanted(names[1]):
+            yield (names[1], lambda bot=bot, watchlist=watchlist: bot.scan_watchlist(watchlist), None)
+    
+    # Warm restart: write the watchlist's indicator state, then load it back
+    checkpoint_dir = tempfile.mkdtemp(prefix='spinerip_checkpoint_')
+    for size in watchlist_sizes:
+        names = (f"checkpoint_save[watchlist={size}]", f"checkpoint_restore[watchlist={size}]")
+        if not wanted(*names):
+            continue
+        bot, watchlist = _stub_bot(size)
+        bot.checkpoint = BotCheckpoint(os.path.join(checkpoint_dir, f"watchlist_{size}"))
+        if wanted(names[0]):
+            yield (names[0], bot.save_checkpoint,
+                   lambda bot=bot, watchlist=watchlist: _warm_bot(bot, watchlist))
+        if wanted(names[1]):
+            yield (names[1], lambda bot=bot: bot.checkpoint.restore(bot),
+                   lambda bot=bot, watchlist=watchlist: _warm_bot(bot, watchlist, save=True))
+    
+    report_dir = tempfile.mkdtemp(prefix='spinerip_bench_')
+    for count in position_counts:
+        names = (f"calculate_metrics[positions={count}]", f"export_report[positions={count}]")
+        if not wanted(*names):
+            continue
+        history = PortfolioHistory(os.path.join(report_dir, f"history_{count}"))
+        tracker = PortfolioTracker(api_key='benchmark', api_secret='benchmark', history=history)
+        tracker.trading_client = StubTradingClient(positions=count)
+        report = os.path.join(report_dir, f"report_{count}.json")
+        if wanted(names[0]):
+            yield (names[0], tracker.calculate_metrics, None)
+        if wanted(names[1]):
+            yield (names[1], lambda tracker=tracker, report=report: tracker.export_report(report), None)
+    
+    # Analytics over a stored equity curve and 1,000 realized trades
+    rng = np.random.default_rng(7)
+    for points in history_points:
+        if not wanted(f"portfolio_performance[points={points}]"):
+            continue
+        history = PortfolioHistory(os.path.join(report_dir, f"equity_{points}"))
+        spacing = 86400 if points <= 5 * 252 else 60
+        timestamps = 1_600_000_000 + np.arange(points) * spacing
+        history.record_equity(timestamps, 10000 * np.exp(np.cumsum(rng.normal(0, 1e-3, points))))
+        exits = np.sort(rng.choice(timestamps, 1000))
+        history.record_trades([f"SYM{i % 50}" for i in range(1000)], np.ones(1000),
+                              np.full(1000, 100.0), rng.normal(100.5, 2, 1000), exits)
+        yield (f"portfolio_performance[points={points}]",
+               lambda history=history: PortfolioHistory(history.path).performance(window=20), None)
+    
+    # Account reads from the local stub server: one shared keep-alive pool vs a new client per call
+    names = ("api_requests[clients=pooled,calls=20]", "api_requests[clients=per_call,calls=20]")
+    if wanted(*names):
+        with AlpacaStubServer() as stub:
+            pooled = ClientRegistry(trading_url=stub.url).trading('benchmark', 'benchmark')
+            if wanted(names[0]):
+                yield (names[0], lambda: [pooled.get_account() for _ in range(20)], None)
+            if wanted(names[1]):
+                yield (names[1], lambda: [_fresh_account(stub.url) for _ in range(20)], None)
+
+
+def run_benchmarks(pattern=None, quick=False, repeat=5, recheck=None):
+    """Time every case (optionally only names containing pattern)"""
+    # recheck(name, seconds) -> True re-times a case with more rounds before it is reported,
+    # so a noisy run on a busy machine doesn't count as a regression
+    results = {}
+    cases = benchmark_cases(quick=quick, pattern=pattern)
+    while True:
+        with contextlib.redirect_stdout(io.StringIO()):
+            case = next(cases, None)  # fixtures are built lazily, one case at a time
+        if case is None:
+            break
+        
+        name, func, setup = case
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = measure(func, setup=setup, repeat=repeat)
+            if recheck is not None and recheck(name, results[name]):
+                results[name] = measure(func, setup=setup, repeat=max(3 * repeat, RECHECK_REPEAT))
+        print(f"  {name:55} {results[name] * 1000:10.3f} ms", flush=True)
+    
+    return results
+
+
+def environment():
+    """Versions that make timings comparable"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+
+def load_baseline(path=BASELINE_FILE):
+    """Stored baseline ({} if none saved yet)"""
+    if not os.path.exists(path):
+        return {}
+    
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    """Store results as the new baseline (merged into existing cases)"""
+    baseline = load_baseline(path)
+    baseline['environment'] = environment()
+    baseline['saved_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    baseline.setdefault('results', {}).update(results)
+    
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    return path
+
+
+def regressed(seconds, stored, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """Whether a timing is a regression against its baseline"""
+    return seconds > stored * (1 + threshold) and seconds - stored > min_delta
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """Print results against the baseline; returns names that regressed"""
+    stored = baseline.get('results', {})
+    regressions = []
+    
+    print(f"\n  {'case':55} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        if name not in stored:
+            print(f"  {name:55} {'-':>10} {seconds * 1000:10.3f} {'new':>7}")
+            continue
+        ratio = seconds / stored[name]
+        status = ""
+        if regressed(seconds, stored[name], threshold, min_delta):
+            status = " 🔴"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            status = " 🟢"
+        print(f"  {name:55} {stored[name] * 1000:10.3f} {seconds * 1000:10.3f} {ratio:6.2f}x{status}")
+    
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point (exit code 1 on regressions)"""
+    parser = argparse.ArgumentParser(description="SpineRip analysis & scan benchmarks")
+    parser.add_argument('-k', dest='pattern', help="only run cases whose name contains this")
+    parser.add_argument('--quick', action='store_true', help="skip the largest parameter values")
+    parser.add_argument('--repeat', type=int, default=5, help="timing rounds per case (the median is kept)")
+    parser.add_argument('--save', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a case counts as a regression (0.5 = 50%%)")
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA * 1000,
+                        help="...and the smallest slowdown in ms that counts")
+    args = parser.parse_args(argv)
+    
+    print("\n" + "="*60)
+    print("⏱️  SPINERIP BENCHMARKS")
+    print("="*60 + "\n")
+    
+    # A baseline is timed with extra rounds, since every later run is judged against it
+    baseline = {} if args.save else load_baseline(args.baseline)
+    stored = baseline.get('results', {})
+    min_delta = args.min_delta / 1000
+    results = run_benchmarks(
+        pattern=args.pattern, quick=args.quick,
+        repeat=max(args.repeat, RECHECK_REPEAT) if args.save else args.repeat,
+        recheck=lambda name, seconds: name in stored and regressed(seconds, stored[name], args.threshold, min_delta)
+    )
+    
+    if args.save:
+        path = save_baseline(results, args.baseline)
+        print(f"\n💾 Baseline saved to: {path}")
+        return 0
+    
+    if not baseline:
+        print("\n⚠️  No baseline yet - run with --save to store one")
+        return 0
+    
+    if baseline.get('environment') != environment():
+        print("\n⚠️  Baseline was recorded on a different environment; ratios are indicative only")
+    
+    regressions = compare(results, baseline, threshold=args.threshold, min_delta=min_delta)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+SpineRip Bot Checkpoint - Warm Restarts
+Saves counters, indicator state and bar history so a restarted bot picks up where it stopped
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from indicator_engine import IndicatorState, INDICATOR_COLUMNS
+
+
+CHECKPOINT_VERSION = 1
+
+# Indicator history kept by IndicatorEngine, one record per analyzed bar
+HISTORY_DTYPE = np.dtype([('timestamp', 'i8')] + [(col, 'f8') for col in INDICATOR_COLUMNS])
+
+
+def trading_day(now=None):
+    """Calendar day the daily trade cap counts against (local time, like the scan loop)"""
+    return (now or datetime.now()).date().isoformat()
+
+
+def _history_records(state):
+    """An IndicatorState's timestamps and column history as one structured array"""
+    records = np.empty(len(state.timestamps), dtype=HISTORY_DTYPE)
+    records['timestamp'] = state.timestamps
+    for col in INDICATOR_COLUMNS:
+        records[col] = state.columns[col]
+    return records
+
+
+def _frame_records(df):
+    """Bars frame -> structured array (timestamp as UTC nanoseconds, other columns as stored)"""
+    fields = [('timestamp', 'i8')] + [(col, df[col].dtype) for col in df.columns if col != 'timestamp']
+    records = np.empty(len(df), dtype=np.dtype(fields))
+    records['timestamp'] = pd.DatetimeIndex(df['timestamp']).as_unit('ns').asi8
+    for name in records.dtype.names[1:]:
+        records[name] = df[name].to_numpy()
+    return records
+
+
+def _records_frame(records):
+    """Inverse of _frame_records"""
+    df = pd.DataFrame({name: np.array(records[name]) for name in records.dtype.names[1:]})
+    df.insert(0, 'timestamp', pd.to_datetime(records['timestamp'], unit='ns', utc=True))
+    return df
+
+
+class BotCheckpoint:
+    """State file (msgpack, or JSON without it) plus one memory-mapped .npy array per symbol and kind"""
+    
+    def __init__(self, path=None, max_age_days=30):
+        """Initialize checkpoint directory (defaults to .bot_state next to this file)"""
+        self.path = path or os.path.join(os.path.dirname(__file__), '.bot_state')
+        self.max_age = max_age_days * 86400  # older checkpoints are ignored
+    
+    def _state_path(self, packed=None):
+        """State file for the available serializer (or the one asked for)"""
+        packed = msgpack is not None if packed is None else packed
+        return os.path.join(self.path, 'state.msgpack' if packed else 'state.json')
+    
+    def exists(self):
+        """True if a checkpoint has been written"""
+        return os.path.exists(self._state_path()) or os.path.exists(self._state_path(packed=False))
+    
+    def _write_array(self, kind, symbol, records):
+        """Save one array atomically; returns its state entry (file, rows, last timestamp)"""
+        name = f"{kind}_{symbol.replace('/', '-')}.npy"
+        path = os.path.join(self.path, name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, records)
+        os.replace(tmp_path, path)
+        last = int(records['timestamp'][-1]) if len(records) else None
+        return {'file': name, 'rows': len(records), 'last': last}
+    
+    def _load_array(self, entry):
+        """Memory-map a saved array (None if it is missing or no longer matches its entry)"""
+        path = os.path.join(self.path, entry['file'])
+        if not os.path.exists(path):
+            return None
+        records = np.load(path, mmap_mode='r')
+        last = int(records['timestamp'][-1]) if len(records) else None
+        if len(records) != entry['rows'] or last != entry['last']:
+            return None  # rewritten by a save that didn't finish
+        return records
+    
+    def _write_state(self, state):
+        """Write the state file last so it only ever points at complete arrays"""
+        path = self._state_path()
+        tmp_path = path + '.tmp'
+        if msgpack is not None:
+            with open(tmp_path, 'wb') as f:
+                f.write(msgpack.packb(state, use_bin_type=True))
+        else:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+        os.replace(tmp_path, path)
+    
+    def _read_state(self):
+        """Newest readable state file, or None"""
+        candidates = [self._state_path(packed=False)]
+        if msgpack is not None:
+            candidates.insert(0, self._state_path())
+        candidates = [path for path in candidates if os.path.exists(path)]
+        if not candidates:
+            return None
+        
+        path = max(candidates, key=os.path.getmtime)
+        try:
+            if path.endswith('.msgpack'):
+                with open(path, 'rb') as f:
+                    return msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save(self, bot, store=None):
+        """Snapshot the bot's trade counter, indicator states, demo bars and (streaming) bar rings"""
+        os.makedirs(self.path, exist_ok=True)
+        with bot.trade_lock:
+            trades_today = bot.trades_today
+        
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'saved_at': time.time(),
+            'trading_day': trading_day(),
+            'trades_today': trades_today,
+            'indicators': {},
+            'bars': {},
+            'rings': {}
+        }
+        
+        # Incremental indicator state: rolling values plus the history it is aligned with
+        for symbol, indicator_state in list(bot.ai.indicator_engine.states.items()):
+            if indicator_state.timestamps is None:
+                continue
+            entry = self._write_array('history', symbol, _history_records(indicator_state))
+            entry['state'] = indicator_state.to_dict()
+            state['indicators'][symbol] = entry
+        
+        # Generated demo history (live bars already persist in the bar cache)
+        if bot.ai.demo_mode:
+            for symbol, df in list(bot.ai.demo_data.items()):
+                state['bars'][symbol] = self._write_array('bars', symbol, _frame_records(df))
+        
+        if store is not None:
+            for symbol, ring in list(store.rings.items()):
+                with ring.lock:
+                    entry = self._write_array('ring', symbol, ring.view())
+                    entry['pending'] = ring.pending
+                    entry['state'] = ring.indicator_state.to_dict() if ring.indicator_state is not None else None
+                    state['rings'][symbol] = entry
+        
+        self._write_state(state)
+        
+        # Arrays of symbols that are no longer tracked
+        keep = {entry['file'] for kind in ('indicators', 'bars', 'rings') for entry in state[kind].values()}
+        for name in os.listdir(self.path):
+            if name.endswith('.npy') and name not in keep:
+                os.remove(os.path.join(self.path, name))
+        return state
+    
+    def restore(self, bot, store=None):
+        """Load the last checkpoint into a bot (and a BarStreamer's store); returns counts restored or None"""
+        state = self._read_state()
+        if state is None or state.get('version') != CHECKPOINT_VERSION:
+            return None
+        if time.time() - state['saved_at'] > self.max_age:
+            return None
+        
+        # The daily cap only carries over within the same day
+        restored = {'trades_today': 0, 'indicators': 0, 'bars': 0, 'rings': 0}
+        if state['trading_day'] == trading_day():
+            with bot.trade_lock:
+                bot.trades_today = state['trades_today']
+            restored['trades_today'] = state['trades_today']
+        
+        engine = bot.ai.indicator_engine
+        for symbol, entry in state['indicators'].items():
+            history = self._load_array(entry)
+            if history is None:
+                continue
+            indicator_state = IndicatorState.from_dict(entry['state'])
+            indicator_state.timestamps = np.array(history['timestamp'])
+            indicator_state.columns = {col: np.array(history[col]) for col in INDICATOR_COLUMNS}
+            engine.states[symbol] = indicator_state
+            restored['indicators'] += 1
+        
+        if bot.ai.demo_mode:
+            for symbol, entry in state['bars'].items():
+                records = self._load_array(entry)
+                if records is not None:
+                    bot.ai.demo_data[symbol] = _records_frame(records)
+                    restored['bars'] += 1
+        
+        # Only rings the streamer watches; anything beyond its capacity is dropped from the front
+        if store is not None:
+            for symbol, entry in state['rings'].items():
+                if symbol not in store:
+                    continue
+                records = self._load_array(entry)
+                if records is None:
+                    continue
+                ring = store.get(symbol)
+                records = records[-ring.capacity:]
+                rows = len(records)
+                with ring.lock:
+                    for field in records.dtype.names:
+                        ring.records[field][:rows] = records[field]
+                    ring.start = 0
+                    ring.end = rows
+                    ring.pending = min(entry['pending'], rows)
+                    ring.indicator_state = IndicatorState.from_dict(entry['state']) if entry['state'] else None
+                restored['rings'] += 1
+        
+        return restored
+    
+    def clear(self):
+        """Delete the checkpoint"""
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name.startswith('state.') or name.endswith('.npy') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.path, name))
@@ -0,0 +1,231 @@
+"""
+SpineRip Broker Base - Shared In-Memory TradingClient Pieces
+Order registry, lookups, cancels, fill bookkeeping and alpaca-shaped positions/account for the local brokers
+"""
+
+import uuid
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+# 'accepted': in flight (submission latency); 'new': working; 'held': bracket exit waiting on its entry
+OPEN_STATUSES = ('accepted', 'new', 'held', 'partially_filled')
+
+
+class FakeAPIError(Exception):
+    """Mimics alpaca.common.exceptions.APIError (carries an HTTP status code)"""
+    
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def enum_value(enum):
+    """Plain string for an alpaca enum (or a string)"""
+    return getattr(enum, 'value', enum)
+
+
+class BrokerBase:
+    """Orders, cash and positions behind the TradingClient calls the bot uses; subclasses decide when orders fill"""
+    
+    def __init__(self, cash=100000.00, margin=1.0):
+        """Start with cash; buying power is cash times margin, less what open buys reserve"""
+        self.cash = float(cash)
+        self.margin = margin
+        self.orders = {}
+        self.by_client_id = {}
+        self.positions = {}  # symbol -> [qty, avg_entry_price]
+        self.reserved = {}  # open buy order id -> buying power it holds until it fills or is canceled
+        self.lock = threading.RLock()
+    
+    def price(self, symbol):
+        """Last price for a symbol (None if unknown)"""
+        raise NotImplementedError
+    
+    def _clock(self):
+        """Timestamp for new orders"""
+        return datetime.now(timezone.utc)
+    
+    def _client_order_id(self, order_data):
+        """The request's client order ID (422 if an order already uses it)"""
+        client_order_id = getattr(order_data, 'client_order_id', None)
+        if client_order_id and client_order_id in self.by_client_id:
+            raise FakeAPIError("client_order_id must be unique", status_code=422)
+        return client_order_id
+    
+    def _new_order(self, symbol, qty, side, order_type, client_order_id, limit_price=None,
+                   stop_price=None, order_class='simple', status='new', parent=None, **fields):
+        """Create and register an order record (fields: extra attributes a subclass tracks)"""
+        order = SimpleNamespace(
+            id=str(uuid.uuid4()),
+            client_order_id=client_order_id or str(uuid.uuid4()),
+            symbol=symbol,
+            qty=f'{qty:g}',
+            side=side,
+            type=order_type,
+            order_class=order_class,
+            limit_price=float(limit_price) if limit_price is not None else None,
+            stop_price=float(stop_price) if stop_price is not None else None,
+            status=status,
+            filled_qty='0',
+            filled_avg_price=None,
+            filled_at=None,
+            submitted_at=self._clock(),
+            legs=[],
+            parent=parent,
+            **fields
+        )
+        self.orders[order.id] = order
+        self.by_client_id[order.client_order_id] = order
+        return order
+    
+    def _place(self, order_data, client_order_id, symbol, qty, side, order_type, order_class, **fields):
+        """Create an order and its OCO/bracket legs from a request (fields go to the orders that work at once)"""
+        if order_class == 'oco':
+            # OCO: a take-profit limit and a stop loss, whichever fills first cancels the other
+            order = self._new_order(symbol, qty, side, 'limit', client_order_id,
+                                    limit_price=order_data.take_profit.limit_price, order_class=order_class, **fields)
+            order.legs = [
+                self._new_order(symbol, qty, side, 'stop', None, stop_price=order_data.stop_loss.stop_price,
+                                order_class=order_class, parent=order, **fields)
+            ]
+            return order
+        
+        order = self._new_order(symbol, qty, side, order_type, client_order_id,
+                                limit_price=getattr(order_data, 'limit_price', None),
+                                stop_price=getattr(order_data, 'stop_price', None),
+                                order_class=order_class, **fields)
+        if order_class == 'bracket':
+            # Exits wait ('held') until the entry fills
+            exit_side = 'sell' if side == 'buy' else 'buy'
+            order.legs = [
+                self._new_order(symbol, qty, exit_side, 'limit', None, limit_price=order_data.take_profit.limit_price,
+                                order_class=order_class, status='held', parent=order),
+                self._new_order(symbol, qty, exit_side, 'stop', None, stop_price=order_data.stop_loss.stop_price,
+                                order_class=order_class, status='held', parent=order)
+            ]
+        return order
+    
+    def _book(self, order, price, filled_at=None):
+        """Fill an order completely at price and apply it to cash and positions"""
+        symbol = order.symbol
+        qty = float(order.qty)
+        order.status = 'filled'
+        order.filled_qty = order.qty
+        order.filled_avg_price = str(round(price, 4))
+        order.filled_at = filled_at or datetime.now(timezone.utc)
+        self.reserved.pop(order.id, None)
+        
+        held = self.positions.get(symbol, [0.0, 0.0])
+        if order.side == 'buy':
+            total = held[0] + qty
+            held = [total, (held[0] * held[1] + qty * price) / total]
+            self.cash -= qty * price
+        else:
+            held = [held[0] - qty, held[1]]
+            self.cash += qty * price
+        if held[0]:
+            self.positions[symbol] = held
+        else:
+            self.positions.pop(symbol, None)
+    
+    def _settle(self, order):
+        """After a fill: an OCO/bracket exit cancels its siblings, a bracket entry activates its exits (returned)"""
+        if order.order_class == 'oco' or order.parent is not None:
+            head = order.parent or order
+            for other in [head] + head.legs:
+                if other is not order and other.status in OPEN_STATUSES:
+                    self._cancel(other)
+            return []
+        for leg in order.legs:
+            leg.status = 'new'
+        return order.legs
+    
+    def _cancel(self, order):
+        """Cancel one open order and release its buying power"""
+        order.status = 'canceled'
+        self.reserved.pop(order.id, None)
+    
+    def get_order_by_id(self, order_id):
+        """Order by broker ID"""
+        with self.lock:
+            if order_id not in self.orders:
+                raise FakeAPIError("order not found", status_code=404)
+            return self.orders[order_id]
+    
+    def get_order_by_client_id(self, client_id):
+        """Order by client order ID"""
+        with self.lock:
+            if client_id not in self.by_client_id:
+                raise FakeAPIError("order not found", status_code=404)
+            return self.by_client_id[client_id]
+    
+    def get_orders(self, filter=None):
+        """Orders by filter.status ('open' by default, 'closed' or 'all'), optionally only filter.symbols"""
+        status = str(enum_value(getattr(filter, 'status', None)) or 'open')
+        symbols = getattr(filter, 'symbols', None)
+        with self.lock:
+            return [
+                order for order in self.orders.values()
+                if (status == 'all' or (order.status in OPEN_STATUSES) == (status == 'open'))
+                and (not symbols or order.symbol in symbols)
+            ]
+    
+    def cancel_order_by_id(self, order_id):
+        """Cancel an open order (and its open legs)"""
+        with self.lock:
+            order = self.get_order_by_id(order_id)
+            if order.status not in OPEN_STATUSES:
+                raise FakeAPIError("order is not cancelable", status_code=422)
+            for other in [order] + order.legs:
+                if other.status in OPEN_STATUSES:
+                    self._cancel(other)
+    
+    def cancel_orders(self):
+        """Cancel every open order"""
+        with self.lock:
+            for order in list(self.orders.values()):
+                if order.status in OPEN_STATUSES:
+                    self._cancel(order)
+    
+    def _position(self, symbol, qty, entry):
+        """Position shaped like an alpaca Position"""
+        price = self.price(symbol) or entry
+        return SimpleNamespace(
+            symbol=symbol, qty=f'{qty:g}', side='long' if qty > 0 else 'short',
+            avg_entry_price=str(entry), current_price=str(price),
+            market_value=str(qty * price), cost_basis=str(qty * entry),
+            unrealized_pl=str(qty * (price - entry)), unrealized_plpc=str(price / entry - 1)
+        )
+    
+    def get_all_positions(self):
+        """Open positions shaped like alpaca Position objects"""
+        with self.lock:
+            return [self._position(symbol, qty, entry) for symbol, (qty, entry) in self.positions.items()]
+    
+    def get_open_position(self, symbol):
+        """One open position (404 when flat)"""
+        with self.lock:
+            if symbol not in self.positions:
+                raise FakeAPIError("position does not exist", status_code=404)
+            return self._position(symbol, *self.positions[symbol])
+    
+    def buying_power(self):
+        """Cash times margin, less what open buy orders hold"""
+        with self.lock:
+            return max(self.cash * self.margin - sum(self.reserved.values()), 0.0)
+    
+    def equity(self):
+        """Cash plus positions at their last price"""
+        with self.lock:
+            return self.cash + sum(qty * (self.price(symbol) or entry) for symbol, (qty, entry) in self.positions.items())
+    
+    def get_account(self):
+        """Account shaped like an alpaca TradeAccount"""
+        with self.lock:
+            equity = self.equity()
+            return SimpleNamespace(
+                cash=str(self.cash), buying_power=str(self.buying_power()),
+                portfolio_value=str(equity), equity=str(equity), last_equity=str(equity)
+            )
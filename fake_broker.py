@@ -0,0 +1,72 @@
+"""
+SpineRip Fake Broker - Local TradingClient Stand-In
+In-memory orders, bracket legs and positions for exercising the order pipeline offline
+"""
+
+from broker_base import BrokerBase, FakeAPIError, enum_value  # FakeAPIError re-exported for callers
+
+
+class FakeBroker(BrokerBase):
+    """Implements the TradingClient calls the bot uses, filling market orders instantly"""
+    
+    def __init__(self, cash=100000.00, prices=None):
+        """Start with cash and optional {symbol: last price}"""
+        super().__init__(cash, margin=4.0)
+        self.prices = dict(prices or {})
+        self._failures = []
+    
+    def fail_next(self, count=1, status_code=500, reach_broker=False):
+        """Make the next `count` submissions raise (reach_broker: accept the order first, like a timeout)"""
+        self._failures.extend([(status_code, reach_broker)] * count)
+    
+    def set_price(self, symbol, price):
+        """Move the market; triggers resting stop/limit legs"""
+        with self.lock:
+            self.prices[symbol] = price
+            for order in list(self.orders.values()):
+                if order.symbol != symbol or order.status != 'new':
+                    continue
+                if order.type == 'stop' and price <= order.stop_price:
+                    self._fill(order, price)
+                elif order.type == 'limit' and order.side == 'sell' and price >= order.limit_price:
+                    self._fill(order, order.limit_price)
+                elif order.type == 'limit' and order.side == 'buy' and price <= order.limit_price:
+                    self._fill(order, order.limit_price)
+    
+    def price(self, symbol):
+        """Last price set for a symbol (None if unknown)"""
+        return self.prices.get(symbol)
+    
+    def _fill(self, order, price):
+        """Fill an order completely; OCO/bracket legs follow"""
+        self._book(order, price)
+        self._settle(order)
+    
+    def submit_order(self, order_data):
+        """Accept a MarketOrderRequest/LimitOrderRequest (bracket/OCO aware)"""
+        with self.lock:
+            client_order_id = self._client_order_id(order_data)
+            
+            failure = self._failures.pop(0) if self._failures else None
+            if failure and not failure[1]:
+                raise FakeAPIError("simulated broker error", status_code=failure[0])
+            
+            symbol = order_data.symbol
+            side = enum_value(order_data.side)
+            order_type = enum_value(order_data.type)
+            limit_price = getattr(order_data, 'limit_price', None)
+            order = self._place(order_data, client_order_id, symbol, float(order_data.qty), side, order_type,
+                                enum_value(order_data.order_class) or 'simple')
+            
+            price = self.price(symbol)
+            if order.order_class == 'oco' or price is None:
+                pass  # OCO exits rest until set_price reaches them
+            elif order_type == 'market':
+                self._fill(order, price)
+            elif order_type == 'limit':
+                if (side == 'buy' and price <= limit_price) or (side == 'sell' and price >= limit_price):
+                    self._fill(order, limit_price)
+            
+            if failure:
+                raise FakeAPIError("simulated timeout after the broker accepted the order", status_code=failure[0])
+            return order
@@ -0,0 +1,443 @@
+"""
+SpineRip Indicator Engine - Incremental Technical Analysis
+Keeps per-symbol indicator state so each scan only processes new bars
+"""
+
+import sys
+from collections import deque
+
+import numpy as np
+
+
+# Columns written by SpineRipAI.analyze_technicals
+INDICATOR_COLUMNS = [
+    'sma_20', 'sma_50', 'ema_12', 'ema_26',
+    'rsi', 'macd', 'macd_signal', 'macd_hist',
+    'bb_upper', 'bb_middle', 'bb_lower',
+    'obv', 'stoch_k', 'stoch_d', 'adx'
+]
+
+NAN = float('nan')
+EPSILON = sys.float_info.epsilon  # pandas-ta replaces zero ranges with this
+
+# Below this many bars the state is built bar by bar instead of from a full pass
+WARMUP_BARS = 60
+
+ALPHA_12 = 2.0 / 13
+ALPHA_26 = 2.0 / 27
+ALPHA_SIGNAL = 2.0 / 10
+ALPHA_WILDER = 1.0 / 14
+
+
+def _rma_last(values, length=14):
+    """Last value of pandas-ta's SMA-seeded Wilder average (rma)"""
+    average = sum(values[:length]) / length
+    for value in values[length:]:
+        average = (1 - ALPHA_WILDER) * average + ALPHA_WILDER * value
+    return average
+
+
+def _wilder_sum_last(values, length=14):
+    """Last value of Wilder's cumulative smoothing used by pandas-ta's ADX"""
+    total = sum(values[:length - 1])
+    for value in values[length - 1:]:
+        total = total - total / length + value
+    return total
+
+
+def _timestamp_keys(df):
+    """Integer keys for the timestamp column (works for tz-aware data too)"""
+    import pandas as pd
+    return pd.DatetimeIndex(df['timestamp']).asi8
+
+
+class IndicatorState:
+    """Rolling indicator state for a single symbol"""
+    
+    def __init__(self):
+        self.count = 0
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        
+        # Trend: running sums and EMA carries
+        self.closes_20 = deque(maxlen=20)
+        self.closes_50 = deque(maxlen=50)
+        self.sum_20 = 0.0
+        self.sum_50 = 0.0
+        self.ema_12 = NAN
+        self.ema_26 = NAN
+        self.macd_sum = 0.0
+        self.macd_signal = NAN
+        
+        # Momentum: Wilder-smoothed gains/losses
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        
+        # Volume
+        self.obv = 0.0
+        
+        # Stochastic windows
+        self.highs_14 = deque(maxlen=14)
+        self.lows_14 = deque(maxlen=14)
+        self.raw_k = deque(maxlen=3)
+        self.stoch_k = deque(maxlen=3)
+        
+        # ADX: Wilder sums of true range and directional movement
+        self.tr_sum = 0.0
+        self.dmp_sum = 0.0
+        self.dmn_sum = 0.0
+        self.dx_sum = 0.0
+        self.dx_count = 0
+        self.adx = NAN
+        
+        # Output history aligned with the last frame seen
+        self.timestamps = None
+        self.columns = None
+    
+    @classmethod
+    def from_frame(cls, df, carry=None):
+        """Build state that continues a frame already run through analyze_technicals (carry: precomputed Wilder sums)"""
+        state = cls()
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        n = len(close)
+        
+        state.count = n
+        state.prev_high = float(high[-1])
+        state.prev_low = float(low[-1])
+        state.prev_close = float(close[-1])
+        
+        state.closes_20.extend(close[-20:].tolist())
+        state.closes_50.extend(close[-50:].tolist())
+        state.sum_20 = sum(state.closes_20)
+        state.sum_50 = sum(state.closes_50)
+        state.ema_12 = float(df['ema_12'].iloc[-1])
+        state.ema_26 = float(df['ema_26'].iloc[-1])
+        state.macd_signal = float(df['macd_signal'].iloc[-1])
+        
+        if carry is None:
+            change = np.diff(close)
+            state.avg_gain = _rma_last(np.where(change > 0, change, 0.0).tolist())
+            state.avg_loss = _rma_last(np.where(change < 0, -change, 0.0).tolist())
+        else:
+            state.avg_gain = float(carry['avg_gain'])
+            state.avg_loss = float(carry['avg_loss'])
+        
+        state.obv = float(df['obv'].iloc[-1])
+        
+        state.highs_14.extend(high[-14:].tolist())
+        state.lows_14.extend(low[-14:].tolist())
+        for i in range(n - 3, n):
+            highest = high[i - 13:i + 1].max()
+            lowest = low[i - 13:i + 1].min()
+            spread = (highest - lowest) or EPSILON
+            state.raw_k.append(100 * (close[i] - lowest) / spread)
+        state.stoch_k.extend(df['stoch_k'].to_numpy(dtype=float)[-3:].tolist())
+        
+        if carry is None:
+            prev_close = close[:-1]
+            spread = high[1:] - low[1:]
+            spread = np.where(spread == 0, EPSILON, spread)
+            true_range = np.maximum.reduce([
+                np.abs(spread), np.abs(high[1:] - prev_close), np.abs(prev_close - low[1:])
+            ])
+            up = high[1:] - high[:-1]
+            down = low[:-1] - low[1:]
+            plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+            minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+            plus_dm[np.abs(plus_dm) < EPSILON] = 0.0
+            minus_dm[np.abs(minus_dm) < EPSILON] = 0.0
+            state.tr_sum = _wilder_sum_last(true_range.tolist())
+            state.dmp_sum = _wilder_sum_last(plus_dm.tolist())
+            state.dmn_sum = _wilder_sum_last(minus_dm.tolist())
+        else:
+            state.tr_sum = float(carry['tr_sum'])
+            state.dmp_sum = float(carry['dmp_sum'])
+            state.dmn_sum = float(carry['dmn_sum'])
+        state.adx = float(df['adx'].iloc[-1])
+        
+        state.timestamps = _timestamp_keys(df)
+        state.columns = {col: df[col].to_numpy(dtype=float) for col in INDICATOR_COLUMNS}
+        return state
+    
+    def to_dict(self):
+        """Rolling values as plain numbers and lists (history arrays are left out)"""
+        fields = {}
+        for name, value in vars(self).items():
+            if name in ('timestamps', 'columns'):
+                continue
+            if isinstance(value, deque):
+                fields[name] = [float(x) for x in value]
+            elif isinstance(value, (int, np.integer)):
+                fields[name] = int(value)
+            else:
+                fields[name] = float(value)
+        return fields
+    
+    @classmethod
+    def from_dict(cls, fields):
+        """Rebuild state saved with to_dict (timestamps/columns stay unset)"""
+        state = cls()
+        for name, value in fields.items():
+            current = getattr(state, name, None)
+            if isinstance(current, deque):
+                current.extend(value)
+            elif name in vars(state):
+                setattr(state, name, value)
+        return state
+    
+    def update(self, high, low, close, volume):
+        """Fold one bar into the state and return its indicator values"""
+        n = self.count
+        self.count = n + 1
+        
+        # Simple moving averages (running sums)
+        if len(self.closes_20) == 20:
+            self.sum_20 -= self.closes_20[0]
+        if len(self.closes_50) == 50:
+            self.sum_50 -= self.closes_50[0]
+        self.closes_20.append(close)
+        self.closes_50.append(close)
+        self.sum_20 += close
+        self.sum_50 += close
+        sma_20 = self.sum_20 / 20 if n >= 19 else NAN
+        sma_50 = self.sum_50 / 50 if n >= 49 else NAN
+        
+        # Exponential moving averages, seeded with the SMA of the first bars
+        if n == 11:
+            self.ema_12 = self.sum_50 / 12
+        elif n > 11:
+            self.ema_12 = ALPHA_12 * close + (1 - ALPHA_12) * self.ema_12
+        if n == 25:
+            self.ema_26 = self.sum_50 / 26
+        elif n > 25:
+            self.ema_26 = ALPHA_26 * close + (1 - ALPHA_26) * self.ema_26
+        
+        # MACD (12/26/9)
+        macd = self.ema_12 - self.ema_26
+        if 25 <= n <= 33:
+            self.macd_sum += macd
+            if n == 33:
+                self.macd_signal = self.macd_sum / 9
+        elif n > 33:
+            self.macd_signal = ALPHA_SIGNAL * macd + (1 - ALPHA_SIGNAL) * self.macd_signal
+        
+        # RSI (Wilder smoothing of gains/losses)
+        rsi = NAN
+        if n >= 1:
+            change = close - self.prev_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            if n <= 14:
+                self.avg_gain += gain
+                self.avg_loss += loss
+                if n == 14:
+                    self.avg_gain /= 14
+                    self.avg_loss /= 14
+            else:
+                self.avg_gain = (1 - ALPHA_WILDER) * self.avg_gain + ALPHA_WILDER * gain
+                self.avg_loss = (1 - ALPHA_WILDER) * self.avg_loss + ALPHA_WILDER * loss
+            if n >= 14:
+                total = self.avg_gain + self.avg_loss
+                rsi = 100 * self.avg_gain / total if total else NAN
+        
+        # Bollinger Bands (20, 2.0)
+        bb_upper = bb_lower = NAN
+        if n >= 19:
+            variance = sum((x - sma_20) ** 2 for x in self.closes_20) / 20
+            deviation = 2.0 * variance ** 0.5
+            bb_upper = sma_20 + deviation
+            bb_lower = sma_20 - deviation
+        
+        # On-Balance Volume
+        if n == 0:
+            self.obv = volume
+        elif close > self.prev_close:
+            self.obv += volume
+        elif close < self.prev_close:
+            self.obv -= volume
+        
+        # Stochastic (14, 3, 3)
+        self.highs_14.append(high)
+        self.lows_14.append(low)
+        stoch_k = stoch_d = NAN
+        if n >= 13:
+            lowest = min(self.lows_14)
+            spread = (max(self.highs_14) - lowest) or EPSILON
+            self.raw_k.append(100 * (close - lowest) / spread)
+            if n >= 15:
+                stoch_k = sum(self.raw_k) / 3
+                self.stoch_k.append(stoch_k)
+                if n >= 17:
+                    stoch_d = sum(self.stoch_k) / 3
+        
+        # ADX (14)
+        if n >= 1:
+            true_range = max(
+                abs((high - low) or EPSILON),
+                abs(high - self.prev_close),
+                abs(self.prev_close - low)
+            )
+            up = high - self.prev_high
+            down = self.prev_low - low
+            plus_dm = up if up > down and up > 0 else 0.0
+            minus_dm = down if down > up and down > 0 else 0.0
+            if abs(plus_dm) < EPSILON:
+                plus_dm = 0.0
+            if abs(minus_dm) < EPSILON:
+                minus_dm = 0.0
+            if n <= 13:
+                self.tr_sum += true_range
+                self.dmp_sum += plus_dm
+                self.dmn_sum += minus_dm
+            else:
+                self.tr_sum = self.tr_sum - self.tr_sum / 14 + true_range
+                self.dmp_sum = self.dmp_sum - self.dmp_sum / 14 + plus_dm
+                self.dmn_sum = self.dmn_sum - self.dmn_sum / 14 + minus_dm
+        if n >= 14:
+            plus_di = 100 * self.dmp_sum / self.tr_sum
+            minus_di = 100 * self.dmn_sum / self.tr_sum
+            di_total = plus_di + minus_di
+            if di_total:
+                dx = 100 * abs(plus_di - minus_di) / di_total
+                if n <= 27:
+                    self.dx_sum += dx
+                    self.dx_count += 1
+                    if n == 27:
+                        self.adx = self.dx_sum / self.dx_count
+                else:
+                    self.adx = (1 - ALPHA_WILDER) * self.adx + ALPHA_WILDER * dx
+        
+        self.prev_high = high
+        self.prev_low = low
+        self.prev_close = close
+        
+        return (
+            sma_20, sma_50, self.ema_12, self.ema_26,
+            rsi, macd, self.macd_signal, macd - self.macd_signal,
+            bb_upper, sma_20, bb_lower,
+            self.obv, stoch_k, stoch_d, self.adx
+        )
+    
+    def update_rows(self, high, low, close, volume):
+        """Fold a batch of bars into the state, returning one array per column"""
+        rows = [
+            self.update(h, l, c, v)
+            for h, l, c, v in zip(high.tolist(), low.tolist(), close.tolist(), volume.tolist())
+        ]
+        values = np.array(rows, dtype=float).reshape(len(rows), len(INDICATOR_COLUMNS))
+        return {col: values[:, i] for i, col in enumerate(INDICATOR_COLUMNS)}
+
+
+class IndicatorEngine:
+    """Incremental indicator engine keyed by symbol"""
+    
+    def __init__(self, analyze_full):
+        """analyze_full computes all indicator columns for a frame from scratch"""
+        self.analyze_full = analyze_full
+        self.states = {}
+    
+    def reset(self, symbol=None):
+        """Drop cached state for one symbol (or all symbols)"""
+        if symbol is None:
+            self.states.clear()
+        else:
+            self.states.pop(symbol, None)
+    
+    def _resume_position(self, state, timestamps):
+        """Number of leading rows already processed, or None if state can't be reused"""
+        if state is None or state.timestamps is None or len(state.timestamps) == 0:
+            return None
+        
+        seen = int(np.searchsorted(timestamps, state.timestamps[-1], side='right'))
+        if seen == 0 or seen > len(state.timestamps):
+            return None
+        if not np.array_equal(timestamps[:seen], state.timestamps[-seen:]):
+            return None
+        return seen
+    
+    def needs_full_pass(self, symbol, df):
+        """True if the next update for this frame would recompute from scratch"""
+        if 'timestamp' not in df.columns or len(df) < WARMUP_BARS:
+            return False
+        return self._resume_position(self.states.get(symbol), _timestamp_keys(df)) is None
+    
+    def adopt(self, symbol, df, carry=None):
+        """Take over a frame whose indicators were computed elsewhere (e.g. a worker process)"""
+        self.states[symbol] = IndicatorState.from_frame(df, carry)
+        return df
+    
+    def update(self, symbol, df):
+        """Add indicator columns to df, only computing bars newer than the last call"""
+        if 'timestamp' not in df.columns or len(df) == 0:
+            return self.analyze_full(df)
+        
+        timestamps = _timestamp_keys(df)
+        state = self.states.get(symbol)
+        seen = self._resume_position(state, timestamps)
+        
+        # Cold start (or history gap): full pass, then keep the rolling state
+        if seen is None:
+            if len(df) >= WARMUP_BARS:
+                df = self.analyze_full(df)
+                self.states[symbol] = IndicatorState.from_frame(df)
+                return df
+            state = IndicatorState()
+            state.timestamps = timestamps[:0]
+            state.columns = {col: np.empty(0) for col in INDICATOR_COLUMNS}
+            self.states[symbol] = state
+            seen = 0
+        
+        # Incremental: only the bars after the last processed timestamp
+        new_rows = df.iloc[seen:]
+        fresh = state.update_rows(
+            new_rows['high'].to_numpy(dtype=float),
+            new_rows['low'].to_numpy(dtype=float),
+            new_rows['close'].to_numpy(dtype=float),
+            new_rows['volume'].to_numpy(dtype=float)
+        )
+        
+        keep = len(state.timestamps) - seen
+        state.timestamps = timestamps
+        for col in INDICATOR_COLUMNS:
+            state.columns[col] = np.concatenate([state.columns[col][keep:], fresh[col]])
+            df[col] = state.columns[col]
+        
+        return df
+    
+    def update_ring(self, ring):
+        """Fill in indicator values for a BarRing's new bars in place; returns its view"""
+        if len(ring) == 0:
+            return ring.view()
+        
+        state = ring.indicator_state
+        if state is None or ring.pending >= len(ring):
+            if len(ring) >= WARMUP_BARS:
+                # Cold start: one full pass, then continue bar by bar
+                df = self.analyze_full(ring.to_frame())
+                window = ring.view()
+                for col in INDICATOR_COLUMNS:
+                    window[col] = df[col].to_numpy(dtype=float)
+                state = IndicatorState.from_frame(df)
+                state.timestamps = state.columns = None  # the ring holds the history
+                ring.indicator_state = state
+                ring.pending = 0
+                return window
+            state = ring.indicator_state = IndicatorState()
+            ring.pending = len(ring)
+        
+        if ring.pending:
+            rows = ring.view(ring.pending)
+            fresh = state.update_rows(
+                rows['high'].astype(float),
+                rows['low'].astype(float),
+                rows['close'].astype(float),
+                rows['volume'].astype(float)
+            )
+            for col in INDICATOR_COLUMNS:
+                rows[col] = fresh[col]
+            ring.pending = 0
+        
+        return ring.view()
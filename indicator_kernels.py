@@ -0,0 +1,323 @@
+"""
+SpineRip Indicator Kernels - Accelerated Recursive Indicators
+NumPy / Numba kernels for EMA, Wilder RSI and ADX, switchable against pandas-ta
+"""
+
+import os
+import importlib.util
+
+import numpy as np
+
+
+# numba is only imported when its kernels are first compiled (it adds ~0.2 s to every start)
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+
+BACKENDS = ['auto', 'numba', 'numpy', 'pandas-ta']
+BACKEND_ENV = 'SPINERIP_INDICATOR_BACKEND'
+
+# Largest growth factor inside one scan block (bounds rounding error to ~1e-12)
+SCAN_RANGE = 1e4
+
+_backend = None
+_numba_kernels = None
+_warned = False
+
+
+def set_backend(name):
+    """Choose the indicator backend ('auto', 'numba', 'numpy' or 'pandas-ta'; None: use the environment)"""
+    global _backend
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"unknown indicator backend {name!r} (expected one of {', '.join(BACKENDS)})")
+    _backend = name
+
+
+def get_backend():
+    """Backend that will actually run: 'auto' prefers numba, then NumPy; missing numba falls back to pandas-ta"""
+    global _warned
+    name = _backend or os.getenv(BACKEND_ENV, 'auto')
+    if name not in BACKENDS:
+        raise ValueError(f"unknown indicator backend {name!r} in {BACKEND_ENV}")
+    
+    if name == 'auto':
+        return 'numba' if HAS_NUMBA else 'numpy'
+    if name == 'numba' and not HAS_NUMBA:
+        if not _warned:
+            print("⚠️  numba is not installed - using pandas-ta indicators")
+            _warned = True
+        return 'pandas-ta'
+    return name
+
+
+# ---------------------------------------------------------------------------
+# NumPy kernels: linear recursions solved blockwise instead of bar by bar
+# ---------------------------------------------------------------------------
+
+def _linear_scan(decay, inputs, initial):
+    """y[t] = decay[t] * y[t-1] + inputs[t] with y[-1] = initial (decay may be a scalar)"""
+    n = len(inputs)
+    if n == 0:
+        return np.empty(0)
+    
+    decay = np.broadcast_to(np.asarray(decay, dtype=float), (n,))
+    smallest = decay.min()
+    block = n if smallest >= 1 else max(1, min(n, int(np.log(SCAN_RANGE) / -np.log(smallest))))
+    pad = (-n) % block
+    shape = (-1, block)
+    decay = np.concatenate([decay, np.ones(pad)]).reshape(shape)
+    inputs = np.concatenate([inputs, np.zeros(pad)]).reshape(shape)
+    
+    # Within a block: y_j = P_j * (carry + sum_k inputs_k / P_k), P_j = decay_0 * ... * decay_j
+    powers = np.cumprod(decay, axis=1)
+    local = np.cumsum(inputs / powers, axis=1) * powers
+    
+    # Across blocks: a short recursion over block ends only
+    carries = np.empty(len(local))
+    carry = initial
+    for i, (growth, end) in enumerate(zip(powers[:, -1].tolist(), local[:, -1].tolist())):
+        carries[i] = carry
+        carry = growth * carry + end
+    
+    return (local + carries[:, None] * powers).ravel()[:n]
+
+
+def _first_valid(values):
+    """Index of the first non-NaN value (len(values) if there is none)"""
+    valid = ~np.isnan(values)
+    return int(np.argmax(valid)) if valid.any() else len(values)
+
+
+def _ema_numpy(values, length):
+    """pandas-ta EMA: SMA seed over the first valid bars, then adjust=False smoothing"""
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    seed = first + length - 1
+    if seed >= len(values):
+        return out
+    
+    alpha = 2.0 / (length + 1)
+    out[seed] = values[first:seed + 1].mean()
+    out[seed + 1:] = _linear_scan(1 - alpha, alpha * values[seed + 1:], out[seed])
+    return out
+
+
+def _wilder_average_numpy(values, length):
+    """Wilder average seeded with the mean of values[1:length + 1] (values[0] has no change)"""
+    out = np.full(len(values), np.nan)
+    if length >= len(values):
+        return out
+    
+    alpha = 1.0 / length
+    out[length] = values[1:length + 1].sum() / length
+    out[length + 1:] = _linear_scan(1 - alpha, alpha * values[length + 1:], out[length])
+    return out
+
+
+def _wilder_sum_numpy(values, length):
+    """Wilder cumulative smoothing used by pandas-ta's ADX (values[1:] are valid)"""
+    out = np.full(len(values), np.nan)
+    if length >= len(values):
+        return out
+    
+    out[length:] = _linear_scan(1 - 1.0 / length, values[length:], values[1:length].sum())
+    return out
+
+
+def _rsi_numpy(close, length=14):
+    """Wilder RSI"""
+    change = np.zeros(len(close))
+    change[1:] = np.diff(close)
+    avg_gain = _wilder_average_numpy(np.where(change > 0, change, 0.0), length)
+    avg_loss = _wilder_average_numpy(np.where(change < 0, -change, 0.0), length)
+    total = avg_gain + avg_loss
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total != 0, 100 * avg_gain / total, np.nan)
+
+
+def _adx_numpy(true_range, plus_dm, minus_dm, length=14):
+    """pandas-ta ADX: Wilder sums of TR/DM, DX averaged over `length` bars, then Wilder-smoothed"""
+    n = len(true_range)
+    adx = np.full(n, np.nan)
+    tr_sum = _wilder_sum_numpy(true_range, length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus_di = 100 * _wilder_sum_numpy(plus_dm, length) / tr_sum
+        minus_di = 100 * _wilder_sum_numpy(minus_dm, length) / tr_sum
+        di_total = plus_di + minus_di
+        dx = np.where(di_total != 0, 100 * np.abs(plus_di - minus_di) / di_total, np.nan)
+    
+    seed = 2 * length - 1
+    if n <= seed:
+        return adx
+    seeds = dx[length:seed + 1]
+    valid = ~np.isnan(seeds)
+    adx[seed] = seeds[valid].sum() / valid.sum() if valid.any() else np.nan
+    
+    # Bars without a DX (flat DI) carry the previous ADX forward
+    rest = dx[seed + 1:]
+    missing = np.isnan(rest)
+    alpha = 1.0 / length
+    adx[seed + 1:] = _linear_scan(
+        np.where(missing, 1.0, 1 - alpha), np.where(missing, 0.0, alpha * rest), adx[seed]
+    )
+    return adx
+
+
+def wilder_last(values, starts, length=14, cumulative=False):
+    """Final Wilder average (cumulative: ADX's Wilder sum) of each (symbols, bars) row whose bars begin at starts[row]"""
+    # Only the last value is needed, so the recursion collapses to one geometric weighting per row
+    n = values.shape[1]
+    bars = np.arange(n)
+    seed_at = starts + length - (1 if cumulative else 0)
+    clean = np.where(np.isnan(values), 0.0, values)
+    
+    seeding = (bars > starts[:, None]) & (bars <= seed_at[:, None])
+    seed = (clean * seeding).sum(axis=1) / (1.0 if cumulative else length)
+    decay = 1 - 1.0 / length
+    weights = decay ** (n - 1 - bars)
+    tail = np.where(bars > seed_at[:, None], clean, 0.0) @ weights
+    last = decay ** (n - 1 - seed_at) * seed + (tail if cumulative else tail / length)
+    return np.where(starts + length < n, last, np.nan)
+
+
+# ---------------------------------------------------------------------------
+# Loop kernels: straight bar-by-bar recursions, compiled with numba.njit
+# ---------------------------------------------------------------------------
+
+def _ema_loop(values, length):
+    """pandas-ta EMA as a single loop"""
+    n = len(values)
+    out = np.full(n, np.nan)
+    first = 0
+    while first < n and np.isnan(values[first]):
+        first += 1
+    seed = first + length - 1
+    if seed >= n:
+        return out
+    
+    total = 0.0
+    for t in range(first, seed + 1):
+        total += values[t]
+    current = total / length
+    out[seed] = current
+    alpha = 2.0 / (length + 1)
+    for t in range(seed + 1, n):
+        current = alpha * values[t] + (1 - alpha) * current
+        out[t] = current
+    return out
+
+
+def _rsi_loop(close, length):
+    """Wilder RSI as a single loop"""
+    n = len(close)
+    out = np.full(n, np.nan)
+    if length >= n:
+        return out
+    
+    avg_gain = 0.0
+    avg_loss = 0.0
+    alpha = 1.0 / length
+    for t in range(1, n):
+        change = close[t] - close[t - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if t < length:
+            avg_gain += gain
+            avg_loss += loss
+            continue
+        if t == length:
+            avg_gain = (avg_gain + gain) / length
+            avg_loss = (avg_loss + loss) / length
+        else:
+            avg_gain = (1 - alpha) * avg_gain + alpha * gain
+            avg_loss = (1 - alpha) * avg_loss + alpha * loss
+        total = avg_gain + avg_loss
+        if total != 0:
+            out[t] = 100 * avg_gain / total
+    return out
+
+
+def _adx_loop(true_range, plus_dm, minus_dm, length):
+    """pandas-ta ADX as a single loop"""
+    n = len(true_range)
+    adx = np.full(n, np.nan)
+    tr_sum = 0.0
+    dmp_sum = 0.0
+    dmn_sum = 0.0
+    dx_sum = 0.0
+    dx_count = 0
+    current = np.nan
+    alpha = 1.0 / length
+    seed = 2 * length - 1
+    
+    for t in range(1, n):
+        if t < length:
+            tr_sum += true_range[t]
+            dmp_sum += plus_dm[t]
+            dmn_sum += minus_dm[t]
+            continue
+        tr_sum = tr_sum - tr_sum / length + true_range[t]
+        dmp_sum = dmp_sum - dmp_sum / length + plus_dm[t]
+        dmn_sum = dmn_sum - dmn_sum / length + minus_dm[t]
+        
+        plus_di = 100 * dmp_sum / tr_sum
+        minus_di = 100 * dmn_sum / tr_sum
+        di_total = plus_di + minus_di
+        has_dx = di_total != 0
+        dx = 100 * abs(plus_di - minus_di) / di_total if has_dx else 0.0
+        if t <= seed:
+            if has_dx:
+                dx_sum += dx
+                dx_count += 1
+            if t == seed:
+                current = dx_sum / dx_count if dx_count else np.nan
+                adx[t] = current
+        else:
+            if has_dx:
+                current = (1 - alpha) * current + alpha * dx
+            adx[t] = current
+    return adx
+
+
+def _get_numba_kernels():
+    """Compile the loop kernels on first use"""
+    global _numba_kernels
+    if _numba_kernels is None:
+        import numba
+        jit = numba.njit(cache=True)
+        _numba_kernels = {'ema': jit(_ema_loop), 'rsi': jit(_rsi_loop), 'adx': jit(_adx_loop)}
+    return _numba_kernels
+
+
+NUMPY_KERNELS = {'ema': _ema_numpy, 'rsi': _rsi_numpy, 'adx': _adx_numpy}
+
+# The loop kernels uncompiled: slow, but checks their logic where numba is missing
+PYTHON_KERNELS = {'ema': _ema_loop, 'rsi': _rsi_loop, 'adx': _adx_loop}
+
+
+def get_kernels(backend=None):
+    """{'ema', 'rsi', 'adx'} kernel functions for a backend, or None when it is pandas-ta"""
+    backend = backend or get_backend()
+    if backend == 'pandas-ta':
+        return None
+    if backend == 'numba':
+        return _get_numba_kernels()
+    if backend == 'python':
+        return PYTHON_KERNELS
+    return NUMPY_KERNELS
+
+
+def available_backends():
+    """Backends that can run here (pandas-ta only if it is installed)"""
+    backends = ['numpy']
+    if HAS_NUMBA:
+        backends.insert(0, 'numba')
+    if importlib.util.find_spec('pandas_ta_classic') is not None:
+        backends.append('pandas-ta')
+    return backends
+
+
+if __name__ == "__main__":
+    # The equivalence check lives with the registry (it needs every indicator, not just the kernels)
+    import sys
+    from indicator_registry import main
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+SpineRip Indicator Registry - On-Demand Technical Analysis
+Declares every indicator with its inputs so callers only pay for the columns they ask for
+"""
+
+import sys
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicator_engine import INDICATOR_COLUMNS
+from indicator_kernels import get_kernels, get_backend, available_backends
+
+
+EPSILON = sys.float_info.epsilon  # pandas-ta replaces zero ranges with this
+
+# Raw bar fields plus the kernel set chosen for this run; everything else is a node
+INPUTS = ['high', 'low', 'close', 'volume', 'kernels']
+
+# name -> (input names, function of those inputs)
+NODES = {}
+
+
+def indicator(name, *inputs):
+    """Register a node computed from raw inputs and/or other nodes"""
+    def register(func):
+        NODES[name] = (inputs, func)
+        return func
+    return register
+
+
+def _windows(values, window):
+    """Trailing windows along the bar (last) axis as a zero-copy (..., bars - window + 1, window) view"""
+    if window > values.shape[-1]:
+        return np.empty(values.shape[:-1] + (0, window))
+    return sliding_window_view(values, window, axis=-1)
+
+
+def _pad(values, n):
+    """Right-align values in n bars along the last axis (leading bars NaN)"""
+    out = np.full(values.shape[:-1] + (n,), np.nan)
+    if values.shape[-1]:
+        out[..., n - values.shape[-1]:] = values
+    return out
+
+
+def _rowwise(kernels, starts):
+    """Run 1-D kernels on each row of (symbols, bars) inputs from the row's first bar (left padding skipped)"""
+    def wrap(kernel):
+        def run(*args):
+            *arrays, length = args
+            out = np.full(arrays[0].shape, np.nan)
+            for row, start in enumerate(starts.tolist()):
+                out[row, start:] = kernel(*[values[row, start:] for values in arrays], length)
+            return out
+        return run
+    return {name: wrap(kernel) for name, kernel in kernels.items()}
+
+
+# Trend: shared close windows, SMAs and EMAs (MACD reuses ema_12/ema_26)
+
+@indicator('close_window_20', 'close')
+def _close_window_20(close):
+    return _windows(close, 20)
+
+
+@indicator('close_window_50', 'close')
+def _close_window_50(close):
+    return _windows(close, 50)
+
+
+@indicator('sma_20', 'close', 'close_window_20')
+def _sma_20(close, windows):
+    return _pad(windows.mean(axis=-1), close.shape[-1])
+
+
+@indicator('sma_50', 'close', 'close_window_50')
+def _sma_50(close, windows):
+    return _pad(windows.mean(axis=-1), close.shape[-1])
+
+
+@indicator('ema_12', 'kernels', 'close')
+def _ema_12(kernels, close):
+    return kernels['ema'](close, 12)
+
+
+@indicator('ema_26', 'kernels', 'close')
+def _ema_26(kernels, close):
+    return kernels['ema'](close, 26)
+
+
+# Momentum
+
+@indicator('rsi', 'kernels', 'close')
+def _rsi(kernels, close):
+    return kernels['rsi'](close, 14)
+
+
+@indicator('macd', 'ema_12', 'ema_26')
+def _macd(ema_12, ema_26):
+    return ema_12 - ema_26
+
+
+@indicator('macd_signal', 'kernels', 'macd')
+def _macd_signal(kernels, macd):
+    return kernels['ema'](macd, 9)
+
+
+@indicator('macd_hist', 'macd', 'macd_signal')
+def _macd_hist(macd, macd_signal):
+    return macd - macd_signal
+
+
+# Volatility: Bollinger Bands (20, 2.0) over the same windows as sma_20
+
+@indicator('bb_deviation', 'close', 'close_window_20', 'sma_20')
+def _bb_deviation(close, windows, sma_20):
+    n = close.shape[-1]
+    centered = windows - sma_20[..., n - windows.shape[-2]:, None]
+    return _pad(2.0 * np.sqrt((centered ** 2).mean(axis=-1)), n)
+
+
+@indicator('bb_upper', 'sma_20', 'bb_deviation')
+def _bb_upper(sma_20, deviation):
+    return sma_20 + deviation
+
+
+@indicator('bb_middle', 'sma_20')
+def _bb_middle(sma_20):
+    return sma_20
+
+
+@indicator('bb_lower', 'sma_20', 'bb_deviation')
+def _bb_lower(sma_20, deviation):
+    return sma_20 - deviation
+
+
+# Volume
+
+@indicator('obv', 'close', 'volume')
+def _obv(close, volume):
+    # A row's first bar (no previous close) counts its whole volume; left padding stays NaN
+    direction = np.sign(np.diff(close, axis=-1, prepend=np.nan))
+    signed = np.where(np.isnan(direction), volume, direction * volume)
+    obv = np.nancumsum(signed, axis=-1)
+    obv[np.isnan(close)] = np.nan
+    return obv
+
+
+@indicator('volume_sma_20', 'volume')
+def _volume_sma_20(volume):
+    return _pad(_windows(volume, 20).mean(axis=-1), volume.shape[-1])
+
+
+@indicator('prev_close', 'close')
+def _prev_close(close):
+    return _pad(close[..., :-1], close.shape[-1])
+
+
+# Stochastic (14, 3, 3)
+
+@indicator('highest_14', 'high')
+def _highest_14(high):
+    return _pad(_windows(high, 14).max(axis=-1), high.shape[-1])
+
+
+@indicator('lowest_14', 'low')
+def _lowest_14(low):
+    return _pad(_windows(low, 14).min(axis=-1), low.shape[-1])
+
+
+@indicator('stoch_raw_k', 'close', 'highest_14', 'lowest_14')
+def _stoch_raw_k(close, highest, lowest):
+    spread = highest - lowest
+    spread = np.where(spread == 0, EPSILON, spread)
+    return 100 * (close - lowest) / spread
+
+
+@indicator('stoch_k', 'stoch_raw_k')
+def _stoch_k(raw_k):
+    return _pad(_windows(raw_k, 3).mean(axis=-1), raw_k.shape[-1])
+
+
+@indicator('stoch_d', 'stoch_k')
+def _stoch_d(stoch_k):
+    return _pad(_windows(stoch_k, 3).mean(axis=-1), stoch_k.shape[-1])
+
+
+# ADX (14) from true range and directional movement
+
+@indicator('directional_movement', 'high', 'low', 'close')
+def _directional_movement(high, low, close):
+    true_range = np.zeros(close.shape)
+    plus_dm = np.zeros(close.shape)
+    minus_dm = np.zeros(close.shape)
+    bar_range = high[..., 1:] - low[..., 1:]
+    bar_range = np.where(bar_range == 0, EPSILON, bar_range)
+    prev_close = close[..., :-1]
+    true_range[..., 1:] = np.maximum.reduce([
+        np.abs(bar_range), np.abs(high[..., 1:] - prev_close), np.abs(prev_close - low[..., 1:])
+    ])
+    up = high[..., 1:] - high[..., :-1]
+    down = low[..., :-1] - low[..., 1:]
+    plus_dm[..., 1:] = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm[..., 1:] = np.where((down > up) & (down > 0), down, 0.0)
+    plus_dm[np.abs(plus_dm) < EPSILON] = 0.0
+    minus_dm[np.abs(minus_dm) < EPSILON] = 0.0
+    return true_range, plus_dm, minus_dm
+
+
+@indicator('true_range', 'directional_movement')
+def _true_range(movement):
+    return movement[0]
+
+
+@indicator('plus_dm', 'directional_movement')
+def _plus_dm(movement):
+    return movement[1]
+
+
+@indicator('minus_dm', 'directional_movement')
+def _minus_dm(movement):
+    return movement[2]
+
+
+@indicator('adx', 'kernels', 'true_range', 'plus_dm', 'minus_dm')
+def _adx(kernels, true_range, plus_dm, minus_dm):
+    return kernels['adx'](true_range, plus_dm, minus_dm, 14)
+
+
+def plan(columns=None):
+    """Nodes needed for `columns` (default: every analyze_technicals column), dependencies first"""
+    order = []
+    seen = set(INPUTS)
+    
+    def visit(name):
+        if name in seen:
+            return
+        if name not in NODES:
+            raise ValueError(f"unknown indicator {name!r} (known: {', '.join(NODES)})")
+        seen.add(name)
+        for dependency in NODES[name][0]:
+            visit(dependency)
+        order.append(name)
+    
+    for column in INDICATOR_COLUMNS if columns is None else columns:
+        visit(column)
+    return order
+
+
+def compute_indicators(high, low, close, volume, columns=None, backend=None):
+    """{column: array} for the requested columns; shared nodes (EMAs, windows, true range) run once"""
+    # Inputs are one symbol's bars or a (symbols, bars) batch whose shorter rows are left-padded with NaN
+    columns = INDICATOR_COLUMNS if columns is None else list(columns)
+    order = plan(columns)
+    kernels = get_kernels(backend)
+    if kernels is None and any('kernels' in NODES[name][0] for name in order):
+        raise ValueError("the pandas-ta backend has no registry kernels (use compute_technicals)")
+    
+    close = np.ascontiguousarray(close, dtype=float)
+    if close.ndim == 2 and kernels is not None:
+        # Windowed nodes run on the whole batch; the recursive kernels run row by row
+        kernels = _rowwise(kernels, np.argmax(~np.isnan(close), axis=1))
+    
+    values = {
+        'high': np.ascontiguousarray(high, dtype=float),
+        'low': np.ascontiguousarray(low, dtype=float),
+        'close': close,
+        'volume': np.ascontiguousarray(volume, dtype=float),
+        'kernels': kernels
+    }
+    for name in order:
+        inputs, func = NODES[name]
+        values[name] = func(*[values[i] for i in inputs])
+    
+    return {column: values[column] for column in columns}
+
+
+def compute_frame(df, columns=None, backend=None):
+    """compute_indicators for a bar DataFrame"""
+    return compute_indicators(df['high'], df['low'], df['close'], df['volume'], columns=columns, backend=backend)
+
+
+# ---------------------------------------------------------------------------
+# Numerical equivalence check
+# ---------------------------------------------------------------------------
+
+def _reference_columns(df):
+    """Every column straight from pandas-ta (None when the frame is too short for it)"""
+    from trading_ai import pandas_ta_technicals
+    try:
+        df = pandas_ta_technicals(df.copy())
+    except TypeError:
+        return None  # pandas-ta returns None instead of NaN columns below its window lengths
+    return {col: df[col].to_numpy(dtype=float) for col in INDICATOR_COLUMNS}
+
+
+def equivalence_frames(seed=7):
+    """Frames that exercise warm-up edges, flat prices and long histories"""
+    from bar_cache import BARS_PER_DAY
+    from synthetic_data import SyntheticMarketData
+    
+    history = SyntheticMarketData(seed=seed).generate('CHECK', days=6)
+    frames = {f"bars={n}": history.iloc[-n:].reset_index(drop=True) for n in [1, 13, 14, 15, 27, 28, 34, 60]}
+    frames[f"bars={5 * BARS_PER_DAY}"] = history.iloc[-5 * BARS_PER_DAY:].reset_index(drop=True)
+    
+    flat = history.iloc[-120:].reset_index(drop=True)
+    flat.loc[40:80, ['open', 'high', 'low', 'close']] = 100.0
+    frames['flat'] = flat
+    return frames
+
+
+def check_equivalence(tolerance=1e-9, backends=None, reference=None, frames=None):
+    """Largest deviation of each backend from the reference: ({backend: {column: max abs diff}}, reference, failures)"""
+    backends = backends or [b for b in available_backends() if b != 'pandas-ta'] + ['python']
+    reference = reference or ('pandas-ta' if 'pandas-ta' in available_backends() else 'numpy')
+    frames = frames or equivalence_frames()
+    
+    def columns_for(backend, df):
+        if backend == 'pandas-ta':
+            return _reference_columns(df)
+        return compute_frame(df, backend=backend)
+    
+    deviations = {}
+    for backend in backends:
+        if backend == reference:
+            continue
+        worst = dict.fromkeys(INDICATOR_COLUMNS, 0.0)
+        for df in frames.values():
+            expected = columns_for(reference, df)
+            if expected is None:
+                continue
+            actual = columns_for(backend, df)
+            for col in INDICATOR_COLUMNS:
+                same_gaps = np.array_equal(np.isnan(expected[col]), np.isnan(actual[col]))
+                diff = np.nanmax(np.abs(expected[col] - actual[col]), initial=0.0) if same_gaps else np.inf
+                worst[col] = max(worst[col], float(diff))
+        deviations[backend] = worst
+    
+    failures = [(b, col) for b, cols in deviations.items() for col, diff in cols.items() if diff > tolerance]
+    return deviations, reference, failures
+
+
+def main():
+    """Print each backend's deviation from pandas-ta (or NumPy when pandas-ta is missing); exit 1 on mismatch"""
+    print(f"\n🔬 Indicator backend equivalence (active backend: {get_backend()})\n")
+    deviations, reference, failures = check_equivalence()
+    
+    for backend, columns in deviations.items():
+        print(f"  {backend} vs {reference}:")
+        for col, diff in columns.items():
+            status = "❌" if (backend, col) in failures else "✅"
+            print(f"    {status} {col:12} max |diff| = {diff:.3e}")
+    
+    if failures:
+        print(f"\n❌ {len(failures)} column(s) differ from {reference}")
+        return 1
+    print(f"\n✅ All backends match {reference}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
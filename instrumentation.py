@@ -0,0 +1,282 @@
+"""
+SpineRip Instrumentation - Stage Timers, Counters & Profiling
+Latency histograms per bot stage and symbol, exportable as JSON or Prometheus text
+"""
+
+import io
+import json
+import time
+import bisect
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf implied)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+    
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+    
+    def observe(self, seconds):
+        """Record one duration"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+    
+    def quantile(self, q):
+        """Upper bucket bound containing the q-th quantile (max for the +Inf bucket)"""
+        if self.count == 0:
+            return 0.0
+        
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= target:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self):
+        """Summary statistics plus cumulative bucket counts"""
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            cumulative.append([bound, running])
+        
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': cumulative
+        }
+
+
+class _Timer:
+    """Context manager that records its duration into an Instrumentation"""
+    
+    __slots__ = ('owner', 'stage', 'symbol', 'started')
+    
+    def __init__(self, owner, stage, symbol):
+        self.owner = owner
+        self.stage = stage
+        self.symbol = symbol
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.owner.observe(self.stage, time.perf_counter() - self.started, self.symbol)
+        return False
+
+
+class Instrumentation:
+    """Per-stage/per-symbol timers and counters (no-ops while disabled)"""
+    
+    def __init__(self, enabled=False, namespace='spinerip'):
+        """Initialize empty metrics"""
+        self.enabled = enabled
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.symbols = {}
+        self.counters = {}
+        self.last_profile = None
+        self._profile_armed = None
+    
+    def enable(self):
+        """Start recording"""
+        self.enabled = True
+    
+    def disable(self):
+        """Stop recording (timers become no-ops)"""
+        self.enabled = False
+    
+    def reset(self):
+        """Clear all recorded metrics"""
+        with self.lock:
+            self.stages.clear()
+            self.symbols.clear()
+            self.counters.clear()
+    
+    def timer(self, stage, symbol=None):
+        """with instrumentation.timer('fetch', symbol): ..."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage, symbol)
+    
+    def observe(self, stage, seconds, symbol=None):
+        """Record a duration for a stage (and symbol)"""
+        if not self.enabled:
+            return
+        
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+            
+            if symbol is not None:
+                key = (stage, symbol)
+                histogram = self.symbols.get(key)
+                if histogram is None:
+                    histogram = self.symbols[key] = Histogram()
+                histogram.observe(seconds)
+    
+    def count(self, name, value=1, symbol=None):
+        """Increment a counter"""
+        if not self.enabled:
+            return
+        
+        with self.lock:
+            key = (name, symbol)
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def profile_next_cycle(self, path=None, tool='cprofile'):
+        """Capture a profile of the next profile_cycle() block"""
+        self._profile_armed = (path, tool)
+    
+    def profile_cycle(self):
+        """Wrap one scan cycle; profiles it only if profile_next_cycle was called"""
+        if self._profile_armed is None:
+            return _NULL_TIMER
+        
+        path, tool = self._profile_armed
+        self._profile_armed = None
+        return self.profile(path, tool)
+    
+    @contextmanager
+    def profile(self, path=None, tool='cprofile'):
+        """Profile the block with cProfile (or pyinstrument when installed and requested)"""
+        if tool == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("⚠️  pyinstrument not installed - using cProfile")
+                tool = 'cprofile'
+        
+        if tool == 'pyinstrument':
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield profiler
+            finally:
+                profiler.stop()
+                self.last_profile = profiler.output_text()
+                if path:
+                    with open(path, 'w') as f:
+                        f.write(profiler.output_html() if path.endswith('.html') else self.last_profile)
+            return
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(25)
+            self.last_profile = output.getvalue()
+            if path:
+                profiler.dump_stats(path)
+    
+    def snapshot(self):
+        """All metrics as a plain dict"""
+        with self.lock:
+            symbols = {}
+            for (stage, symbol), histogram in self.symbols.items():
+                symbols.setdefault(symbol, {})[stage] = histogram.to_dict()
+            
+            counters = {}
+            for (name, symbol), value in self.counters.items():
+                counters[name] = counters.get(name, 0) + value
+                if symbol is not None:
+                    counters.setdefault(name + '_by_symbol', {})[symbol] = value
+            
+            return {
+                'stages': {stage: histogram.to_dict() for stage, histogram in self.stages.items()},
+                'symbols': symbols,
+                'counters': counters
+            }
+    
+    def to_json(self, path=None):
+        """Metrics as JSON (written to path if given)"""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+    
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        prefix = self.namespace
+        lines = []
+        
+        with self.lock:
+            stage_items = sorted(self.stages.items())
+            symbol_items = sorted(self.symbols.items())
+            counter_items = sorted(self.counters.items(), key=lambda item: (item[0][0], item[0][1] or ''))
+        
+        def histogram_lines(name, labels, histogram):
+            running = 0
+            for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                running += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        
+        if stage_items:
+            lines.append(f'# HELP {prefix}_stage_seconds Latency of each bot stage')
+            lines.append(f'# TYPE {prefix}_stage_seconds histogram')
+            for stage, histogram in stage_items:
+                histogram_lines(f'{prefix}_stage_seconds', f'stage="{stage}"', histogram)
+        
+        if symbol_items:
+            lines.append(f'# HELP {prefix}_symbol_stage_seconds Latency of each bot stage per symbol')
+            lines.append(f'# TYPE {prefix}_symbol_stage_seconds histogram')
+            for (stage, symbol), histogram in symbol_items:
+                histogram_lines(f'{prefix}_symbol_stage_seconds', f'stage="{stage}",symbol="{symbol}"', histogram)
+        
+        declared = set()
+        for (name, symbol), value in counter_items:
+            metric = f'{prefix}_{name}_total'
+            if metric not in declared:
+                lines.append(f'# TYPE {metric} counter')
+                declared.add(metric)
+            labels = f'{{symbol="{symbol}"}}' if symbol is not None else ''
+            lines.append(f'{metric}{labels} {value}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def summary(self):
+        """One line per stage: count, mean and p95 in milliseconds"""
+        rows = []
+        with self.lock:
+            for stage, histogram in sorted(self.stages.items(), key=lambda item: -item[1].sum):
+                stats = histogram.to_dict()
+                rows.append(
+                    f"{stage:16} n={stats['count']:<6} mean={stats['mean'] * 1000:8.2f} ms  "
+                    f"p95≤{stats['p95'] * 1000:8.2f} ms  total={stats['sum']:.2f} s"
+                )
+        return rows
@@ -0,0 +1,213 @@
+"""
+SpineRip Market Scanner - Universe Screener
+Ranks thousands of symbols on cheap prefilters so only the top candidates get the full analysis
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import EXTENDED_BARS_PER_DAY, session_bounds
+
+
+SCREEN_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+FEATURES = ['price', 'dollar_volume', 'relative_volume', 'gap_pct', 'atr_pct', 'rsi']
+
+# Percentile ranks blended into the score (the filters below decide who is ranked at all)
+DEFAULT_WEIGHTS = {
+    'relative_volume': 1.0,  # volume picking up vs the rest of the window
+    'gap': 1.0,  # |open vs previous session close|
+    'atr_pct': 1.0,  # room to move
+    'rsi_extreme': 1.0  # |RSI - 50|: oversold or overbought
+}
+
+# Listing venues kept from the Alpaca asset list (OTC names are skipped)
+EXCHANGES = {'NYSE', 'NASDAQ', 'ARCA', 'AMEX', 'BATS'}
+
+
+def _stack(bars, window):
+    """Group symbols by (clipped) bar count; yield (symbols, {field: (symbols, bars) array}, session edges)"""
+    groups = {}
+    first = last = None
+    for symbol, records in bars.items():
+        if len(records):
+            length = min(len(records), window)
+            groups.setdefault(length, []).append(symbol)
+            start, end = int(records['timestamp'][-length]), int(records['timestamp'][-1])
+            first = start if first is None else min(first, start)
+            last = end if last is None else max(last, end)
+    if not groups:
+        return
+    
+    # Bar positions of each session's open and close per symbol, behind an empty session so none is missing
+    bounds = np.concatenate([[first, first], session_bounds(first, last).ravel()])
+    for length, symbols in groups.items():
+        arrays = {field: np.empty((len(symbols), length)) for field in SCREEN_FIELDS}
+        edges = np.empty((len(symbols), len(bounds)), dtype=np.int64)
+        for row, symbol in enumerate(symbols):
+            tail = bars[symbol][-length:]
+            for field in SCREEN_FIELDS:
+                arrays[field][row] = tail[field]
+            edges[row] = np.searchsorted(tail['timestamp'], bounds)
+        yield symbols, arrays, edges.reshape(len(symbols), -1, 2)
+
+
+def compute_features(bars, window=2 * EXTENDED_BARS_PER_DAY, recent=30, length=14):
+    """Prefilter features for {symbol: bar records}, vectorized across symbols; returns (symbols, {feature: array})"""
+    all_symbols = []
+    parts = {feature: [] for feature in FEATURES}
+    
+    for symbols, x, edges in _stack(bars, window):
+        n_symbols, n_bars = x['close'].shape
+        rows = np.arange(n_symbols)
+        close = x['close']
+        price = close[:, -1]
+        
+        # Latest session: the 9:30-16:00 bars of the last New York weekday that has any; the previous
+        # close ends the session before it (extended-hours bars count toward neither)
+        starts, ends = edges[:, :, 0], edges[:, :, 1]
+        sessions = np.arange(starts.shape[1])
+        traded = ends > starts
+        latest = np.where(traded, sessions, 0).max(axis=1)
+        previous = np.where(traded & (sessions < latest[:, None]), sessions, 0).max(axis=1)
+        session_start, session_end = starts[rows, latest], ends[rows, latest]
+        columns = np.arange(n_bars)
+        in_session = (columns >= session_start[:, None]) & (columns < session_end[:, None])
+        dollar_volume = np.where(in_session, close * x['volume'], 0.0).sum(axis=1)
+        has_previous = previous > 0
+        previous_close = close[rows, np.maximum(ends[rows, previous] - 1, 0)]
+        session_open = x['open'][rows, session_start]
+        gap_pct = np.where(has_previous, (session_open / previous_close - 1) * 100, np.nan)
+        
+        # Volume in the last `recent` bars vs the window's average per `recent` bars
+        window_volume = x['volume'].sum(axis=1)
+        recent_volume = x['volume'][:, -recent:].sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative_volume = recent_volume / (window_volume * min(recent, n_bars) / n_bars)
+        
+        # Simple-average ATR and RSI over the last `length` bars (screening only, not Wilder-smoothed)
+        if n_bars > length:
+            tail = slice(n_bars - length, n_bars)
+            prev = close[:, n_bars - length - 1:n_bars - 1]
+            true_range = np.maximum.reduce([
+                x['high'][:, tail] - x['low'][:, tail],
+                np.abs(x['high'][:, tail] - prev),
+                np.abs(x['low'][:, tail] - prev)
+            ])
+            atr_pct = true_range.mean(axis=1) / price * 100
+            change = close[:, tail] - prev
+            gains = np.clip(change, 0, None).sum(axis=1)
+            losses = np.clip(-change, 0, None).sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = np.where(gains + losses > 0, 100 * gains / (gains + losses), 50.0)
+        else:
+            atr_pct = np.full(n_symbols, np.nan)
+            rsi = np.full(n_symbols, np.nan)
+        
+        all_symbols.extend(symbols)
+        for feature, values in zip(FEATURES, [price, dollar_volume, relative_volume, gap_pct, atr_pct, rsi]):
+            parts[feature].append(values)
+    
+    features = {
+        feature: np.concatenate(values) if values else np.empty(0)
+        for feature, values in parts.items()
+    }
+    return all_symbols, features
+
+
+def _percentile(values):
+    """Rank of each value in [0, 1] (ties broken by position)"""
+    if len(values) < 2:
+        return np.ones(len(values))
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind='stable')] = np.arange(len(values))
+    return ranks / (len(values) - 1)
+
+
+def rank_features(symbols, features, min_price=5.0, max_price=None, min_dollar_volume=1_000_000, weights=None):
+    """DataFrame of symbols passing the filters, best score first"""
+    weights = weights or DEFAULT_WEIGHTS
+    table = pd.DataFrame(features, index=pd.Index(symbols, name='symbol'))
+    keep = (table['price'] >= min_price) & (table['dollar_volume'] >= min_dollar_volume)
+    if max_price is not None:
+        keep &= table['price'] <= max_price
+    table = table[keep].copy()
+    
+    signals = {
+        'relative_volume': table['relative_volume'].fillna(0).to_numpy(),
+        'gap': table['gap_pct'].abs().fillna(0).to_numpy(),
+        'atr_pct': table['atr_pct'].fillna(0).to_numpy(),
+        'rsi_extreme': (table['rsi'] - 50).abs().fillna(0).to_numpy()
+    }
+    total = sum(weights.values()) or 1.0
+    score = sum(weight * _percentile(signals[name]) for name, weight in weights.items())
+    table['score'] = np.round(score / total * 100, 1)
+    return table.sort_values('score', ascending=False, kind='stable')
+
+
+class MarketScanner:
+    """Screens a universe on prefilters from recent cached bars and hands the top N to the full pipeline"""
+    
+    def __init__(self, ai, top_n=20, screen_days=2, min_price=5.0, min_dollar_volume=1_000_000,
+                 weights=None, demo_universe_size=1000):
+        """ai: SpineRipAI for universe and bars; screen_days of minute bars feed the prefilters"""
+        self.ai = ai
+        self.top_n = top_n
+        self.screen_days = screen_days
+        self.min_price = min_price
+        self.max_price = None
+        self.min_dollar_volume = min_dollar_volume
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.demo_universe_size = demo_universe_size
+        self.last_ranking = None
+        self._universe = None
+        self._universe_day = None
+    
+    def universe(self):
+        """Tradable US equities (fetched once per day; demo: generated tickers)"""
+        today = datetime.now().date()
+        if self._universe is not None and self._universe_day == today:
+            return self._universe
+        
+        if self.ai.demo_mode:
+            symbols = [f"DEMO{i:04d}" for i in range(self.demo_universe_size)]
+        else:
+            from alpaca.trading.requests import GetAssetsRequest
+            from alpaca.trading.enums import AssetClass, AssetStatus
+            assets = self.ai.trading_client.get_all_assets(
+                GetAssetsRequest(status=AssetStatus.ACTIVE, asset_class=AssetClass.US_EQUITY)
+            )
+            symbols = sorted(
+                asset.symbol for asset in assets
+                if asset.tradable and str(getattr(asset.exchange, 'value', asset.exchange)) in EXCHANGES
+            )
+        
+        self._universe = symbols
+        self._universe_day = today
+        return symbols
+    
+    def rank(self, bars):
+        """Every screened symbol ({symbol: bar records}) with its features and score, best first"""
+        symbols, features = compute_features(bars, window=self.screen_days * EXTENDED_BARS_PER_DAY)
+        self.last_ranking = rank_features(
+            symbols, features, min_price=self.min_price, max_price=self.max_price,
+            min_dollar_volume=self.min_dollar_volume, weights=self.weights
+        )
+        return self.last_ranking
+    
+    def scan(self, fetch=None, symbols=None):
+        """Top-N symbols for this cycle; fetch(symbols, days) -> {symbol: bar records} (default: the AI's)"""
+        symbols = symbols if symbols is not None else self.universe()
+        fetch = fetch or (lambda batch, days: self.ai.get_bar_records_many(batch, days=days))
+        return list(self.rank(fetch(symbols, self.screen_days)).index[:self.top_n])
+    
+    def report(self, count=None):
+        """Print the top of the last ranking"""
+        if self.last_ranking is None:
+            return
+        count = count or self.top_n
+        print(f"🔎 Screened {len(self.last_ranking)} symbols, top {min(count, len(self.last_ranking))}:")
+        for symbol, row in self.last_ranking.head(count).iterrows():
+            print(f"  {symbol:6} score {row['score']:5.1f} | ${row['price']:8.2f} | gap {row['gap_pct']:+6.2f}% | "
+                  f"rvol {row['relative_volume']:4.1f} | ATR {row['atr_pct']:.2f}% | RSI {row['rsi']:5.1f}")
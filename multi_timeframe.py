@@ -0,0 +1,159 @@
+"""
+SpineRip Multi-Timeframe - Resampled Bar Cache
+Folds minute bars into 5m/15m/1h bars incrementally and keeps indicators per timeframe
+"""
+
+import threading
+
+import numpy as np
+
+from bar_buffer import BarRing
+
+
+NS_PER_MINUTE = 60_000_000_000
+
+# Timeframe name -> minutes per bar (buckets are aligned to the epoch, like Alpaca's bars)
+TIMEFRAMES = {'5Min': 5, '15Min': 15, '30Min': 30, '1Hour': 60}
+DEFAULT_TIMEFRAMES = ['5Min', '15Min', '1Hour']
+
+
+def resample_arrays(timestamps, open_, high, low, close, volume, minutes):
+    """OHLCV arrays (sorted by time) -> one bar per `minutes` bucket, stamped with the bucket start"""
+    step = minutes * NS_PER_MINUTE
+    buckets = timestamps // step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(timestamps)] - 1
+    return {
+        'timestamp': buckets[starts] * step,
+        'open': open_[starts],
+        'high': np.maximum.reduceat(high, starts),
+        'low': np.minimum.reduceat(low, starts),
+        'close': close[ends],
+        'volume': np.add.reduceat(volume, starts)
+    }
+
+
+def _minute_arrays(bars):
+    """(timestamps ns, open, high, low, close, volume) from a bars DataFrame or BAR_DTYPE records"""
+    if hasattr(bars, 'columns'):
+        import pandas as pd
+        timestamps = pd.DatetimeIndex(bars['timestamp']).as_unit('ns').asi8
+        return (timestamps,) + tuple(bars[f].to_numpy(dtype=float) for f in ('open', 'high', 'low', 'close', 'volume'))
+    return (np.asarray(bars['timestamp'], dtype=np.int64),) + tuple(
+        np.asarray(bars[f], dtype=float) for f in ('open', 'high', 'low', 'close', 'volume')
+    )
+
+
+def confirms(confidence, higher, timeframes):
+    """True when every timeframe's confidence ({timeframe: confidence}) leans the same way as `confidence`"""
+    if confidence > 0:
+        return all(higher.get(timeframe, 0) > 0 for timeframe in timeframes)
+    if confidence < 0:
+        return all(higher.get(timeframe, 0) < 0 for timeframe in timeframes)
+    return True
+
+
+class TimeframeResampler:
+    """One symbol's bars on one higher timeframe: completed bars in a BarRing, the open bucket held aside"""
+    
+    def __init__(self, minutes, capacity=500):
+        """Keep the newest `capacity` completed bars (enough for every indicator's warm-up)"""
+        self.minutes = minutes
+        self.step = minutes * NS_PER_MINUTE
+        self.ring = BarRing(capacity, value_dtype=np.float64)
+        self.partial = None  # {field: value} of the bucket still filling up
+        self.last_minute = None  # newest minute bar folded in (ns)
+    
+    def update(self, timestamps, open_, high, low, close, volume):
+        """Fold in minute bars newer than the last call; returns the number of bars completed"""
+        if self.last_minute is not None:
+            first = int(np.searchsorted(timestamps, self.last_minute, side='right'))
+            if first:
+                timestamps, open_, high, low, close, volume = (
+                    values[first:] for values in (timestamps, open_, high, low, close, volume)
+                )
+        if len(timestamps) == 0:
+            return 0
+        
+        # The open bucket rejoins as a leading pseudo-bar so it merges with (or closes before) the new rows
+        if self.partial is not None:
+            p = self.partial
+            timestamps = np.r_[p['timestamp'], timestamps]
+            open_ = np.r_[p['open'], open_]
+            high = np.r_[p['high'], high]
+            low = np.r_[p['low'], low]
+            close = np.r_[p['close'], close]
+            volume = np.r_[p['volume'], volume]
+        
+        bars = resample_arrays(timestamps, open_, high, low, close, volume, self.minutes)
+        self.last_minute = int(timestamps[-1])
+        
+        # Every bucket but the last is closed; the last closes with its final minute
+        complete = len(bars['timestamp'])
+        if self.last_minute + NS_PER_MINUTE < bars['timestamp'][-1] + self.step:
+            complete -= 1
+            self.partial = {field: values[-1] for field, values in bars.items()}
+        else:
+            self.partial = None
+        
+        if complete <= 0:
+            return 0
+        return self.ring.append_many(*(bars[f][:complete] for f in ('timestamp', 'open', 'high', 'low', 'close', 'volume')))
+    
+    def view(self):
+        """Completed bars (with indicator columns once analyzed)"""
+        return self.ring.view()
+
+
+class MultiTimeframe:
+    """Per-symbol, per-timeframe resampled bars with incremental indicators"""
+    
+    def __init__(self, indicator_engine, timeframes=None, capacity=500):
+        """indicator_engine: IndicatorEngine whose update_ring fills each timeframe's indicators"""
+        self.indicator_engine = indicator_engine
+        self.timeframes = list(timeframes or DEFAULT_TIMEFRAMES)
+        self.capacity = capacity
+        self.resamplers = {}  # symbol -> {timeframe: TimeframeResampler}
+        self.lock = threading.Lock()
+    
+    def _resamplers(self, symbol, timeframes):
+        """A symbol's resamplers for these timeframes (created on first use)"""
+        with self.lock:
+            per_symbol = self.resamplers.setdefault(symbol, {})
+            for timeframe in timeframes:
+                if timeframe not in TIMEFRAMES:
+                    raise ValueError(f"unknown timeframe {timeframe!r} (known: {', '.join(TIMEFRAMES)})")
+                if timeframe not in per_symbol:
+                    per_symbol[timeframe] = TimeframeResampler(TIMEFRAMES[timeframe], self.capacity)
+            return {timeframe: per_symbol[timeframe] for timeframe in timeframes}
+    
+    def update(self, symbol, bars, timeframes=None):
+        """Fold a symbol's minute bars (DataFrame or records) into each timeframe; returns bars completed per timeframe"""
+        resamplers = self._resamplers(symbol, timeframes or self.timeframes)
+        arrays = _minute_arrays(bars)
+        added = {}
+        for timeframe, resampler in resamplers.items():
+            with resampler.ring.lock:
+                added[timeframe] = resampler.update(*arrays)
+        return added
+    
+    def analyze(self, symbol, bars=None, timeframes=None):
+        """{timeframe: completed bars with indicators} (bars: new minute bars to fold in first)"""
+        timeframes = timeframes or self.timeframes
+        if bars is not None:
+            self.update(symbol, bars, timeframes)
+        
+        views = {}
+        for timeframe, resampler in self._resamplers(symbol, timeframes).items():
+            with resampler.ring.lock:
+                views[timeframe] = self.indicator_engine.update_ring(resampler.ring)
+        return views
+    
+    def drop(self, symbol):
+        """Forget a symbol's resampled bars"""
+        with self.lock:
+            self.resamplers.pop(symbol, None)
+    
+    def frame(self, symbol, timeframe):
+        """Completed bars of one timeframe as a DataFrame"""
+        return self._resamplers(symbol, [timeframe])[timeframe].ring.to_frame()
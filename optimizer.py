@@ -0,0 +1,494 @@
+"""
+SpineRip Optimizer - Parameter Sweeps Over Bot Settings
+Grid, random and Bayesian (TPE) search on cached bars, validated walk-forward and run across cores
+"""
+
+import os
+import math
+import random
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+from indicator_kernels import get_backend, get_kernels
+from indicator_registry import compute_indicators
+from strategy_engine import DEFAULT_STRATEGY, FRAME_FIELDS, SESSION_FIELDS, get_strategy, session_columns, strategy_columns
+
+
+# Settings that only change entries/exits: every configuration reuses the same confidence arrays
+TRADING_PARAMETERS = [
+    'confidence_threshold', 'stop_loss_percent', 'take_profit_percent', 'position_size_percent', 'max_trades_per_day'
+]
+
+# Swept indicator lengths -> default (analyze_technicals' constant); each rewrites one column in place,
+# so strategy rules read it unchanged and every other indicator is shared across lengths
+INDICATOR_PARAMETERS = {
+    'rsi_length': 14,  # rsi
+    'sma_fast': 20,  # sma_20 (Bollinger Bands keep 20)
+    'sma_slow': 50,  # sma_50
+    'adx_length': 14  # adx
+}
+
+# Registry nodes kept so tuned columns recompute from shared inputs
+TUNING_NODES = ['true_range', 'plus_dm', 'minus_dm']
+
+# 7 * 4 * 4 * 4 * 2 * 3 * 2 = 5376 configurations
+DEFAULT_SPACE = {
+    'confidence_threshold': [15, 20, 25, 30, 35, 40, 45],
+    'stop_loss_percent': [1, 1.5, 2, 3],
+    'take_profit_percent': [2, 3, 4, 6],
+    'position_size_percent': [5, 10, 15, 20],
+    'max_trades_per_day': [5, 10],
+    'rsi_length': [10, 14, 21],
+    'sma_fast': [10, 20]
+}
+
+METHODS = ['grid', 'random', 'bayes']
+RESULT_FIELDS = ['return_pct', 'max_drawdown_pct', 'win_rate', 'total_trades']
+
+
+def _sma(values, length):
+    """Trailing simple moving average (NaN until the window is full)"""
+    out = np.full(len(values), np.nan)
+    if length <= len(values):
+        total = np.cumsum(np.r_[0.0, values])
+        out[length - 1:] = (total[length:] - total[:-length]) / length
+    return out
+
+
+def _tuned_column(name, length, columns, kernels):
+    """(column, values) for one swept indicator length"""
+    if name == 'rsi_length':
+        return 'rsi', kernels['rsi'](columns['close'], length)
+    if name == 'sma_fast':
+        return 'sma_20', _sma(columns['close'], length)
+    if name == 'sma_slow':
+        return 'sma_50', _sma(columns['close'], length)
+    if name == 'adx_length':
+        return 'adx', kernels['adx'](columns['true_range'], columns['plus_dm'], columns['minus_dm'], length)
+    raise ValueError(f"unknown indicator parameter {name!r} (known: {', '.join(INDICATOR_PARAMETERS)})")
+
+
+def _kernel_backend():
+    """Registry backend for the sweep (pandas-ta has no kernels, so it falls back to NumPy)"""
+    return 'numpy' if get_backend() == 'pandas-ta' else None
+
+
+def prepare_bars(frames, strategies):
+    """{symbol: {column: array}}: time keys, bar fields and every indicator the strategies read, computed once"""
+    indicator_columns = [name for name in strategy_columns(strategies) if name not in FRAME_FIELDS + SESSION_FIELDS]
+    bars = {}
+    for symbol, df in frames.items():
+        if len(df) == 0:
+            continue
+        timestamps = pd.DatetimeIndex(df['timestamp']).as_unit('ns')
+        local = timestamps.tz_convert('America/New_York') if timestamps.tz is not None else timestamps
+        columns = {'timestamp': timestamps.asi8, 'day': local.normalize().asi8}
+        columns.update({field: df[field].to_numpy(dtype=float) for field in FRAME_FIELDS})
+        columns.update(session_columns(columns['timestamp'], columns['open'], columns['close']))
+        columns.update(compute_indicators(
+            columns['high'], columns['low'], columns['close'], columns['volume'],
+            columns=indicator_columns + TUNING_NODES, backend=_kernel_backend()
+        ))
+        bars[symbol] = columns
+    return bars
+
+
+def grid(space):
+    """Every configuration in the space, in product order"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def sample(space, count, rng):
+    """`count` distinct configurations drawn uniformly from the grid (without building it)"""
+    names = list(space)
+    sizes = [len(space[name]) for name in names]
+    total = math.prod(sizes)
+    configs = []
+    for index in rng.sample(range(total), min(count, total)):
+        config = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            index, position = divmod(index, size)
+            config[name] = space[name][position]
+        configs.append({name: config[name] for name in names})
+    return configs
+
+
+def suggest(space, history, count, rng, gamma=0.25, candidates=64):
+    """Tree-structured Parzen estimator: `count` untried configurations likely to score well (history: [(config, score)])"""
+    # The top `gamma` share of trials is "good"; each value is weighted by how much more often it
+    # shows up among good than bad trials, and the candidate with the best likelihood ratio wins
+    ranked = sorted(history, key=lambda item: item[1], reverse=True)
+    cut = max(1, int(len(ranked) * gamma))
+    good, bad = ranked[:cut], ranked[cut:]
+    seen = {_config_key(config) for config, _ in history}
+    
+    weights = {}
+    for name, values in space.items():
+        good_counts = np.array([sum(config[name] == v for config, _ in good) for v in values], dtype=float) + 1
+        bad_counts = np.array([sum(config[name] == v for config, _ in bad) for v in values], dtype=float) + 1
+        weights[name] = (good_counts / good_counts.sum(), bad_counts / bad_counts.sum())
+    
+    picks = []
+    for _ in range(count):
+        best, best_ratio = None, -np.inf
+        for _ in range(candidates):
+            config, ratio = {}, 0.0
+            for name, values in space.items():
+                p_good, p_bad = weights[name]
+                position = rng.choices(range(len(values)), weights=p_good)[0]
+                config[name] = values[position]
+                ratio += math.log(p_good[position] / p_bad[position])
+            key = _config_key(config)
+            if key not in seen and ratio > best_ratio:
+                best, best_ratio = config, ratio
+        if best is None:
+            break
+        seen.add(_config_key(best))
+        picks.append(best)
+    return picks
+
+
+def _mean(values):
+    """Mean ignoring NaN (NaN when nothing is left)"""
+    values = [value for value in values if not np.isnan(value)]
+    return float(np.mean(values)) if values else np.nan
+
+
+def _plain(value):
+    """Python scalar for a NumPy one (so settings print and assign as written)"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _config_key(config):
+    """Hashable form of a configuration"""
+    return tuple(sorted(config.items()))
+
+
+def walk_forward(days, folds, test_days=None, train_days=None):
+    """[(train days, test days)] on a rolling window (default: train twice as long as test)"""
+    test_days = test_days or max(1, len(days) // (folds + 2))
+    train_days = train_days or 2 * test_days
+    splits = []
+    for fold in range(folds):
+        start = fold * test_days
+        train = days[start:start + train_days]
+        test = days[start + train_days:start + train_days + test_days]
+        if len(train) and len(test):
+            splits.append((train, test))
+    return splits
+
+
+# ---------------------------------------------------------------------------
+# Worker side: bars arrive once per process; confidence is cached per (strategy, lengths)
+# ---------------------------------------------------------------------------
+
+_bars = None
+_prepared = {}
+
+
+def _init_worker(bars):
+    """Keep the shared bar columns for every task this process runs"""
+    global _bars
+    _bars = bars
+    _prepared.clear()
+
+
+def _prepared_for(strategy, lengths, segments):
+    """Backtester.prepare()-shaped arrays for one indicator setting, sliced per segment"""
+    key = (strategy, lengths)
+    if key in _prepared:
+        return _prepared[key]
+    
+    rules = get_strategy(strategy)
+    kernels = get_kernels(_kernel_backend())
+    full = {}
+    for symbol, columns in _bars.items():
+        columns = dict(columns)
+        for name, length in lengths:
+            column, values = _tuned_column(name, length, columns, kernels)
+            columns[column] = values
+        confidence, _ = rules.score({name: columns[name] for name in rules.columns}, len(columns['close']))
+        full[symbol] = {
+            'timestamp': columns['timestamp'], 'day': columns['day'],
+            'close': columns['close'], 'confidence': confidence
+        }
+    
+    parts = []
+    for first_day, last_day in segments:
+        part = {}
+        for symbol, data in full.items():
+            lo = np.searchsorted(data['day'], first_day, side='left')
+            hi = np.searchsorted(data['day'], last_day, side='right')
+            if hi > lo:
+                part[symbol] = {field: values[lo:hi] for field, values in data.items()}
+        parts.append(part)
+    
+    _prepared[key] = parts
+    return parts
+
+
+def _evaluate(strategy, lengths, settings, segments, starting_cash):
+    """Backtester statistics per segment for each trading setting sharing one indicator setting"""
+    parts = _prepared_for(strategy, lengths, segments)
+    results = []
+    for setting in settings:
+        backtester = Backtester(starting_cash=starting_cash, strategy=strategy, **setting)
+        results.append([
+            {field: backtester.simulate(part, trades=False)[field] for field in RESULT_FIELDS} if part else None
+            for part in parts
+        ])
+    return results
+
+
+class Optimizer:
+    """Searches bot settings against historical bars, scoring each configuration walk-forward"""
+    
+    def __init__(self, frames, space=None, strategy=DEFAULT_STRATEGY, objective='return_pct', folds=3,
+                 test_days=None, train_days=None, min_trades=5, starting_cash=10000.00, workers=None,
+                 chunk_size=32, seed=42):
+        """frames: {symbol: bars DataFrame}; space: {parameter: values} (TRADING_PARAMETERS,
+        INDICATOR_PARAMETERS and 'strategy'); objective: a Backtester statistic to maximize"""
+        self.space = dict(space or DEFAULT_SPACE)
+        unknown = [name for name in self.space
+                   if name not in TRADING_PARAMETERS and name not in INDICATOR_PARAMETERS and name != 'strategy']
+        if unknown:
+            raise ValueError(f"unknown parameters: {', '.join(unknown)}")
+        
+        self.strategy = strategy
+        self.objective = objective
+        self.min_trades = min_trades
+        self.starting_cash = starting_cash
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.rng = random.Random(seed)
+        self.bars = prepare_bars(frames, self.space.get('strategy', [strategy]))
+        
+        # Segment 0 is the whole period; then (train, test) per walk-forward fold
+        days = np.unique(np.concatenate([columns['day'] for columns in self.bars.values()]))
+        self.folds = walk_forward(days, folds, test_days, train_days)
+        self.segments = [(days[0], days[-1])]
+        for train, test in self.folds:
+            self.segments += [(train[0], train[-1]), (test[0], test[-1])]
+        self.results = None
+        self._history = {}  # config key -> row
+    
+    @classmethod
+    def from_cache(cls, symbols, bar_cache, days=365, **options):
+        """Optimize on symbols straight from the local bar cache"""
+        start = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=days)
+        frames = {symbol: bar_cache.load(symbol, start=start) for symbol in symbols}
+        return cls(frames, **options)
+    
+    def _split(self, config):
+        """(strategy, indicator lengths, trading settings) of a configuration"""
+        strategy = config.get('strategy', self.strategy)
+        lengths = tuple(sorted(
+            (name, config[name]) for name in INDICATOR_PARAMETERS
+            if name in config and config[name] != INDICATOR_PARAMETERS[name]
+        ))
+        settings = {name: config[name] for name in TRADING_PARAMETERS if name in config}
+        return strategy, lengths, settings
+    
+    def _tasks(self, configs):
+        """Configurations grouped by indicator setting, in chunks (so each worker reuses its confidence)"""
+        groups = {}
+        for config in configs:
+            strategy, lengths, settings = self._split(config)
+            groups.setdefault((strategy, lengths), []).append((config, settings))
+        for (strategy, lengths), members in groups.items():
+            for start in range(0, len(members), self.chunk_size):
+                yield strategy, lengths, members[start:start + self.chunk_size]
+    
+    def _row(self, config, segments):
+        """Report row: parameters, whole-period statistics and walk-forward scores"""
+        row = dict(config)
+        whole = segments[0] or dict.fromkeys(RESULT_FIELDS, 0)
+        row.update(whole)
+        
+        train, test = [], []
+        for fold in range(len(self.folds)):
+            train_result, test_result = segments[1 + 2 * fold], segments[2 + 2 * fold]
+            train.append(train_result[self.objective] if train_result else np.nan)
+            test.append(test_result[self.objective] if test_result else np.nan)
+        row['train_score'] = _mean(train)
+        row['test_score'] = _mean(test)
+        row['test_positive'] = _mean([float(value > 0) for value in test if not np.isnan(value)])
+        row['_train'], row['_test'] = train, test
+        
+        # Validated score: out-of-sample mean when folds exist; too few trades ranks last
+        score = row['test_score'] if self.folds else whole[self.objective]
+        row['score'] = score if whole['total_trades'] >= self.min_trades else -np.inf
+        return row
+    
+    def evaluate(self, configs, pool=None):
+        """Score configurations not tried yet; returns their report rows"""
+        configs = [config for config in configs if _config_key(config) not in self._history]
+        tasks = list(self._tasks(configs))
+        if pool is None:
+            if _bars is not self.bars:
+                _init_worker(self.bars)
+            outcomes = [
+                _evaluate(strategy, lengths, [settings for _, settings in members], self.segments, self.starting_cash)
+                for strategy, lengths, members in tasks
+            ]
+        else:
+            futures = [
+                pool.submit(_evaluate, strategy, lengths, [settings for _, settings in members],
+                            self.segments, self.starting_cash)
+                for strategy, lengths, members in tasks
+            ]
+            outcomes = [future.result() for future in futures]
+        
+        rows = []
+        for (_, _, members), results in zip(tasks, outcomes):
+            for (config, _), segments in zip(members, results):
+                row = self._row(config, segments)
+                self._history[_config_key(config)] = row
+                rows.append(row)
+        return rows
+    
+    def run(self, method='grid', trials=200, batch_size=None):
+        """Search the space (grid: every configuration; random/bayes: `trials` of them); returns the ranking"""
+        if method not in METHODS:
+            raise ValueError(f"unknown method {method!r} (known: {', '.join(METHODS)})")
+        
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.bars,))
+        try:
+            if method == 'grid':
+                self.evaluate(grid(self.space), pool)
+            elif method == 'random':
+                self.evaluate(sample(self.space, trials, self.rng), pool)
+            else:
+                # Random start, then TPE suggestions in batches wide enough to keep every worker busy
+                batch_size = batch_size or max(8, 4 * self.workers)
+                self.evaluate(sample(self.space, max(10, trials // 5), self.rng), pool)
+                while len(self._history) < trials:
+                    history = [(row_config, row['score']) for row_config, row in self._configs()]
+                    picks = suggest(self.space, history, min(batch_size, trials - len(self._history)), self.rng)
+                    if not picks:
+                        break
+                    self.evaluate(picks, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        return self.ranking()
+    
+    def _configs(self):
+        """(configuration, row) for every evaluated configuration"""
+        for row in self._history.values():
+            yield {name: row[name] for name in self.space}, row
+    
+    def ranking(self):
+        """Every evaluated configuration, best validated score first"""
+        rows = [{k: v for k, v in row.items() if not k.startswith('_')} for row in self._history.values()]
+        table = pd.DataFrame(rows)
+        if len(table):
+            table = table.sort_values(['score', self.objective], ascending=False, kind='stable').reset_index(drop=True)
+        self.results = table
+        return table
+    
+    def walk_forward_report(self):
+        """Per fold: the best configuration on its training window and how it did on the next test window"""
+        rows = []
+        for fold, (train_days, test_days) in enumerate(self.folds):
+            eligible = [row for row in self._history.values() if row['total_trades'] >= self.min_trades]
+            if not eligible:
+                break
+            best = max(eligible, key=lambda row: row['_train'][fold])
+            rows.append({
+                'fold': fold + 1,
+                'train_start': pd.Timestamp(int(train_days[0])).date(),
+                'test_start': pd.Timestamp(int(test_days[0])).date(),
+                'test_end': pd.Timestamp(int(test_days[-1])).date(),
+                'train_score': best['_train'][fold],
+                'test_score': best['_test'][fold],
+                **{name: best[name] for name in self.space}
+            })
+        return pd.DataFrame(rows)
+    
+    def best(self):
+        """Parameters of the top-ranked configuration"""
+        ranking = self.results if self.results is not None else self.ranking()
+        if len(ranking) == 0:
+            return None
+        return {name: _plain(ranking[name].iloc[0]) for name in self.space}
+    
+    def apply(self, bot, params=None):
+        """Set a bot's trading parameters (default: the best configuration)"""
+        params = params or self.best()
+        for name in TRADING_PARAMETERS + ['strategy']:
+            if name in params:
+                setattr(bot, name, _plain(params[name]))
+        tuned = [name for name in INDICATOR_PARAMETERS if name in params and params[name] != INDICATOR_PARAMETERS[name]]
+        if tuned:
+            print(f"⚠️  Live indicators keep their default lengths ({', '.join(tuned)} apply to backtests only)")
+        return bot
+    
+    def report(self, count=10):
+        """Print the top of the ranking and the walk-forward folds"""
+        ranking = self.results if self.results is not None else self.ranking()
+        print(f"🏁 Ranked {len(ranking)} configurations by out-of-sample {self.objective} "
+              f"({len(self.folds)} walk-forward folds, min {self.min_trades} trades)")
+        for position, row in ranking.head(count).iterrows():
+            params = ', '.join(f"{name}={_plain(ranking.at[position, name])}" for name in self.space)
+            print(f"  {position + 1:3}. test {row['test_score']:+7.2f} | train {row['train_score']:+7.2f} | "
+                  f"all {row['return_pct']:+7.2f}% | DD {row['max_drawdown_pct']:6.2f}% | "
+                  f"{int(row['total_trades']):4} trades | {params}")
+        
+        folds = self.walk_forward_report()
+        if len(folds):
+            print("\n⏩ Walk-forward (best on train -> next window):")
+            for _, fold in folds.iterrows():
+                print(f"  Fold {fold['fold']}: {fold['test_start']} - {fold['test_end']} | "
+                      f"train {fold['train_score']:+7.2f} -> test {fold['test_score']:+7.2f}")
+            print(f"  Out-of-sample mean: {folds['test_score'].mean():+.2f}")
+
+
+def main(argv=None):
+    """Sweep the demo (or cached live) watchlist from the command line"""
+    import time
+    from trading_ai import SpineRipAI
+    
+    parser = argparse.ArgumentParser(description="Search SpineRip bot settings on historical bars")
+    parser.add_argument('--method', choices=METHODS, default='random')
+    parser.add_argument('--trials', type=int, default=200, help="configurations for random/bayes")
+    parser.add_argument('--days', type=int, default=30, help="days of minute bars per symbol")
+    parser.add_argument('--folds', type=int, default=3, help="walk-forward folds")
+    parser.add_argument('--objective', default='return_pct')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: every core)")
+    parser.add_argument('--csv', help="write the full ranking here")
+    args = parser.parse_args(argv)
+    
+    print("\n" + "="*60)
+    print("🧪 SPINERIP OPTIMIZER")
+    print("="*60 + "\n")
+    
+    ai = SpineRipAI()
+    watchlist = ai.get_watchlist()['High Volume']
+    frames = {symbol: ai.get_market_data(symbol, days=args.days) for symbol in watchlist}
+    
+    started = time.perf_counter()
+    optimizer = Optimizer(frames, objective=args.objective, folds=args.folds, workers=args.workers)
+    ranking = optimizer.run(args.method, trials=args.trials)
+    elapsed = time.perf_counter() - started
+    
+    print(f"\n📊 {len(ranking)} configurations x {len(optimizer.segments)} windows on "
+          f"{len(frames)} symbols in {elapsed:.1f}s ({optimizer.workers} workers)\n")
+    optimizer.report()
+    if args.csv:
+        ranking.to_csv(args.csv, index=False)
+        print(f"\n✅ Ranking exported to: {args.csv}")
+    print("\n" + "="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+SpineRip Order Executor - Async Order Pipeline
+Queued bracket/OCO submission with retries, idempotent client order IDs and fill tracking
+"""
+
+import uuid
+import time
+import asyncio
+import threading
+
+from alpaca.trading.requests import (
+    MarketOrderRequest, LimitOrderRequest, TakeProfitRequest, StopLossRequest, GetOrdersRequest
+)
+from alpaca.trading.enums import OrderSide, OrderClass, TimeInForce, QueryOrderStatus
+
+from rate_limiter import TokenBucket
+from broker_base import enum_value
+
+
+TERMINAL_STATUSES = {'filled', 'canceled', 'expired', 'rejected', 'failed'}
+
+
+def make_client_order_id(symbol, side):
+    """Unique client order ID; reused on every retry so the broker never books it twice"""
+    return f"spinerip-{symbol.lower()}-{side}-{uuid.uuid4().hex[:12]}"
+
+
+def is_retryable(error):
+    """Network errors, rate limits and 5xx are retried; other 4xx are final"""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        return True
+    return status_code == 429 or status_code >= 500
+
+
+class OrderExecutor:
+    """Background asyncio queue that submits orders and tracks them until they finish"""
+    
+    def __init__(self, client, on_fill=None, max_retries=3, retry_delay=0.5,
+                 poll_interval=2.0, instrumentation=None, cancel_timeout=10.0, rate_limiter=None, on_done=None):
+        """client is a TradingClient (or FakeBroker); on_fill(record, order) runs per fill, on_done(record) once tracking ends"""
+        self.client = client
+        # Every broker call takes a token (Alpaca allows 200 trading requests per minute)
+        self.rate_limiter = rate_limiter or TokenBucket(rate=3, capacity=5)
+        self.on_fill = on_fill
+        self.on_done = on_done
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.cancel_timeout = cancel_timeout  # seconds a sell waits for its symbol's exits to cancel
+        self.instrumentation = instrumentation
+        self.orders = {}  # client_order_id -> record
+        self.lock = threading.Lock()
+        self.loop = None
+        self.queue = None
+        self.thread = None
+        self._ready = threading.Event()
+    
+    def start(self):
+        """Start the event loop thread (idempotent)"""
+        if self.thread is not None:
+            return self
+        self.thread = threading.Thread(target=self._run_loop, name="order-executor", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        return self
+    
+    def _run_loop(self):
+        """Event loop body: submission worker plus fill tracker"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.queue = asyncio.Queue()
+        self.loop.create_task(self._submit_worker())
+        self.loop.create_task(self._track_fills())
+        self._ready.set()
+        self.loop.run_forever()
+        
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+    
+    def stop(self, timeout=10):
+        """Finish queued submissions, then stop the loop"""
+        if self.thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self.queue.join(), self.loop)
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=timeout)
+        self.thread = None
+        self._ready.clear()
+    
+    def submit(self, request, cancel_open=False):
+        """Queue an order request; returns its tracking record immediately"""
+        side = enum_value(request.side)
+        if not request.client_order_id:
+            request.client_order_id = make_client_order_id(request.symbol, side)
+        
+        record = {
+            'client_order_id': request.client_order_id,
+            'symbol': request.symbol,
+            'side': side,
+            'qty': float(request.qty),
+            'order_class': enum_value(request.order_class) or 'simple',
+            'request': request,
+            'cancel_open': cancel_open,  # cancel resting orders (e.g. bracket legs) for the symbol first
+            'status': 'queued',
+            'order_id': None,
+            'legs': {},
+            'filled_qty': 0.0,
+            'filled_avg_price': None,
+            'attempts': 0,
+            'error': None,
+            'queued_at': time.perf_counter(),
+            'done': threading.Event()
+        }
+        with self.lock:
+            self.orders[record['client_order_id']] = record
+        
+        self.start()
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, record)
+        return record
+    
+    def buy_bracket(self, symbol, qty, price, stop_loss_percent, take_profit_percent, limit_price=None):
+        """Entry with broker-held take-profit and stop-loss exits"""
+        take_profit = round(price * (1 + take_profit_percent / 100), 2)
+        stop_loss = round(price * (1 - stop_loss_percent / 100), 2)
+        fields = dict(
+            symbol=symbol,
+            qty=qty,
+            side=OrderSide.BUY,
+            time_in_force=TimeInForce.GTC,  # exits stay live after today's session
+            order_class=OrderClass.BRACKET,
+            take_profit=TakeProfitRequest(limit_price=take_profit),
+            stop_loss=StopLossRequest(stop_price=stop_loss),
+            client_order_id=make_client_order_id(symbol, 'buy')
+        )
+        if limit_price is not None:
+            request = LimitOrderRequest(limit_price=round(limit_price, 2), **fields)
+        else:
+            request = MarketOrderRequest(**fields)
+        return self.submit(request)
+    
+    def sell(self, symbol, qty):
+        """Market sell, cancelling the symbol's resting exit orders first"""
+        request = MarketOrderRequest(
+            symbol=symbol,
+            qty=qty,
+            side=OrderSide.SELL,
+            time_in_force=TimeInForce.DAY,
+            client_order_id=make_client_order_id(symbol, 'sell')
+        )
+        return self.submit(request, cancel_open=True)
+    
+    def wait(self, record, timeout=None):
+        """Block until a record reaches a terminal status; returns it"""
+        record['done'].wait(timeout)
+        return record
+    
+    def open_records(self):
+        """Records still queued, working or holding live exit legs"""
+        with self.lock:
+            return [record for record in self.orders.values() if not record['done'].is_set()]
+    
+    def _count(self, name, symbol=None):
+        """Increment an instrumentation counter (if instrumented)"""
+        if self.instrumentation is not None:
+            self.instrumentation.count(name, symbol=symbol)
+    
+    def _paced(self, method, *args):
+        """Blocking client call once the rate limiter allows it"""
+        self.rate_limiter.acquire()
+        return method(*args)
+    
+    async def _call(self, method, *args):
+        """Run a blocking, rate-limited client call off the event loop"""
+        return await asyncio.to_thread(self._paced, method, *args)
+    
+    async def _find_existing(self, client_order_id):
+        """Order the broker already accepted under this client ID, or None"""
+        try:
+            return await self._call(self.client.get_order_by_client_id, client_order_id)
+        except Exception:
+            return None
+    
+    async def _cancel_open(self, symbol):
+        """Cancel resting sell orders for a symbol and wait until they are gone; False if some are still live"""
+        # Alpaca cancels asynchronously: the legs hold the shares until they report canceled
+        try:
+            request = GetOrdersRequest(status=QueryOrderStatus.OPEN, symbols=[symbol])
+            orders = await self._call(self.client.get_orders, request)
+        except Exception as e:
+            print(f"⚠️  Could not list open orders for {symbol}: {str(e)}")
+            return False
+        
+        pending = []
+        for order in orders:
+            if enum_value(order.side) != enum_value(OrderSide.SELL):
+                continue
+            try:
+                await self._call(self.client.cancel_order_by_id, order.id)
+            except Exception as e:
+                # 422: it filled or was canceled in the meantime, which the poll below picks up
+                if getattr(e, 'status_code', None) != 422:
+                    print(f"⚠️  Could not cancel order {order.id} for {symbol}: {str(e)}")
+            pending.append(order.id)
+        
+        deadline = time.monotonic() + self.cancel_timeout
+        while pending:
+            live = []
+            for order_id in pending:
+                try:
+                    order = await self._call(self.client.get_order_by_id, order_id)
+                except Exception as e:
+                    print(f"⚠️  Could not check order {order_id} for {symbol}: {str(e)}")
+                    live.append(order_id)
+                    continue
+                if enum_value(order.status) not in TERMINAL_STATUSES:
+                    live.append(order_id)
+            pending = live
+            if pending and time.monotonic() >= deadline:
+                print(f"⚠️  {len(pending)} order(s) for {symbol} not canceled after {self.cancel_timeout:g}s")
+                return False
+            if pending:
+                await asyncio.sleep(min(self.poll_interval, 0.25))
+        return True
+    
+    async def _submit_worker(self):
+        """Take records off the queue one at a time and submit them"""
+        while True:
+            record = await self.queue.get()
+            try:
+                await self._submit(record)
+            finally:
+                self.queue.task_done()
+    
+    async def _submit(self, record):
+        """Submit with retries; a retry first checks whether the last attempt landed"""
+        if record['cancel_open']:
+            await self._cancel_open(record['symbol'])
+        
+        started = time.perf_counter()
+        for attempt in range(1, self.max_retries + 1):
+            record['attempts'] = attempt
+            try:
+                order = await self._call(self.client.submit_order, record['request'])
+                self._accepted(record, order, started)
+                return
+            except Exception as e:
+                record['error'] = str(e)
+                existing = await self._find_existing(record['client_order_id'])
+                if existing is not None:
+                    self._accepted(record, existing, started)
+                    return
+                # A sell can still meet exits that are releasing their shares (403 insufficient qty)
+                held = record['cancel_open'] and getattr(e, 'status_code', None) == 403
+                if not (is_retryable(e) or held) or attempt == self.max_retries:
+                    break
+                self._count('order_retries', record['symbol'])
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+        
+        record['status'] = 'failed'
+        self._count('order_failures', record['symbol'])
+        print(f"❌ Order failed: {record['side'].upper()} {record['qty']:g} {record['symbol']} ({record['error']})")
+        self._finish(record)
+    
+    def _accepted(self, record, order, started):
+        """Broker accepted the order: start tracking it (and its exit legs)"""
+        if self.instrumentation is not None:
+            self.instrumentation.observe('order', time.perf_counter() - started, record['symbol'])
+        self._count('orders', record['symbol'])
+        record['order_id'] = order.id
+        record['error'] = None
+        for leg in getattr(order, 'legs', None) or []:
+            record['legs'][str(leg.id)] = {'status': enum_value(leg.status), 'filled_qty': 0.0}
+        self._update(record, order)
+    
+    def _update(self, record, order):
+        """Apply the broker's view of the order; fire on_fill for new fills"""
+        status = enum_value(order.status)
+        filled_qty = float(order.filled_qty or 0)
+        newly_filled = filled_qty > record['filled_qty']
+        record['status'] = status
+        record['filled_qty'] = filled_qty
+        if order.filled_avg_price is not None:
+            record['filled_avg_price'] = float(order.filled_avg_price)
+        
+        if newly_filled:
+            self._count('fills', record['symbol'])
+            if self.on_fill:
+                self.on_fill(record, order)
+        
+        if status in TERMINAL_STATUSES and not self._legs_open(record):
+            self._finish(record)
+    
+    def _update_leg(self, record, leg):
+        """Apply the broker's view of an exit leg; fire on_fill for new (partial) fills"""
+        state = record['legs'][str(leg.id)]
+        filled_qty = float(leg.filled_qty or 0)
+        state['status'] = enum_value(leg.status)
+        if filled_qty > state['filled_qty']:
+            state['filled_qty'] = filled_qty
+            self._count('fills', record['symbol'])
+            if self.on_fill:
+                self.on_fill(record, leg)
+    
+    def _finish(self, record):
+        """Mark a record done and fire on_done (once)"""
+        if record['done'].is_set():
+            return
+        record['done'].set()
+        if self.on_done:
+            self.on_done(record)
+    
+    def _legs_open(self, record):
+        """True while any bracket/OCO exit leg can still fill"""
+        if record['status'] in ('canceled', 'expired', 'rejected', 'failed'):
+            return False
+        return any(state['status'] not in TERMINAL_STATUSES for state in record['legs'].values())
+    
+    async def _track_fills(self):
+        """Poll working orders and exit legs until they reach a terminal status"""
+        # One open-orders listing per interval covers every tracked order and leg; an order only
+        # gets its own lookup once, when it leaves the open set (to read how it ended)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            records = [record for record in self.open_records() if record['order_id'] is not None]
+            # Submissions and cancels wait for tokens; polling skips a round instead of queueing ahead of them
+            if not records or not self.rate_limiter.try_acquire():
+                continue
+            try:
+                request = GetOrdersRequest(
+                    status=QueryOrderStatus.OPEN, symbols=sorted({record['symbol'] for record in records}),
+                    nested=False, limit=500
+                )
+                listed = await asyncio.to_thread(self.client.get_orders, request)
+            except Exception as e:
+                print(f"⚠️  Order tracking error (listing open orders): {str(e)}")
+                continue
+            
+            open_orders = {}
+            for order in listed:
+                open_orders[str(order.id)] = order
+                for leg in getattr(order, 'legs', None) or []:
+                    open_orders[str(leg.id)] = leg
+            for record in records:
+                try:
+                    await self._refresh(record, open_orders)
+                except Exception as e:
+                    print(f"⚠️  Order tracking error ({record['symbol']}): {str(e)}")
+    
+    async def _refresh(self, record, open_orders):
+        """Update a record and its legs from the open-orders listing"""
+        order_id = str(record['order_id'])
+        if record['status'] not in TERMINAL_STATUSES:
+            order = open_orders.get(order_id) or await self._call(self.client.get_order_by_id, record['order_id'])
+            self._update(record, order)
+        for leg_id, state in list(record['legs'].items()):
+            if state['status'] in TERMINAL_STATUSES:
+                continue
+            leg = open_orders.get(leg_id) or await self._call(self.client.get_order_by_id, leg_id)
+            self._update_leg(record, leg)
+        if record['status'] in TERMINAL_STATUSES and not self._legs_open(record):
+            self._finish(record)
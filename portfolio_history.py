@@ -0,0 +1,331 @@
+"""
+SpineRip Portfolio History - Columnar Equity & Trade Store
+Append-only per-column files with vectorized performance analytics over any date range
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+# Equity curve points (Alpaca portfolio history) and realized round-trip trades
+EQUITY_SCHEMA = [
+    ('timestamp', 'i8'),  # nanoseconds since epoch, UTC
+    ('equity', 'f8'),
+    ('profit_loss', 'f8'),
+    ('profit_loss_pct', 'f8')
+]
+
+TRADE_SCHEMA = [
+    ('timestamp', 'i8'),  # exit time, nanoseconds since epoch, UTC
+    ('symbol', 'S16'),
+    ('qty', 'f8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('pnl', 'f8')
+]
+
+TRADING_DAYS = 252
+SESSION_SECONDS = 6.5 * 3600
+NS_PER_SECOND = 1_000_000_000
+
+
+def to_nanoseconds(value):
+    """datetime / ISO date string / epoch seconds -> UTC nanoseconds (None stays None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)) and abs(int(value)) > 10 ** 15:
+        return int(value)  # already nanoseconds
+    if isinstance(value, (int, float, np.number)):
+        return int(value * NS_PER_SECOND)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000) * 1000
+
+
+def timestamps_to_nanoseconds(values):
+    """Vectorized to_nanoseconds for arrays of ns / epoch seconds / datetime64 (anything else per item)"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').astype('i8')
+    if values.dtype.kind in 'iu' and (len(values) == 0 or np.abs(values).max() > 10 ** 15):
+        return values.astype('i8')
+    if values.dtype.kind in 'iuf':
+        return (values.astype(float) * NS_PER_SECOND).astype('i8')
+    return np.array([to_nanoseconds(value) for value in values.tolist()], dtype='i8')
+
+
+class ColumnStore:
+    """Append-only table kept as one raw file per column (memory-mapped on read)"""
+    
+    def __init__(self, path, schema, unique=True):
+        """Columns live in path/<name>.col; unique: one row per timestamp (re-appends and older rows are dropped)"""
+        self.path = path
+        self.schema = [(name, np.dtype(dtype)) for name, dtype in schema]
+        self.unique = unique
+        os.makedirs(path, exist_ok=True)
+        self._cache = None
+    
+    def _column_path(self, name):
+        """Raw file holding one column"""
+        return os.path.join(self.path, f"{name}.col")
+    
+    def __len__(self):
+        # A crash between column appends leaves some columns longer; the shortest wins
+        return min(
+            os.path.getsize(self._column_path(name)) // dtype.itemsize if os.path.exists(self._column_path(name)) else 0
+            for name, dtype in self.schema
+        )
+    
+    def columns(self):
+        """{name: read-only array} over every stored row (reopened only after appends)"""
+        rows = len(self)
+        if self._cache is not None and self._cache[0] == rows:
+            return self._cache[1]
+        
+        columns = {}
+        for name, dtype in self.schema:
+            if rows == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(rows,))
+        self._cache = (rows, columns)
+        return columns
+    
+    def last_timestamp(self):
+        """Newest timestamp (ns), or None when empty"""
+        timestamps = self.columns()['timestamp']
+        return int(timestamps[-1]) if len(timestamps) else None
+    
+    def append(self, **columns):
+        """Append rows (equal-length arrays per column, any order); returns the number stored"""
+        timestamps = np.asarray(columns['timestamp'], dtype='i8')
+        keep = np.argsort(timestamps, kind='stable')
+        last = self.last_timestamp()
+        if self.unique:
+            # Rows already covered are dropped, as are duplicates within the batch
+            keep = keep[np.concatenate([[True], np.diff(timestamps[keep]) > 0])] if len(keep) else keep
+            if last is not None:
+                keep = keep[timestamps[keep] > last]
+        if len(keep) == 0:
+            return 0
+        
+        # Heal a partial append first so every column lines up again
+        rows = len(self)
+        for name, dtype in self.schema:
+            path = self._column_path(name)
+            if os.path.exists(path) and os.path.getsize(path) != rows * dtype.itemsize:
+                os.truncate(path, rows * dtype.itemsize)
+        
+        # Late rows (unique=False, e.g. a fill reported after a newer one) are merged in: the stored rows
+        # after the first of them are rewritten in place behind it, so open memory maps stay valid
+        start, stored = rows, None
+        if last is not None and timestamps[keep[0]] < last:
+            stored = self.columns()
+            start = int(np.searchsorted(stored['timestamp'], timestamps[keep[0]], side='right'))
+            order = np.argsort(np.concatenate([stored['timestamp'][start:], timestamps[keep]]), kind='stable')
+        
+        batches = {}
+        for name, dtype in self.schema:
+            values = np.asarray(columns[name]).astype(dtype)[keep]
+            batches[name] = values if stored is None else np.concatenate([stored[name][start:], values])[order]
+        for name, dtype in self.schema:
+            path = self._column_path(name)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(start * dtype.itemsize)
+                batches[name].tofile(f)
+        
+        self._cache = None
+        return len(keep)
+    
+    def read(self, start=None, end=None):
+        """Columns for rows with start <= timestamp < end (zero-copy slices)"""
+        columns = self.columns()
+        timestamps = columns['timestamp']
+        first = 0 if start is None else int(np.searchsorted(timestamps, to_nanoseconds(start), side='left'))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_nanoseconds(end), side='left'))
+        return {name: values[first:last] for name, values in columns.items()}
+
+
+# ---------------------------------------------------------------------------
+# Vectorized analytics
+# ---------------------------------------------------------------------------
+
+def periods_per_year(timestamps):
+    """Annualization factor from the median spacing (daily points -> 252)"""
+    if len(timestamps) < 2:
+        return TRADING_DAYS
+    spacing = float(np.median(np.diff(timestamps))) / NS_PER_SECOND
+    if spacing >= 20 * 3600:
+        return TRADING_DAYS * 86400 / max(spacing, 86400)
+    return TRADING_DAYS * SESSION_SECONDS / spacing
+
+
+def simple_returns(equity):
+    """Period-over-period returns"""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return np.empty(0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return equity[1:] / equity[:-1] - 1
+
+
+def sharpe_ratio(returns, periods=TRADING_DAYS, risk_free=0.0):
+    """Annualized Sharpe ratio (risk_free: annual rate)"""
+    excess = np.asarray(returns, dtype=float) - risk_free / periods
+    if len(excess) < 2:
+        return 0.0
+    deviation = excess.std(ddof=1)
+    return float(excess.mean() / deviation * np.sqrt(periods)) if deviation > 0 else 0.0
+
+
+def sortino_ratio(returns, periods=TRADING_DAYS, risk_free=0.0):
+    """Annualized Sortino ratio (downside deviation below the risk-free rate)"""
+    excess = np.asarray(returns, dtype=float) - risk_free / periods
+    if len(excess) < 2:
+        return 0.0
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+    return float(excess.mean() / downside * np.sqrt(periods)) if downside > 0 else 0.0
+
+
+def max_drawdown(equity):
+    """Largest peak-to-trough drop in percent (<= 0) and the indices of that peak and trough"""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) == 0:
+        return 0.0, None, None
+    peaks = np.maximum.accumulate(equity)
+    drawdowns = (equity - peaks) / peaks * 100
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(equity[:trough + 1]))
+    return float(drawdowns[trough]), peak, trough
+
+
+def rolling_returns(equity, window):
+    """Return over each trailing window of `window` periods (percent)"""
+    equity = np.asarray(equity, dtype=float)
+    if window >= len(equity):
+        return np.empty(0)
+    return (equity[window:] / equity[:-window] - 1) * 100
+
+
+def trade_stats(pnl):
+    """Realized-trade win rate, average win/loss and profit factor"""
+    pnl = np.asarray(pnl, dtype=float)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    total = len(pnl)
+    return {
+        'total_trades': total,
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'win_rate': len(wins) / total * 100 if total else 0.0,
+        'realized_pnl': float(pnl.sum()),
+        'average_win': float(wins.mean()) if len(wins) else 0.0,
+        'average_loss': float(losses.mean()) if len(losses) else 0.0,
+        'profit_factor': float(wins.sum() / -losses.sum()) if len(losses) else None  # None: no losing trades
+    }
+
+
+class PortfolioHistory:
+    """Local equity curve and realized trades, queried without API calls"""
+    
+    def __init__(self, path=None):
+        """Initialize store directory (defaults to .portfolio_history next to this file)"""
+        self.path = path or os.path.join(os.path.dirname(__file__), '.portfolio_history')
+        self.equity = ColumnStore(os.path.join(self.path, 'equity'), EQUITY_SCHEMA)
+        self.trades = ColumnStore(os.path.join(self.path, 'trades'), TRADE_SCHEMA, unique=False)
+    
+    @classmethod
+    def default(cls, demo_mode=False):
+        """The shared store (demo runs get their own so they never mix with live history)"""
+        path = os.path.join(os.path.dirname(__file__), '.portfolio_history')
+        return cls(os.path.join(path, 'demo') if demo_mode else path)
+    
+    def clear(self, trades=True):
+        """Delete every stored equity point (and trade, unless trades=False)"""
+        for store in (self.equity, self.trades) if trades else (self.equity,):
+            for name, _ in store.schema:
+                path = store._column_path(name)
+                if os.path.exists(path):
+                    os.remove(path)
+            store._cache = None
+    
+    def record_equity(self, timestamps, equity, profit_loss=None, profit_loss_pct=None):
+        """Append equity points (timestamps: ns, seconds or datetimes); NaN/None points are skipped"""
+        timestamps = timestamps_to_nanoseconds(timestamps)
+        equity = np.asarray(equity, dtype=float)
+        profit_loss = np.full(len(equity), np.nan) if profit_loss is None else np.asarray(profit_loss, dtype=float)
+        profit_loss_pct = np.full(len(equity), np.nan) if profit_loss_pct is None else np.asarray(profit_loss_pct, dtype=float)
+        valid = ~np.isnan(equity)
+        return self.equity.append(
+            timestamp=timestamps[valid], equity=equity[valid],
+            profit_loss=profit_loss[valid], profit_loss_pct=profit_loss_pct[valid]
+        )
+    
+    def record_trade(self, symbol, qty, entry_price, exit_price, timestamp=None):
+        """Append one realized round trip (exit time defaults to now)"""
+        return self.record_trades([symbol], [qty], [entry_price], [exit_price],
+                                  [timestamp if timestamp is not None else time.time_ns()])
+    
+    def record_trades(self, symbols, qty, entry_price, exit_price, timestamps):
+        """Append realized round trips (e.g. a backtest's trade list)"""
+        qty = np.asarray(qty, dtype=float)
+        entry_price = np.asarray(entry_price, dtype=float)
+        exit_price = np.asarray(exit_price, dtype=float)
+        
+        return self.trades.append(
+            timestamp=timestamps_to_nanoseconds(timestamps), symbol=np.asarray(symbols, dtype='S16'), qty=qty,
+            entry_price=entry_price, exit_price=exit_price, pnl=(exit_price - entry_price) * qty
+        )
+    
+    def equity_curve(self, start=None, end=None):
+        """(timestamps ns, equity) arrays for a range"""
+        columns = self.equity.read(start, end)
+        return columns['timestamp'], columns['equity']
+    
+    def performance(self, start=None, end=None, risk_free=0.0, window=None):
+        """Sharpe, Sortino, drawdown, returns and realized-trade stats over [start, end)"""
+        columns = self.equity.read(start, end)
+        timestamps = columns['timestamp']
+        equity = columns['equity']
+        periods = periods_per_year(timestamps)
+        returns = simple_returns(equity)
+        drawdown, peak, trough = max_drawdown(equity)
+        
+        metrics = {
+            'points': len(equity),
+            'start': _iso(timestamps[0]) if len(timestamps) else None,
+            'end': _iso(timestamps[-1]) if len(timestamps) else None,
+            'start_equity': float(equity[0]) if len(equity) else None,
+            'end_equity': float(equity[-1]) if len(equity) else None,
+            'total_return_pct': float((equity[-1] / equity[0] - 1) * 100) if len(equity) else 0.0,
+            'periods_per_year': periods,
+            'volatility_pct': float(returns.std(ddof=1) * np.sqrt(periods) * 100) if len(returns) > 1 else 0.0,
+            'sharpe': sharpe_ratio(returns, periods, risk_free),
+            'sortino': sortino_ratio(returns, periods, risk_free),
+            'max_drawdown_pct': drawdown,
+            'max_drawdown_start': _iso(timestamps[peak]) if peak is not None else None,
+            'max_drawdown_end': _iso(timestamps[trough]) if trough is not None else None
+        }
+        if window:
+            rolling = rolling_returns(equity, window)
+            metrics['rolling_window'] = window
+            metrics['rolling_return_best_pct'] = float(rolling.max()) if len(rolling) else 0.0
+            metrics['rolling_return_worst_pct'] = float(rolling.min()) if len(rolling) else 0.0
+        
+        metrics.update(trade_stats(self.trades.read(start, end)['pnl']))
+        return metrics
+    
+    def rolling_returns(self, window, start=None, end=None):
+        """(window end timestamps, percent return over the trailing `window` points)"""
+        timestamps, equity = self.equity_curve(start, end)
+        return timestamps[window:], rolling_returns(equity, window)
+
+
+def _iso(nanoseconds):
+    """UTC nanoseconds -> ISO timestamp string"""
+    return datetime.fromtimestamp(int(nanoseconds) / NS_PER_SECOND, tz=timezone.utc).isoformat()
@@ -5,22 +5,17 @@ Real-time portfolio tracking, P&L calculation, performance metrics
 
 import os
 import json
+import time
 from datetime import datetime, timedelta
-from trading_ai import SpineRipAI
-
-try:
-    from alpaca.trading.client import TradingClient
-except ImportError:
-    print("Installing alpaca-py...")
-    os.system("pip install alpaca-py")
-    from alpaca.trading.client import TradingClient
 
 
 class PortfolioTracker:
     """Track portfolio performance and metrics"""
     
-    def __init__(self, api_key=None, api_secret=None, paper=True):
-        """Initialize tracker"""
+    def __init__(self, api_key=None, api_secret=None, paper=True, history=None):
+        """Initialize tracker (history: PortfolioHistory store, default .portfolio_history)"""
+        from portfolio_history import PortfolioHistory
+        
         self.api_key = api_key or os.getenv("ALPACA_API_KEY")
         self.api_secret = api_secret or os.getenv("ALPACA_API_SECRET")
         self.paper = paper
@@ -29,8 +24,20 @@ class PortfolioTracker:
             self.demo_mode = True
             print("⚠️  Demo mode - using simulated data")
         else:
-            self.trading_client = TradingClient(self.api_key, self.api_secret, paper=paper)
+            from alpaca_clients import trading_client
+            self.trading_client = trading_client(self.api_key, self.api_secret, paper)
             self.demo_mode = False
+        
+        # Local equity curve + realized trades; the API is only asked for points it doesn't have
+        self.history = history or PortfolioHistory.default(self.demo_mode)
+        self.backfill_days = 365  # Equity history fetched when the store is empty
+        
+        # Today's point keeps changing until the close, so it stays in memory and is refetched
+        # once it is older than intraday_refresh seconds (the store only takes completed days)
+        self.intraday_refresh = 300
+        self.intraday = None
+        self._synced_at = 0.0
+        self._synced_days = 0
     
     def get_account_summary(self):
         """Get account balance and equity"""
@@ -98,36 +105,93 @@ class PortfolioTracker:
         
         return position_list
     
-    def get_portfolio_history(self, days=30):
-        """Get portfolio performance history"""
+    def _fetch_history(self, days):
+        """Daily equity points for the last `days` days: (epoch seconds, equity, P&L, P&L %)"""
         if self.demo_mode:
             # Generate demo history
-            import pandas as pd
-            dates = pd.date_range(end=datetime.now(), periods=days, freq='1D')
+            now = datetime.now()
+            timestamps = [(now - timedelta(days=days - 1 - i)).timestamp() for i in range(days)]
             values = [10000 + (i * 50) + ((i % 5) * 100 - 250) for i in range(days)]
-            
-            return {
-                'dates': [d.strftime('%Y-%m-%d') for d in dates],
-                'equity': values,
-                'profit_loss': [v - 10000 for v in values],
-                'profit_loss_pct': [((v - 10000) / 10000) * 100 for v in values]
-            }
+            return (
+                timestamps,
+                values,
+                [v - 10000 for v in values],
+                [((v - 10000) / 10000) * 100 for v in values]
+            )
         
         # Get from Alpaca
+        from alpaca.trading.requests import GetPortfolioHistoryRequest
         history = self.trading_client.get_portfolio_history(
-            period=f"{days}D",
-            timeframe="1D"
+            GetPortfolioHistoryRequest(period=f"{days}D", timeframe="1D")
         )
+        return history.timestamp, history.equity, history.profit_loss, history.profit_loss_pct
+    
+    def sync_history(self, days=30):
+        """Append completed days newer than the local store and refresh today's point (at most every intraday_refresh s)"""
+        import numpy as np
+        from bar_cache import EXCHANGE_TZ
+        from portfolio_history import timestamps_to_nanoseconds
         
-        dates = [datetime.fromtimestamp(ts).strftime('%Y-%m-%d') for ts in history.timestamp]
+        now = time.time()
+        if now - self._synced_at < self.intraday_refresh and days <= self._synced_days:
+            return 0
+        
+        last = self.history.equity.last_timestamp()
+        if self.demo_mode:
+            # Generated history is regenerated rather than extended, over the longest window asked for
+            days = max(days, self._synced_days)
+            self.history.clear(trades=False)
+        elif last is None:
+            days = max(days, self.backfill_days)
+        else:
+            # The whole gap since the newest stored day: rows can't be inserted later, so a shorter fetch leaves a hole
+            days = int((now - last / 1e9) // 86400) + 1
+        
+        timestamps, *values = self._fetch_history(days)
+        timestamps = timestamps_to_nanoseconds(timestamps)
+        equity, profit_loss, profit_loss_pct = [np.asarray(v, dtype=float) for v in values]
+        # Daily points are stamped at New York midnight, so the exchange's date decides which day is still open
+        today = datetime.combine(datetime.now(EXCHANGE_TZ).date(), datetime.min.time(), EXCHANGE_TZ).timestamp() * 1e9
+        completed = timestamps < today
+        
+        self.intraday = None
+        if len(timestamps) and not completed[-1] and not np.isnan(equity[-1]):
+            self.intraday = (int(timestamps[-1]), float(equity[-1]), float(profit_loss[-1]), float(profit_loss_pct[-1]))
+        self._synced_at = now
+        self._synced_days = max(self._synced_days, days)
+        return self.history.record_equity(
+            timestamps[completed], equity[completed], profit_loss[completed], profit_loss_pct[completed]
+        )
+    
+    def get_portfolio_history(self, days=30):
+        """Get portfolio performance history (completed days from the local store, plus today's point)"""
+        from bar_cache import EXCHANGE_TZ
+        
+        self.sync_history(days)
+        points = self.history.equity.read(start=time.time() - days * 86400)
+        
+        rows = {name: values.tolist() for name, values in points.items()}
+        if self.intraday is not None:
+            for name, value in zip(['timestamp', 'equity', 'profit_loss', 'profit_loss_pct'], self.intraday):
+                rows[name].append(value)
+        
+        dates = [datetime.fromtimestamp(ts / 1e9, EXCHANGE_TZ).strftime('%Y-%m-%d') for ts in rows['timestamp']]
         
         return {
             'dates': dates,
-            'equity': history.equity,
-            'profit_loss': history.profit_loss,
-            'profit_loss_pct': history.profit_loss_pct
+            'equity': rows['equity'],
+            'profit_loss': rows['profit_loss'],
+            'profit_loss_pct': rows['profit_loss_pct']
         }
     
+    def performance(self, start=None, end=None, window=None):
+        """Sharpe, Sortino, max drawdown, rolling returns and realized win rate from the local store"""
+        return self.history.performance(start=start, end=end, window=window)
+    
+    def record_trade(self, symbol, qty, entry_price, exit_price, timestamp=None):
+        """Store a realized round trip for the trade statistics"""
+        return self.history.record_trade(symbol, qty, entry_price, exit_price, timestamp)
+    
     def calculate_metrics(self):
         """Calculate performance metrics"""
         
@@ -161,7 +225,8 @@ class PortfolioTracker:
             'losing_positions': losing_positions,
             'win_rate': win_rate,
             'largest_winner': largest_winner,
-            'largest_loser': largest_loser
+            'largest_loser': largest_loser,
+            'history': self.performance()  # stored equity curve and realized trades (no API calls)
         }
     
     def display_dashboard(self):
@@ -173,6 +238,7 @@ class PortfolioTracker:
         
         # Account summary
         account = self.get_account_summary()
+        self.sync_history()
         
         print("💰 ACCOUNT SUMMARY")
         print("-" * 70)
@@ -198,6 +264,15 @@ class PortfolioTracker:
         print(f"Losing:           {metrics['losing_positions']} 🔴")
         print(f"Win Rate:         {metrics['win_rate']:.1f}%")
         
+        history = metrics['history']
+        if history['points'] > 1:
+            print(f"\nSharpe Ratio:     {history['sharpe']:.2f}")
+            print(f"Sortino Ratio:    {history['sortino']:.2f}")
+            print(f"Max Drawdown:     {history['max_drawdown_pct']:.2f}%")
+            print(f"Return:           {history['total_return_pct']:+.2f}% over {history['points']} points")
+        if history['total_trades']:
+            print(f"Realized Trades:  {history['total_trades']} ({history['win_rate']:.1f}% won, ${history['realized_pnl']:+,.2f})")
+        
         # Positions
         print("\n📋 OPEN POSITIONS")
         print("-" * 70)
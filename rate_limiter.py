@@ -0,0 +1,45 @@
+"""
+SpineRip Rate Limiter - Token Bucket
+Shared request budget for concurrent API workers
+"""
+
+import time
+import threading
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+    
+    def __init__(self, rate, capacity=None):
+        """Allow `rate` tokens per second with bursts up to `capacity`"""
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self):
+        """Add tokens earned since the last refill (caller holds the lock)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self, tokens=1):
+        """Take tokens if available, without waiting"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+    
+    def acquire(self, tokens=1):
+        """Block until tokens are available, then take them"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
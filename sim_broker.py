@@ -0,0 +1,320 @@
+"""
+SpineRip Simulated Broker - In-Process Paper Execution
+Holds cash, positions and orders and fills them against incoming bars with slippage and submission latency
+"""
+
+import heapq
+import random
+import itertools
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+from broker_base import OPEN_STATUSES, BrokerBase, FakeAPIError, enum_value
+
+
+NS_PER_MINUTE = 60_000_000_000
+
+
+def _nanoseconds(timestamp):
+    """Epoch nanoseconds for a datetime, pandas Timestamp or integer"""
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    value = getattr(timestamp, 'value', None)  # pandas Timestamp
+    if value is not None:
+        return int(value)
+    return int(timestamp.timestamp() * 1_000_000) * 1000
+
+
+def _datetime(nanoseconds):
+    """UTC datetime for epoch nanoseconds (wall clock before the first bar)"""
+    if nanoseconds is None:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(nanoseconds / 1e9, tz=timezone.utc)
+
+
+def order_request(symbol, qty, side, order_type='market', limit_price=None, stop_price=None, order_class=None,
+                  take_profit=None, stop_loss=None, client_order_id=None):
+    """Order request with the attributes of alpaca's Market/Limit/StopOrderRequest (no alpaca-py needed)"""
+    return SimpleNamespace(
+        symbol=symbol, qty=qty, side=side, type=order_type, order_class=order_class,
+        limit_price=limit_price, stop_price=stop_price, client_order_id=client_order_id,
+        take_profit=SimpleNamespace(limit_price=take_profit) if take_profit is not None else None,
+        stop_loss=SimpleNamespace(stop_price=stop_loss) if stop_loss is not None else None
+    )
+
+
+class SimulatedBroker(BrokerBase):
+    """TradingClient stand-in that fills orders against the bar stream (long-only, no order book)"""
+    
+    def __init__(self, cash=100000.00, latency_ms=150, jitter_ms=50, slippage_bps=2.0, impact_bps=50.0,
+                 margin=1.0, seed=7, on_fill=None):
+        """Orders reach the market latency_ms (+ up to jitter_ms) after submission on the simulated clock"""
+        # Market and stop fills pay slippage_bps plus impact_bps x (order qty / bar volume)
+        super().__init__(cash, margin=margin)
+        self.latency = int(latency_ms * 1_000_000)
+        self.jitter = int(jitter_ms * 1_000_000)
+        self.slippage_bps = slippage_bps
+        self.impact_bps = impact_bps
+        self.rng = random.Random(seed)
+        self.on_fill = on_fill  # on_fill(order) after every fill
+        self.unreported = []  # fills waiting for on_fill (called outside the lock)
+        self.now = None  # simulated clock (ns): end of the newest bar seen
+        self.bars = {}  # symbol -> (timestamp, open, high, low, close, volume) of its newest bar
+        self.working = {}  # symbol -> {order id: order} that can still fill
+        self.arriving = {}  # symbol -> [order] submitted but not yet live (market orders fill on arrival)
+        self.resting = {}  # symbol -> {(side, type): heap of live limit/stop orders, most reachable first}
+        self.sequence = itertools.count()
+        self.submitted = 0
+        self.filled = 0
+    
+    def price(self, symbol):
+        """Last close seen for a symbol (None before its first bar)"""
+        bar = self.bars.get(symbol)
+        return bar[4] if bar is not None else None
+    
+    def _clock(self):
+        """Simulated time for new orders (wall clock before the first bar)"""
+        return _datetime(self.now)
+    
+    def update(self, symbol, timestamp, open_, high, low, close, volume=0.0):
+        """Advance a symbol to a new minute bar and fill what it reaches; returns fills"""
+        with self.lock:
+            fills = self._advance(symbol, _nanoseconds(timestamp), open_, high, low, close, volume)
+        self._report()
+        return fills
+    
+    def _advance(self, symbol, timestamp, open_, high, low, close, volume):
+        """update() under the lock"""
+        last = self.bars.get(symbol)
+        if last is not None and timestamp <= last[0]:
+            return 0
+        bar = (timestamp, float(open_), float(high), float(low), float(close), float(volume))
+        self.bars[symbol] = bar
+        end = timestamp + NS_PER_MINUTE
+        if self.now is None or end > self.now:
+            self.now = end
+        
+        return self._match(symbol, bar) if self.working.get(symbol) else 0
+    
+    def _report(self):
+        """Hand queued fills to on_fill"""
+        # Outside the lock: the callback may read the account while another thread holds
+        # the lock its caller is waiting on (e.g. an AccountSnapshot refresh)
+        with self.lock:
+            orders, self.unreported = self.unreported, []
+        for order in orders:
+            self.on_fill(order)
+    
+    def on_bar(self, bar):
+        """Feed one streamed bar (alpaca Bar or ReplayStream row)"""
+        return self.update(bar.symbol, bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume)
+    
+    def update_frame(self, symbol, df):
+        """Feed a symbol's bars newer than the last one seen (DataFrame or bar records); returns fills"""
+        if len(df) == 0:
+            return 0
+        if hasattr(df, 'columns'):
+            import pandas as pd
+            timestamps = pd.DatetimeIndex(df['timestamp']).as_unit('ns').asi8
+        else:
+            timestamps = np.asarray(df['timestamp'], dtype=np.int64)
+        
+        with self.lock:
+            last = self.bars.get(symbol)
+            first = 0 if last is None else int(np.searchsorted(timestamps, last[0], side='right'))
+            if first >= len(timestamps):
+                return 0
+            
+            # Without working orders only the newest bar matters
+            if not self.working.get(symbol):
+                first = len(timestamps) - 1
+            
+            fields = [np.asarray(df[field], dtype=float)[first:] for field in ('open', 'high', 'low', 'close', 'volume')]
+            fills = 0
+            for row, timestamp in enumerate(timestamps[first:]):
+                fills += self._advance(symbol, int(timestamp), *(values[row] for values in fields))
+        self._report()
+        return fills
+    
+    def update_frames(self, frames):
+        """update_frame for {symbol: bars}; returns fills"""
+        return sum(self.update_frame(symbol, df) for symbol, df in frames.items())
+    
+    def _slipped(self, price, side, qty, volume):
+        """Price after slippage and volume impact, against the order's side"""
+        participation = min(qty / volume, 1.0) if volume > 0 else 1.0
+        cost = (self.slippage_bps + self.impact_bps * participation) / 10_000
+        return price * (1 + cost) if side == 'buy' else price * (1 - cost)
+    
+    def _trigger(self, order, bar):
+        """Fill price if the bar reaches the order (None otherwise)"""
+        timestamp, open_, high, low, close, volume = bar
+        qty = float(order.qty)
+        side = order.side
+        
+        if order.type == 'market':
+            # No ticks inside a bar: interpolate open -> close at the moment the order arrives
+            offset = (order.active_at - timestamp) / NS_PER_MINUTE if order.active_at is not None else 0.0
+            price = open_ + (close - open_) * min(max(offset, 0.0), 1.0)
+            return self._slipped(price, side, qty, volume)
+        if order.type == 'limit':
+            # Limits never fill worse than their price (a gap through fills at the open)
+            if side == 'buy':
+                return min(open_, order.limit_price) if low <= order.limit_price else None
+            return max(open_, order.limit_price) if high >= order.limit_price else None
+        if order.type == 'stop':
+            if side == 'sell':
+                return self._slipped(min(open_, order.stop_price), side, qty, volume) if low <= order.stop_price else None
+            return self._slipped(max(open_, order.stop_price), side, qty, volume) if high >= order.stop_price else None
+        return None
+    
+    def _rest(self, order):
+        """Queue a live limit/stop order under its trigger price"""
+        # Keys sort the order a falling (sell stop, buy limit) or rising market reaches them in
+        if order.type == 'limit':
+            key = order.limit_price if order.side == 'sell' else -order.limit_price
+        else:
+            key = -order.stop_price if order.side == 'sell' else order.stop_price
+        heap = self.resting.setdefault(order.symbol, {}).setdefault((order.side, order.type), [])
+        heapq.heappush(heap, (key, next(self.sequence), order))
+    
+    def _reached(self, symbol, bar):
+        """Pop the resting orders a bar's range reaches, stops first (canceled ones are dropped here)"""
+        high, low = bar[2], bar[3]
+        books = self.resting.get(symbol)
+        working = self.working.get(symbol, {})
+        reached = []
+        if not books:
+            return reached
+        for side, kind in (('sell', 'stop'), ('buy', 'stop'), ('sell', 'limit'), ('buy', 'limit')):
+            heap = books.get((side, kind))
+            rising = (side == 'sell') == (kind == 'limit')
+            while heap and (high >= heap[0][0] if rising else low <= -heap[0][0]):
+                order = heapq.heappop(heap)[2]
+                if order.id in working:
+                    reached.append(order)
+        return reached
+    
+    def _match(self, symbol, bar):
+        """Fill the symbol's working orders this bar reaches; returns fills"""
+        # Only arriving orders and resting orders within the bar's range are looked at, so
+        # thousands of far-away exits cost nothing per bar
+        working = self.working[symbol]
+        end = bar[0] + NS_PER_MINUTE
+        markets = []
+        waiting = []
+        for order in self.arriving.get(symbol, ()):
+            if order.id not in working:
+                continue
+            if order.active_at is not None and order.active_at >= end:
+                waiting.append(order)  # still in flight
+            elif order.type == 'market':
+                markets.append(order)
+            else:
+                self._rest(order)
+        self.arriving[symbol] = waiting
+        
+        # Exits an entry activates are checked against the same bar
+        fills = 0
+        pending = markets + self._reached(symbol, bar)
+        while pending:
+            activated = []
+            for order in pending:
+                if order.id not in working:
+                    continue  # canceled by a sibling's fill
+                price = self._trigger(order, bar)
+                if price is not None:
+                    activated.extend(self._fill(order, price, bar[0]))
+                    fills += 1
+            for leg in activated:
+                self._rest(leg)
+            pending = self._reached(symbol, bar)
+        return fills
+    
+    def _fill(self, order, price, timestamp):
+        """Fill an order completely, update cash/positions; returns exit legs it activated"""
+        self._unwork(order)
+        if order.side == 'sell' and self.positions.get(order.symbol, [0.0])[0] < float(order.qty):
+            order.status = 'rejected'  # the shares were sold by another order first
+            return []
+        
+        self._book(order, price, _datetime(timestamp))
+        self.filled += 1
+        # A bracket entry's exits start working; an exit's siblings are canceled (and unworked)
+        activated = self._settle(order)
+        for leg in activated:
+            leg.active_at = None
+            self.working.setdefault(order.symbol, {})[leg.id] = leg
+        
+        if self.on_fill is not None:
+            self.unreported.append(order)
+        return activated
+    
+    def _unwork(self, order):
+        """Stop matching an order (its heap entry is dropped lazily) and release its buying power"""
+        self.reserved.pop(order.id, None)
+        working = self.working.get(order.symbol)
+        if working is not None:
+            working.pop(order.id, None)
+            if not working:
+                self.resting.pop(order.symbol, None)
+                self.arriving.pop(order.symbol, None)
+    
+    def _cancel(self, order):
+        """Cancel one open order and stop matching it"""
+        order.status = 'canceled'
+        self._unwork(order)
+    
+    def _new_order(self, symbol, qty, side, order_type, client_order_id, status='accepted', active_at=None, **fields):
+        """Create, register and (unless held) start working an order"""
+        order = super()._new_order(symbol, qty, side, order_type, client_order_id, status=status,
+                                   active_at=active_at, **fields)
+        if status != 'held':
+            self.working.setdefault(symbol, {})[order.id] = order
+            self.arriving.setdefault(symbol, []).append(order)
+        return order
+    
+    def submit_order(self, order_data):
+        """Accept a market/limit/stop order request (bracket and OCO aware); it fills on later bars"""
+        with self.lock:
+            client_order_id = self._client_order_id(order_data)
+            
+            symbol = order_data.symbol
+            side = enum_value(order_data.side)
+            qty = float(order_data.qty)
+            order_type = enum_value(order_data.type) or 'market'
+            order_class = enum_value(getattr(order_data, 'order_class', None)) or 'simple'
+            if qty <= 0:
+                raise FakeAPIError("qty must be > 0", status_code=422)
+            
+            # Long-only: sells are exits, buys need the cash
+            if side == 'sell' and (order_class == 'bracket' or qty > self.positions.get(symbol, [0.0])[0]):
+                raise FakeAPIError("insufficient qty available for order", status_code=403)
+            # Buys in flight hold their buying power, so a burst of orders can't spend the same cash twice
+            price = getattr(order_data, 'limit_price', None) or getattr(order_data, 'stop_price', None) or self.price(symbol)
+            cost = qty * float(price) if side == 'buy' and price is not None else 0.0
+            if cost > self.buying_power():
+                raise FakeAPIError("insufficient buying power", status_code=403)
+            
+            active_at = None
+            if self.now is not None:
+                active_at = self.now + self.latency + (self.rng.randrange(self.jitter + 1) if self.jitter else 0)
+            
+            order = self._place(order_data, client_order_id, symbol, qty, side, order_type, order_class,
+                                active_at=active_at)
+            
+            if cost:
+                self.reserved[order.id] = cost
+            self.submitted += 1
+            return order
+    
+    def close_position(self, symbol):
+        """Cancel the symbol's open orders and sell the whole position at market"""
+        with self.lock:
+            position = self.get_open_position(symbol)
+            for order in self.get_orders(SimpleNamespace(symbols=[symbol])):
+                if order.status in OPEN_STATUSES:  # bracket exits included: they would hold the shares
+                    self.cancel_order_by_id(order.id)
+            return self.submit_order(order_request(symbol, float(position.qty), 'sell'))
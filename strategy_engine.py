@@ -0,0 +1,468 @@
+"""
+SpineRip Strategy Engine - Executable Rule Sets
+Named strategies as scored rule groups, compiled once into vectorized predicates
+"""
+
+import operator
+import string
+
+import numpy as np
+
+from bar_cache import NS_PER_MINUTE, session_bounds
+from indicator_registry import compute_indicators
+
+
+# op -> (vectorized comparison, scalar comparison)
+OPERATORS = {
+    '<': (np.less, operator.lt),
+    '<=': (np.less_equal, operator.le),
+    '>': (np.greater, operator.gt),
+    '>=': (np.greater_equal, operator.ge)
+}
+
+# Columns every bar frame (and BarRing view) carries; anything else is computed if missing
+FRAME_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+# Columns derived from bar timestamps, per regular New York session (NaN outside 9:30-16:00 ET)
+SESSION_FIELDS = ['session_open', 'prior_session_close', 'session_minute']
+
+DEFAULT_STRATEGY = 'confluence'
+
+# Each group is an if/elif chain: the first branch whose conditions all hold scores its points.
+# Conditions are (left, op, right); operands are column names, numbers or (column, factor).
+# confirm_timeframes: higher timeframes (multi_timeframe.TIMEFRAMES) that must lean the same way to trade.
+STRATEGIES = {
+    'confluence': {
+        'name': 'SpineRip Confluence',
+        'timeframe': '1-60 minutes',
+        'description': 'Scores RSI, MACD, moving averages, Bollinger Bands and Stochastic together. Trades when enough of them agree.',
+        'indicators': ['RSI', 'MACD', 'SMA 20/50', 'Bollinger Bands', 'Stochastic', 'ADX'],
+        'risk': 'Medium - Multi-indicator confirmation',
+        'profit_target': '2% - 4% per trade',
+        'confirm_timeframes': ['15Min', '1Hour'],
+        'thresholds': {'strong_buy': 30, 'buy': 15, 'sell': -15, 'strong_sell': -30},
+        'rules': [
+            [
+                {'flag': 'rsi_oversold', 'when': [('rsi', '<', 30)], 'points': 20,
+                 'signal': "🔵 RSI Oversold (Bullish)"},
+                {'flag': 'rsi_overbought', 'when': [('rsi', '>', 70)], 'points': -20,
+                 'signal': "🔴 RSI Overbought (Bearish)"}
+            ],
+            [
+                {'flag': 'macd_bullish', 'when': [('macd', '>', 'macd_signal')], 'points': 15,
+                 'signal': "🔵 MACD Bullish Crossover"},
+                {'when': [], 'points': -15, 'signal': "🔴 MACD Bearish"}
+            ],
+            [
+                {'flag': 'ma_uptrend', 'when': [('close', '>', 'sma_20'), ('sma_20', '>', 'sma_50')], 'points': 15,
+                 'signal': "🔵 Price Above MAs (Uptrend)"},
+                {'flag': 'ma_downtrend', 'when': [('close', '<', 'sma_20'), ('sma_20', '<', 'sma_50')], 'points': -15,
+                 'signal': "🔴 Price Below MAs (Downtrend)"}
+            ],
+            [
+                {'flag': 'below_lower_band', 'when': [('close', '<', 'bb_lower')], 'points': 10,
+                 'signal': "🔵 Below Lower Band (Oversold)"},
+                {'flag': 'above_upper_band', 'when': [('close', '>', 'bb_upper')], 'points': -10,
+                 'signal': "🔴 Above Upper Band (Overbought)"}
+            ],
+            [
+                {'flag': 'stoch_oversold', 'when': [('stoch_k', '<', 20), ('stoch_d', '<', 20)], 'points': 10,
+                 'signal': "🔵 Stochastic Oversold"},
+                {'flag': 'stoch_overbought', 'when': [('stoch_k', '>', 80), ('stoch_d', '>', 80)], 'points': -10,
+                 'signal': "🔴 Stochastic Overbought"}
+            ],
+            [
+                {'flag': 'strong_trend', 'when': [('adx', '>', 25)], 'points': 0,
+                 'signal': "💪 Strong Trend (ADX: {adx:.1f})"},
+                {'when': [], 'points': 0, 'signal': "📊 Weak Trend (ADX: {adx:.1f})"}
+            ]
+        ]
+    },
+    'scalping': {
+        'name': 'Scalping',
+        'timeframe': '1-5 minutes',
+        'description': 'Quick trades for small profits. Buy low, sell high within minutes.',
+        'indicators': ['Stochastic', 'Bollinger Bands', 'Volume'],
+        'risk': 'Medium - Many small trades',
+        'profit_target': '0.1% - 0.5% per trade',
+        'confirm_timeframes': ['5Min'],
+        'thresholds': {'strong_buy': 35, 'buy': 20, 'sell': -20, 'strong_sell': -35},
+        'rules': [
+            [
+                {'when': [('stoch_k', '<', 20), ('stoch_d', '<', 20), ('stoch_k', '>', 'stoch_d')], 'points': 20,
+                 'signal': "🔵 Stochastic turning up from oversold"},
+                {'when': [('stoch_k', '>', 80), ('stoch_d', '>', 80), ('stoch_k', '<', 'stoch_d')], 'points': -20,
+                 'signal': "🔴 Stochastic turning down from overbought"}
+            ],
+            [
+                {'when': [('close', '<', 'bb_lower')], 'points': 15, 'signal': "🔵 Below Lower Band"},
+                {'when': [('close', '>', 'bb_upper')], 'points': -15, 'signal': "🔴 Above Upper Band"}
+            ],
+            [
+                {'when': [('volume', '>', ('volume_sma_20', 1.5)), ('close', '>', 'prev_close')], 'points': 5,
+                 'signal': "🔵 Buying volume spike"},
+                {'when': [('volume', '>', ('volume_sma_20', 1.5)), ('close', '<', 'prev_close')], 'points': -5,
+                 'signal': "🔴 Selling volume spike"}
+            ]
+        ]
+    },
+    'momentum': {
+        'name': 'Momentum Trading',
+        'timeframe': '15-60 minutes',
+        'description': 'Ride the wave! Buy stocks moving up strongly, sell when momentum slows.',
+        'indicators': ['RSI', 'MACD', 'ADX', 'Volume'],
+        'risk': 'Medium-High - Fast moving stocks',
+        'profit_target': '1% - 3% per trade',
+        'confirm_timeframes': ['15Min', '1Hour'],
+        'thresholds': {'strong_buy': 45, 'buy': 30, 'sell': -30, 'strong_sell': -45},
+        'rules': [
+            [
+                {'when': [('macd', '>', 'macd_signal'), ('macd', '>', 0)], 'points': 20,
+                 'signal': "🔵 MACD above signal and zero"},
+                {'when': [('macd', '<', 'macd_signal'), ('macd', '<', 0)], 'points': -20,
+                 'signal': "🔴 MACD below signal and zero"}
+            ],
+            [
+                {'when': [('rsi', '>', 55), ('rsi', '<', 75)], 'points': 15, 'signal': "🔵 RSI in bullish momentum zone"},
+                {'when': [('rsi', '<', 45), ('rsi', '>', 25)], 'points': -15, 'signal': "🔴 RSI in bearish momentum zone"}
+            ],
+            [
+                {'when': [('adx', '>', 25), ('close', '>', 'sma_20')], 'points': 15,
+                 'signal': "💪 Strong uptrend (ADX: {adx:.1f})"},
+                {'when': [('adx', '>', 25), ('close', '<', 'sma_20')], 'points': -15,
+                 'signal': "💪 Strong downtrend (ADX: {adx:.1f})"}
+            ],
+            [
+                {'when': [('volume', '>', ('volume_sma_20', 1.5)), ('close', '>', 'prev_close')], 'points': 10,
+                 'signal': "🔵 Volume confirms the move up"},
+                {'when': [('volume', '>', ('volume_sma_20', 1.5)), ('close', '<', 'prev_close')], 'points': -10,
+                 'signal': "🔴 Volume confirms the move down"}
+            ]
+        ]
+    },
+    'breakout': {
+        'name': 'Breakout Trading',
+        'timeframe': '30 minutes - 2 hours',
+        'description': 'Wait for stock to break resistance, then ride the move up.',
+        'indicators': ['Bollinger Bands', 'Volume', 'ADX', 'SMA 20/50'],
+        'risk': 'Medium - Wait for confirmation',
+        'profit_target': '2% - 5% per trade',
+        'confirm_timeframes': ['15Min', '1Hour'],
+        'thresholds': {'strong_buy': 45, 'buy': 30, 'sell': -30, 'strong_sell': -45},
+        'rules': [
+            [
+                {'when': [('close', '>', 'bb_upper'), ('volume', '>', ('volume_sma_20', 1.5))], 'points': 30,
+                 'signal': "🚀 Breakout above upper band on volume"},
+                {'when': [('close', '<', 'bb_lower'), ('volume', '>', ('volume_sma_20', 1.5))], 'points': -30,
+                 'signal': "📉 Breakdown below lower band on volume"}
+            ],
+            [
+                {'when': [('adx', '>', 20), ('sma_20', '>', 'sma_50')], 'points': 10,
+                 'signal': "🔵 Trend behind the breakout (ADX: {adx:.1f})"},
+                {'when': [('adx', '>', 20), ('sma_20', '<', 'sma_50')], 'points': -10,
+                 'signal': "🔴 Trend behind the breakdown (ADX: {adx:.1f})"}
+            ],
+            [
+                {'when': [('macd', '>', 'macd_signal')], 'points': 10, 'signal': "🔵 MACD Bullish"},
+                {'when': [('macd', '<', 'macd_signal')], 'points': -10, 'signal': "🔴 MACD Bearish"}
+            ]
+        ]
+    },
+    'reversal': {
+        'name': 'Reversal Trading',
+        'timeframe': '1-4 hours',
+        'description': 'Buy when downtrend ends, sell when uptrend ends. Catch the turn.',
+        'indicators': ['RSI', 'Stochastic', 'Bollinger Bands'],
+        'risk': 'High - Catching falling knives',
+        'profit_target': '3% - 7% per trade',
+        'confirm_timeframes': ['1Hour'],
+        'thresholds': {'strong_buy': 40, 'buy': 25, 'sell': -25, 'strong_sell': -40},
+        'rules': [
+            [
+                {'when': [('rsi', '<', 30), ('stoch_k', '>', 'stoch_d')], 'points': 25,
+                 'signal': "🔄 Oversold and turning up"},
+                {'when': [('rsi', '>', 70), ('stoch_k', '<', 'stoch_d')], 'points': -25,
+                 'signal': "🔄 Overbought and turning down"}
+            ],
+            [
+                {'when': [('stoch_k', '<', 20)], 'points': 10, 'signal': "🔵 Stochastic Oversold"},
+                {'when': [('stoch_k', '>', 80)], 'points': -10, 'signal': "🔴 Stochastic Overbought"}
+            ],
+            [
+                {'when': [('close', '<', 'bb_lower')], 'points': 10, 'signal': "🔵 Below Lower Band"},
+                {'when': [('close', '>', 'bb_upper')], 'points': -10, 'signal': "🔴 Above Upper Band"}
+            ]
+        ]
+    },
+    'gap': {
+        'name': 'Gap Trading',
+        'timeframe': 'Market open (9:30-11:00 AM)',
+        'description': 'Trade stocks that gap up/down at open due to news.',
+        'indicators': ['Gap size', 'Volume'],
+        'risk': 'High - Volatile opens',
+        'profit_target': '2% - 10% per trade',
+        'confirm_timeframes': [],
+        'thresholds': {'strong_buy': 40, 'buy': 25, 'sell': -25, 'strong_sell': -40},
+        'rules': [
+            [
+                {'when': [('session_minute', '<', 90), ('session_open', '>', ('prior_session_close', 1.01))],
+                 'points': 25, 'signal': "⬆️ Gapped up more than 1%"},
+                {'when': [('session_minute', '<', 90), ('session_open', '<', ('prior_session_close', 0.99))],
+                 'points': -25, 'signal': "⬇️ Gapped down more than 1%"}
+            ],
+            [
+                {'when': [('close', '>', 'session_open'), ('volume', '>', ('volume_sma_20', 2.0))], 'points': 15,
+                 'signal': "🔵 Holding the open on heavy volume"},
+                {'when': [('close', '<', 'session_open'), ('volume', '>', ('volume_sma_20', 2.0))], 'points': -15,
+                 'signal': "🔴 Fading the open on heavy volume"}
+            ]
+        ]
+    }
+}
+
+# Keys explain_strategy returns
+DESCRIPTION_KEYS = ['name', 'timeframe', 'description', 'indicators', 'risk', 'profit_target']
+
+
+def _operand(term, columns):
+    """Compile one side of a condition into a function of the column values (arrays or scalars)"""
+    if isinstance(term, str):
+        columns.append(term)
+        return lambda values: values[term]
+    if isinstance(term, tuple):
+        name, factor = term
+        columns.append(name)
+        return lambda values: factor * values[name]
+    return lambda values: term
+
+
+def _predicates(conditions, columns):
+    """Compile a list of conditions (all must hold) into a vectorized test and a single-row test"""
+    tests = [
+        (OPERATORS[op], _operand(left, columns), _operand(right, columns))
+        for left, op, right in conditions
+    ]
+    
+    def predicate(values, n):
+        if not tests:
+            return np.ones(n, dtype=bool)
+        (compare, _), left, right = tests[0]
+        hit = compare(left(values), right(values))
+        for (compare, _), left, right in tests[1:]:
+            hit &= compare(left(values), right(values))
+        return hit
+    
+    def row_predicate(row):
+        return all(compare(left(row), right(row)) for (_, compare), left, right in tests)
+    return predicate, row_predicate
+
+
+def _has_column(source, name):
+    """True if a DataFrame or BarRing view carries this column"""
+    if isinstance(source, np.ndarray):
+        return name in source.dtype.names
+    return name in source.columns
+
+
+def _column(source, name):
+    """One column of a DataFrame or BarRing view as float64"""
+    if isinstance(source, np.ndarray):
+        return source[name].astype(float)
+    return source[name].to_numpy(dtype=float)
+
+
+def session_columns(timestamps, open_, close):
+    """{session field: array}: the session's first open, the previous session's last close, minutes since 9:30"""
+    columns = {name: np.full(len(close), np.nan) for name in SESSION_FIELDS}
+    if timestamps is None or len(timestamps) == 0:
+        return columns
+    
+    # A session without bars (a holiday) is skipped, so the prior close is the last one actually traded
+    bounds = session_bounds(int(timestamps[0]), int(timestamps[-1]))
+    prior_close = np.nan
+    for (open_ns, _), start, end in zip(bounds, np.searchsorted(timestamps, bounds[:, 0]),
+                                        np.searchsorted(timestamps, bounds[:, 1])):
+        if end > start:
+            columns['session_open'][start:end] = open_[start]
+            columns['prior_session_close'][start:end] = prior_close
+            columns['session_minute'][start:end] = (timestamps[start:end] - open_ns) // NS_PER_MINUTE
+            prior_close = close[end - 1]
+    return columns
+
+
+def _timestamps(source):
+    """Bar times as UTC epoch ns, or None for a source without a timestamp column"""
+    if not _has_column(source, 'timestamp'):
+        return None
+    if isinstance(source, np.ndarray):
+        return source['timestamp'].astype(np.int64)
+    import pandas as pd
+    return pd.DatetimeIndex(source['timestamp']).as_unit('ns').asi8
+
+
+def _missing_indicators(source, missing):
+    """Indicators the source lacks (e.g. volume_sma_20), computed by the registry over its full history"""
+    values = {}
+    if any(name in SESSION_FIELDS for name in missing):
+        sessions = session_columns(_timestamps(source), _column(source, 'open'), _column(source, 'close'))
+        values.update({name: sessions[name] for name in missing if name in SESSION_FIELDS})
+    missing = [name for name in missing if name not in SESSION_FIELDS]
+    if missing:
+        values.update(compute_indicators(*(_column(source, f) for f in ['high', 'low', 'close', 'volume']),
+                                         columns=missing))
+    return values
+
+
+def gather_columns(source, columns):
+    """{column: float array} for every bar, computing missing indicators once"""
+    values = {}
+    missing = [name for name in columns if not _has_column(source, name)]
+    if missing:
+        values.update(_missing_indicators(source, missing))
+    for name in columns:
+        if name not in values:
+            values[name] = _column(source, name)
+    return values
+
+
+def latest_row(source, columns):
+    """{column: float} for the last bar, computing missing indicators once"""
+    latest = source[-1] if isinstance(source, np.ndarray) else source.iloc[-1]
+    row = {}
+    missing = [name for name in columns if not _has_column(source, name)]
+    if missing:
+        row.update({name: float(values[-1]) for name, values in _missing_indicators(source, missing).items()})
+    for name in columns:
+        if name not in row:
+            row[name] = float(latest[name])
+    return row
+
+
+class CompiledStrategy:
+    """A strategy's rule groups compiled into vectorized predicates"""
+    
+    def __init__(self, key, spec):
+        """Compile every branch once; columns lists what the rules read"""
+        self.key = key
+        self.spec = spec
+        self.thresholds = spec['thresholds']
+        self.confirm_timeframes = list(spec.get('confirm_timeframes', []))
+        
+        columns = []
+        self.groups = []
+        for group in spec['rules']:
+            branches = []
+            for branch in group:
+                columns.extend(field for _, field, _, _ in string.Formatter().parse(branch['signal']) if field)
+                predicate, row_predicate = _predicates(branch['when'], columns)
+                branches.append((branch.get('flag'), predicate, row_predicate, branch['points'], branch['signal']))
+            self.groups.append(branches)
+        columns.append('close')  # signals report the price
+        
+        self.columns = list(dict.fromkeys(columns))
+        self.indicator_columns = [name for name in self.columns if name not in FRAME_FIELDS + SESSION_FIELDS]
+    
+    def action(self, confidence):
+        """Action label for one confidence score"""
+        if confidence >= self.thresholds['strong_buy']:
+            return "🟢 STRONG BUY"
+        if confidence >= self.thresholds['buy']:
+            return "🔵 BUY"
+        if confidence <= self.thresholds['strong_sell']:
+            return "🔴 STRONG SELL"
+        if confidence <= self.thresholds['sell']:
+            return "🟠 SELL"
+        return "⚪ HOLD"
+    
+    def actions(self, confidence):
+        """Action labels for an array of confidence scores"""
+        return np.select(
+            [confidence >= self.thresholds['strong_buy'], confidence >= self.thresholds['buy'],
+             confidence <= self.thresholds['strong_sell'], confidence <= self.thresholds['sell']],
+            ["🟢 STRONG BUY", "🔵 BUY", "🔴 STRONG SELL", "🟠 SELL"],
+            default="⚪ HOLD"
+        )
+    
+    def score(self, values, n):
+        """(confidence, flags) for n rows of column arrays"""
+        confidence = np.zeros(n, dtype=np.int64)
+        flags = {}
+        for branches in self.groups:
+            remaining = None
+            for i, (flag, predicate, _, points, _) in enumerate(branches):
+                test = predicate(values, n)
+                if flag:
+                    flags[flag] = test
+                hit = test if remaining is None else test & remaining
+                if points:
+                    confidence += hit * points
+                if i < len(branches) - 1:
+                    remaining = ~hit if remaining is None else remaining & ~hit
+        return confidence, flags
+    
+    def evaluate(self, source, values=None):
+        """Confidence, action and rule flags for every row (NumPy arrays)"""
+        values = values if values is not None else gather_columns(source, self.columns)
+        confidence, flags = self.score(values, len(values['close']))
+        return {'confidence': confidence, 'action': self.actions(confidence), **flags}
+    
+    def evaluate_latest(self, source, row=None):
+        """Signal for the last bar: strategy, action, confidence, triggered signals and price"""
+        row = row if row is not None else latest_row(source, self.columns)
+        confidence = 0
+        signals = []
+        for branches in self.groups:
+            for _, _, row_predicate, points, signal in branches:
+                if row_predicate(row):
+                    confidence += points
+                    signals.append(signal.format_map(row))
+                    break
+        
+        return {
+            'strategy': self.key,
+            'action': self.action(confidence),
+            'confidence': confidence,
+            'signals': signals,
+            'price': row['close']
+        }
+
+
+_compiled = {}
+
+
+def get_strategy(name=DEFAULT_STRATEGY):
+    """Compiled strategy by name (compiled on first use, then cached)"""
+    key = name.lower()
+    if key not in _compiled:
+        if key not in STRATEGIES:
+            raise ValueError(f"unknown strategy {name!r} (known: {', '.join(STRATEGIES)})")
+        _compiled[key] = CompiledStrategy(key, STRATEGIES[key])
+    return _compiled[key]
+
+
+def strategy_columns(names=None):
+    """Union of the columns a set of strategies reads (all strategies by default)"""
+    columns = []
+    for name in names or STRATEGIES:
+        columns.extend(get_strategy(name).columns)
+    return list(dict.fromkeys(columns))
+
+
+def evaluate_strategies(source, names=None, latest=True):
+    """{name: result} for several strategies over one frame, sharing the column arrays between them"""
+    names = list(names or STRATEGIES)
+    columns = strategy_columns(names)
+    if latest:
+        row = latest_row(source, columns)
+        return {name: get_strategy(name).evaluate_latest(source, row) for name in names}
+    
+    values = gather_columns(source, columns)
+    return {name: get_strategy(name).evaluate(source, values) for name in names}
+
+
+def strategy_history(source, names=None):
+    """Confidence per bar for several strategies as one DataFrame (one column per strategy)"""
+    import pandas as pd
+    results = evaluate_strategies(source, names, latest=False)
+    index = source.index if isinstance(source, pd.DataFrame) else None
+    return pd.DataFrame({name: result['confidence'] for name, result in results.items()}, index=index)
@@ -0,0 +1,212 @@
+"""
+SpineRip Synthetic Data - Fast Demo & Benchmark Market Data
+Seeded, vectorized regime-switching GBM minute bars for offline testing
+"""
+
+import os
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bar_cache import BAR_DTYPE, BARS_PER_DAY, NS_PER_MINUTE, EXCHANGE_TZ
+
+
+MINUTES_PER_YEAR = 252 * BARS_PER_DAY
+
+# Market regimes: (annual drift, annual volatility, probability)
+REGIMES = {
+    'calm': (0.08, 0.15, 0.55),
+    'trending': (0.45, 0.25, 0.25),
+    'selloff': (-0.60, 0.45, 0.10),
+    'volatile': (0.00, 0.70, 0.10)
+}
+
+
+def session_minutes(bars, end=None):
+    """Last `bars` regular-session minutes at or before end: (UTC epoch ns, minutes since the 9:30 open)"""
+    # Weekdays only (no holiday calendar), built with zoneinfo so the demo runs without pandas
+    if end is None:
+        end = datetime.now(EXCHANGE_TZ)
+    elif isinstance(end, str):
+        end = datetime.fromisoformat(end)
+    end = end.replace(tzinfo=EXCHANGE_TZ) if end.tzinfo is None else end.astimezone(EXCHANGE_TZ)
+    end_ns = int(end.timestamp() * 1_000_000) * 1000
+    
+    offsets = np.arange(BARS_PER_DAY, dtype=np.int64)
+    sessions = []
+    count = 0
+    day = end.date()
+    while count < bars:
+        if day.weekday() < 5:
+            open_ = datetime(day.year, day.month, day.day, 9, 30, tzinfo=EXCHANGE_TZ)
+            minutes = int(open_.timestamp()) * 1_000_000_000 + offsets * NS_PER_MINUTE
+            keep = int(np.searchsorted(minutes, end_ns, side='right'))
+            sessions.append((minutes[:keep], offsets[:keep]))
+            count += keep
+        day -= timedelta(days=1)
+    
+    timestamps = np.concatenate([minutes for minutes, _ in reversed(sessions)] or [np.empty(0, dtype=np.int64)])
+    minute_of_day = np.concatenate([offsets for _, offsets in reversed(sessions)] or [np.empty(0, dtype=np.int64)])
+    return timestamps[len(timestamps) - bars:], minute_of_day[len(timestamps) - bars:]
+
+
+def session_timestamps(bars, end=None):
+    """Last `bars` regular-session minute timestamps (UTC DatetimeIndex) at or before end"""
+    import pandas as pd
+    return pd.DatetimeIndex(session_minutes(bars, end)[0], tz='UTC')
+
+
+class SyntheticMarketData:
+    """Seeded, vectorized minute bar generator"""
+    
+    def __init__(self, seed=42, start_price=100.0, mean_regime_bars=2 * BARS_PER_DAY):
+        """Initialize generator (same seed + symbol gives the same bars)"""
+        self.seed = seed
+        self.start_price = start_price
+        self.mean_regime_bars = mean_regime_bars
+    
+    def _rng(self, symbol, salt=0):
+        """Deterministic random stream per symbol"""
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), salt])
+    
+    def _regime_path(self, rng, n_bars):
+        """Regime parameters for every bar (random-length regime segments)"""
+        names = list(REGIMES)
+        probabilities = np.array([REGIMES[name][2] for name in names])
+        drift = np.array([REGIMES[name][0] for name in names]) / MINUTES_PER_YEAR
+        volatility = np.array([REGIMES[name][1] for name in names]) / np.sqrt(MINUTES_PER_YEAR)
+        
+        segments = n_bars // self.mean_regime_bars + 8
+        regimes = np.empty(0, dtype=np.int64)
+        while len(regimes) < n_bars:
+            lengths = rng.geometric(1 / self.mean_regime_bars, size=segments)
+            choices = rng.choice(len(names), size=segments, p=probabilities)
+            regimes = np.concatenate([regimes, np.repeat(choices, lengths)])
+        
+        regimes = regimes[:n_bars]
+        return drift[regimes], volatility[regimes]
+    
+    def generate_arrays(self, rng, n_bars, start_price=None, minute_of_day=None):
+        """OHLCV arrays for one price path"""
+        start_price = start_price or self.start_price
+        if minute_of_day is None:
+            minute_of_day = np.arange(n_bars) % BARS_PER_DAY
+        
+        drift, volatility = self._regime_path(rng, n_bars)
+        
+        # Intraday U-shape: more volatility and volume near the open and close
+        u_shape = 1 + 1.5 * ((minute_of_day - BARS_PER_DAY / 2) / (BARS_PER_DAY / 2)) ** 2
+        sigma = volatility * u_shape
+        
+        returns = drift - 0.5 * sigma ** 2 + sigma * rng.standard_normal(n_bars)
+        gaps = np.where(minute_of_day == 0, rng.normal(0, 0.01, n_bars), 0.0)  # overnight gaps
+        
+        log_close = np.log(start_price) + np.cumsum(returns + gaps)
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - returns)
+        
+        # Wicks extend beyond the open/close body
+        wick = np.abs(rng.standard_normal((2, n_bars))) * sigma * 0.6
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        
+        # Volume follows the U-shape and spikes with large moves
+        surprise = np.abs(returns) / sigma
+        volume = rng.lognormal(np.log(2500), 0.5, n_bars) * u_shape * (1 + 0.5 * surprise)
+        
+        return {
+            'open': np.round(open_, 2),
+            'high': np.round(high, 2),
+            'low': np.round(low, 2),
+            'close': np.round(close, 2),
+            'volume': np.round(volume).astype(np.int64)
+        }
+    
+    def generate(self, symbol, days=30, end=None):
+        """Bars shaped like SpineRipAI.get_market_data (days x 390 minutes)"""
+        import pandas as pd
+        timestamps, minute_of_day = session_minutes(days * BARS_PER_DAY, end)
+        arrays = self.generate_arrays(self._rng(symbol), len(timestamps), minute_of_day=minute_of_day)
+        
+        df = pd.DataFrame(arrays)
+        df.insert(0, 'timestamp', pd.DatetimeIndex(timestamps, tz='UTC'))
+        return df
+    
+    def generate_records(self, symbol, days=30, end=None):
+        """generate() as BAR_DTYPE records (the same bars, no pandas needed)"""
+        timestamps, minute_of_day = session_minutes(days * BARS_PER_DAY, end)
+        arrays = self.generate_arrays(self._rng(symbol), len(timestamps), minute_of_day=minute_of_day)
+        return self._records(timestamps, arrays)
+    
+    def extend(self, symbol, df, end=None, keep=None):
+        """Append bars after df's last timestamp up to end (a live-looking feed)"""
+        import pandas as pd
+        last = pd.Timestamp(df['timestamp'].iloc[-1])
+        timestamps = session_timestamps(len(df) + BARS_PER_DAY, end)
+        timestamps = timestamps[timestamps > last]
+        if len(timestamps) == 0:
+            return df
+        
+        rng = self._rng(symbol, salt=int(timestamps[0].value // 60_000_000_000))
+        arrays = self.generate_arrays(
+            rng, len(timestamps),
+            start_price=float(df['close'].iloc[-1]),
+            minute_of_day=self._minute_of_day(timestamps)
+        )
+        new_rows = pd.DataFrame(arrays)
+        new_rows.insert(0, 'timestamp', timestamps)
+        
+        df = pd.concat([df, new_rows], ignore_index=True)
+        if keep is not None and len(df) > keep:
+            df = df.iloc[-keep:].reset_index(drop=True)
+        return df
+    
+    def generate_many(self, symbols, days=30, end=None):
+        """{symbol: DataFrame} for a whole watchlist"""
+        return {symbol: self.generate(symbol, days=days, end=end) for symbol in symbols}
+    
+    def save_memmap(self, symbols, days, out_dir, end=None):
+        """Write each symbol's bars to a memory-mapped .npy file (bar cache record layout)"""
+        os.makedirs(out_dir, exist_ok=True)
+        timestamps, minute_of_day = session_minutes(days * BARS_PER_DAY, end)
+        
+        paths = {}
+        for symbol in symbols:
+            arrays = self.generate_arrays(self._rng(symbol), len(timestamps), minute_of_day=minute_of_day)
+            path = os.path.join(out_dir, f"{symbol.upper()}.npy")
+            records = np.lib.format.open_memmap(path, mode='w+', dtype=BAR_DTYPE, shape=(len(timestamps),))
+            records[:] = self._records(timestamps, arrays)
+            records.flush()
+            paths[symbol] = path
+        
+        return paths
+    
+    def to_bar_cache(self, bar_cache, symbols, days, end=None):
+        """Fill a BarCache with generated history (for offline backtests)"""
+        for symbol, df in self.generate_many(symbols, days=days, end=end).items():
+            bar_cache.append(symbol, df)
+    
+    def _records(self, timestamps, arrays):
+        """BAR_DTYPE records for generated arrays"""
+        records = np.empty(len(timestamps), dtype=BAR_DTYPE)
+        records['timestamp'] = timestamps
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            records[field] = arrays[field]
+        records['trade_count'] = np.nan
+        records['vwap'] = np.nan
+        return records
+    
+    def _minute_of_day(self, timestamps):
+        """Minutes since the 9:30 AM ET open for each timestamp"""
+        local = timestamps.tz_convert('America/New_York')
+        return np.asarray((local.hour - 9) * 60 + local.minute - 30)
+
+
+def load_memmap(path):
+    """Open bars written by save_memmap as a DataFrame"""
+    import pandas as pd
+    records = np.load(path, mmap_mode='r')
+    df = pd.DataFrame({field: records[field] for field in ('open', 'high', 'low', 'close', 'volume')})
+    df.insert(0, 'timestamp', pd.to_datetime(records['timestamp'], unit='ns', utc=True))
+    return df
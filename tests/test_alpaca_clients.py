@@ -0,0 +1,103 @@
+"""ClientRegistry pooling, retries and backoff against the local AlpacaStubServer"""
+
+import time
+
+import pytest
+
+pytest.importorskip('alpaca')
+
+from alpaca.common.exceptions import APIError
+from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import MarketOrderRequest
+
+import alpaca_clients
+from alpaca_clients import ClientRegistry
+from alpaca_stub import AlpacaStubServer
+from fake_broker import FakeBroker
+
+
+@pytest.fixture
+def stub():
+    with AlpacaStubServer(FakeBroker(cash=5000.0, prices={'AAPL': 100.0})) as server:
+        yield server
+
+
+@pytest.fixture
+def registry(stub):
+    registry = ClientRegistry(retries=3, backoff=0.05, trading_url=stub.url, data_url=stub.url)
+    yield registry
+    registry.close()
+
+
+def test_clients_are_shared_per_credential_set(registry):
+    trading = registry.trading('key', 'secret')
+    assert registry.trading('key', 'secret') is trading
+    assert registry.data('key', 'secret')._session is trading._session
+    assert registry.trading('other', 'secret')._session is not trading._session
+
+
+def test_requests_reuse_one_keep_alive_connection(registry, stub):
+    client = registry.trading('key', 'secret')
+    for _ in range(10):
+        assert float(client.get_account().cash) == 5000.0
+    assert stub.requests == 10
+    assert stub.connections == 1
+
+
+def test_idempotent_calls_retry_with_backoff(registry, stub):
+    client = registry.trading('key', 'secret')
+    stub.fail_next(2, status_code=503)
+    started = time.perf_counter()
+    assert float(client.get_account().cash) == 5000.0
+    elapsed = time.perf_counter() - started
+
+    # urllib3 retries at once, then sleeps backoff x 2 before the third attempt
+    assert stub.requests == 3
+    assert elapsed >= 0.1
+
+
+def test_retries_give_up_with_the_last_status(registry, stub):
+    client = registry.trading('key', 'secret')
+    stub.fail_next(10, status_code=503)
+    with pytest.raises(APIError) as error:
+        client.get_account()
+    assert error.value.status_code == 503
+    assert stub.requests == registry.retries + 1  # alpaca-py's own retries are off
+
+
+def test_order_submissions_are_not_retried(registry, stub):
+    # OrderExecutor retries submissions itself, against their client_order_id
+    client = registry.trading('key', 'secret')
+    stub.fail_next(1, status_code=503)
+    request = MarketOrderRequest(symbol='AAPL', qty=1, side=OrderSide.BUY, time_in_force=TimeInForce.DAY)
+    with pytest.raises(APIError):
+        client.submit_order(request)
+    assert stub.requests == 1
+    assert stub.broker.orders == {}
+
+
+def test_default_timeout_applies(stub):
+    registry = ClientRegistry(timeout=(0.5, 0.5), retries=0, trading_url=stub.url)
+    session = registry.session('key', 'secret')
+    seen = {}
+    original = session.get_adapter(stub.url).send
+
+    def send(prepared, **kwargs):
+        seen.update(kwargs)
+        return original(prepared, **kwargs)
+
+    session.get_adapter(stub.url).send = send
+    registry.trading('key', 'secret').get_account()
+    assert seen['timeout'] == (0.5, 0.5)
+    registry.close()
+
+
+def test_unchecked_alpaca_versions_keep_the_stock_session(stub, monkeypatch, capsys):
+    monkeypatch.setattr(alpaca_clients, 'SESSION_PATCH_VERSIONS', ((0, 0), (0, 1)))
+    registry = ClientRegistry(trading_url=stub.url)
+    client = registry.trading('key', 'secret')
+    assert client._session is not registry.sessions.get(('key', 'secret'))
+    assert client._retry > 0
+    assert float(client.get_account().cash) == 5000.0
+    assert "Shared Alpaca sessions need" in capsys.readouterr().out
+    registry.close()
@@ -0,0 +1,127 @@
+"""BarCache delta fetches and gap fills against an offline data client"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bar_cache import BarCache
+from synthetic_data import SyntheticMarketData
+
+pytest.importorskip('alpaca')
+
+
+# Thursday 16:00 ET; the stub's history runs up to here
+END = datetime(2024, 3, 14, 20, 0, tzinfo=timezone.utc)
+
+
+class StubDataClient:
+    """StockHistoricalDataClient stand-in: bars from request.start up to `now`, every request logged"""
+
+    def __init__(self, symbols, days=40):
+        generator = SyntheticMarketData(seed=3)
+        self.history = {symbol: generator.generate(symbol, days=days, end=END) for symbol in symbols}
+        self.now = END
+        self.requests = []
+
+    def get_stock_bars(self, request):
+        symbols = request.symbol_or_symbols
+        symbols = symbols if isinstance(symbols, list) else [symbols]
+        start = pd.Timestamp(request.start)
+        start = start.tz_localize('UTC') if start.tz is None else start.tz_convert('UTC')
+        self.requests.append((sorted(symbols), start))
+
+        parts = []
+        for symbol in symbols:
+            frame = self.history.get(symbol)
+            if frame is None:
+                continue
+            frame = frame[(frame['timestamp'] >= start) & (frame['timestamp'] <= pd.Timestamp(self.now))]
+            frame = frame.set_index(pd.MultiIndex.from_arrays(
+                [[symbol] * len(frame), frame['timestamp']], names=['symbol', 'timestamp']
+            )).drop(columns='timestamp')
+            parts.append(frame)
+        df = pd.concat(parts) if parts else pd.DataFrame()
+        return SimpleNamespace(df=df)
+
+    def expected(self, symbol, days):
+        frame = self.history[symbol]
+        start = pd.Timestamp(self.now - timedelta(days=days))
+        frame = frame[(frame['timestamp'] >= start) & (frame['timestamp'] <= pd.Timestamp(self.now))]
+        return frame.reset_index(drop=True)
+
+
+def assert_bars(actual, expected):
+    np.testing.assert_array_equal(actual['timestamp'].to_numpy(), expected['timestamp'].to_numpy())
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        np.testing.assert_allclose(actual[field].to_numpy(dtype=float), expected[field].to_numpy(dtype=float))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BarCache(cache_dir=str(tmp_path))
+
+
+def test_cold_fetch_then_delta(cache):
+    client = StubDataClient(['AAPL'])
+    client.now = END - timedelta(hours=2)
+    assert_bars(cache.get_bars(client, 'AAPL', days=5, now=client.now), client.expected('AAPL', 5))
+    assert client.requests == [(['AAPL'], pd.Timestamp(client.now - timedelta(days=5)))]
+
+    # Two hours later only the bars after the last cached one are requested
+    last = cache.last_timestamp('AAPL')
+    client.now = END
+    df = cache.get_bars(client, 'AAPL', days=5, now=client.now)
+    assert client.requests[-1] == (['AAPL'], last + timedelta(minutes=1))
+    assert_bars(df, client.expected('AAPL', 5))
+    assert df['timestamp'].is_unique
+
+
+def test_gap_after_downtime_is_filled(cache):
+    client = StubDataClient(['AAPL'])
+    client.now = END - timedelta(days=3)
+    cache.get_bars(client, 'AAPL', days=5, now=client.now)
+    last = cache.last_timestamp('AAPL')
+
+    # Three days offline: one delta request covers the whole gap
+    client.now = END
+    df = cache.get_bars(client, 'AAPL', days=5, now=client.now)
+    assert len(client.requests) == 2
+    assert client.requests[-1][1] == last + timedelta(minutes=1)
+    assert_bars(df, client.expected('AAPL', 5))
+
+
+def test_longer_window_refetches_in_full(cache):
+    client = StubDataClient(['AAPL'])
+    cache.get_bars(client, 'AAPL', days=2, now=END)
+
+    # The cache only covers two days, so a ten-day window starts over from its beginning
+    df = cache.get_bars(client, 'AAPL', days=10, now=END)
+    assert client.requests[-1][1] == pd.Timestamp(END - timedelta(days=10))
+    assert_bars(df, client.expected('AAPL', 10))
+
+
+def test_cold_and_warm_symbols_are_batched_separately(cache):
+    client = StubDataClient(['AAPL', 'MSFT'])
+    client.now = END - timedelta(hours=1)
+    cache.get_bars(client, 'AAPL', days=5, now=client.now)
+
+    client.now = END
+    frames = cache.get_bars_many(client, ['AAPL', 'MSFT'], days=5, now=client.now)
+    batches = {tuple(symbols): start for symbols, start in client.requests[1:]}
+    assert batches[('MSFT',)] == pd.Timestamp(END - timedelta(days=5))
+    assert batches[('AAPL',)] > END - timedelta(hours=2)
+    for symbol in ('AAPL', 'MSFT'):
+        assert_bars(frames[symbol], client.expected(symbol, 5))
+
+
+def test_symbol_without_bars_resumes_from_last_fetch(cache):
+    client = StubDataClient(['AAPL'])
+    client.now = END - timedelta(hours=1)
+    assert len(cache.get_bars(client, 'NOPE', days=5, now=client.now)) == 0
+
+    client.now = END
+    cache.get_bars(client, 'NOPE', days=5, now=client.now)
+    assert client.requests[-1] == (['NOPE'], pd.Timestamp(END - timedelta(hours=1)))
@@ -0,0 +1,92 @@
+"""BarStreamer driven by ReplayStream: per-symbol decisions on new bars only"""
+
+import numpy as np
+import pytest
+
+from bar_stream import BarStreamer, ReplayStream
+from instrumentation import Instrumentation
+from synthetic_data import SyntheticMarketData
+from trading_ai import SpineRipAI, compute_technicals
+
+
+SYMBOLS = ['AAPL', 'MSFT']
+REPLAYED = 30  # bars per symbol held back from the seeded history and streamed instead
+
+
+class RecordingBot:
+    """The SpineRipBot surface BarStreamer uses; records every decision instead of trading"""
+
+    def __init__(self, history):
+        self.ai = SpineRipAI()
+        self.ai.get_market_data_many = lambda symbols, days: {symbol: history[symbol] for symbol in symbols}
+        self.broker = None
+        self.strategy = 'confluence'
+        self.multi_timeframe = False
+        self.instrumentation = Instrumentation(enabled=False)
+        self.decisions = []
+
+    def execute_signal(self, symbol, signal):
+        self.decisions.append((symbol, signal))
+
+    def check_positions(self):
+        pass
+
+    def save_checkpoint(self, store=None, force=True):
+        pass
+
+
+@pytest.fixture(scope='module')
+def bars():
+    generator = SyntheticMarketData(seed=5)
+    return {symbol: generator.generate(symbol, days=2, end='2024-03-14 16:00') for symbol in SYMBOLS}
+
+
+def run_stream(bars, replay, coalesce=False, symbols=SYMBOLS):
+    history = {symbol: df.iloc[:-REPLAYED].reset_index(drop=True) for symbol, df in bars.items()}
+    bot = RecordingBot(history)
+    streamer = BarStreamer(bot, symbols, ReplayStream(replay), history_days=2, coalesce=coalesce)
+    streamer.run()
+    return bot, streamer
+
+
+def test_every_new_bar_is_one_decision_for_its_symbol(bars):
+    replay = {symbol: df.iloc[-REPLAYED:] for symbol, df in bars.items()}
+    bot, streamer = run_stream(bars, replay)
+
+    assert streamer.decisions == len(bot.decisions) == REPLAYED * len(SYMBOLS)
+    for symbol in SYMBOLS:
+        prices = [signal['price'] for decided, signal in bot.decisions if decided == symbol]
+        np.testing.assert_allclose(prices, bars[symbol]['close'].iloc[-REPLAYED:], rtol=1e-6)
+        assert len(streamer.store.get(symbol)) == len(bars[symbol])
+
+
+def test_only_the_changed_symbol_is_analyzed(bars):
+    bot, _ = run_stream(bars, {'AAPL': bars['AAPL'].iloc[-REPLAYED:]})
+    assert {symbol for symbol, _ in bot.decisions} == {'AAPL'}
+    assert len(bot.decisions) == REPLAYED
+
+
+def test_old_and_unsubscribed_bars_are_ignored(bars):
+    # Bars already in the seeded history and symbols outside the watchlist never reach a decision
+    replay = {'AAPL': bars['AAPL'].iloc[-REPLAYED - 10:], 'MSFT': bars['MSFT'].iloc[-REPLAYED:]}
+    bot, streamer = run_stream(bars, replay, symbols=['AAPL'])
+    assert [symbol for symbol, _ in bot.decisions] == ['AAPL'] * REPLAYED
+    assert 'MSFT' not in streamer.store
+
+
+def test_streamed_indicators_match_a_full_recompute(bars):
+    bot, _ = run_stream(bars, {'AAPL': bars['AAPL'].iloc[-REPLAYED:]})
+    expected = bot.ai.generate_signal(compute_technicals(bars['AAPL'].copy()))
+    actual = bot.decisions[-1][1]
+    for key in ('price', 'rsi', 'macd', 'adx'):
+        assert actual[key] == pytest.approx(expected[key], rel=1e-4, abs=1e-4), key
+
+
+def test_coalesced_bars_end_on_the_latest_bar(bars):
+    replay = {symbol: df.iloc[-REPLAYED:] for symbol, df in bars.items()}
+    bot, streamer = run_stream(bars, replay, coalesce=True)
+
+    assert 0 < streamer.decisions <= REPLAYED * len(SYMBOLS)
+    for symbol in SYMBOLS:
+        last = [signal for decided, signal in bot.decisions if decided == symbol][-1]
+        assert last['price'] == pytest.approx(bars[symbol]['close'].iloc[-1], rel=1e-6)
@@ -0,0 +1,143 @@
+"""OrderExecutor retries, client order ID idempotency and bracket fills against FakeBroker"""
+
+import time
+
+import pytest
+
+pytest.importorskip('alpaca')
+
+from fake_broker import FakeBroker
+from order_executor import OrderExecutor
+from rate_limiter import TokenBucket
+
+
+class CountingBroker(FakeBroker):
+    """FakeBroker that counts the TradingClient calls it serves"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = {}
+
+    def __getattribute__(self, name):
+        if name in ('submit_order', 'get_orders', 'get_order_by_id', 'get_order_by_client_id', 'cancel_order_by_id'):
+            calls = super().__getattribute__('calls')
+            calls[name] = calls.get(name, 0) + 1
+        return super().__getattribute__(name)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def broker():
+    return CountingBroker(prices={'AAPL': 100.0, 'MSFT': 50.0})
+
+
+@pytest.fixture
+def fills():
+    return []
+
+
+@pytest.fixture
+def finished():
+    return []
+
+
+@pytest.fixture
+def executor(broker, fills, finished):
+    executor = OrderExecutor(
+        broker, on_fill=lambda record, order: fills.append((record['symbol'], order.side, float(order.filled_qty))),
+        on_done=finished.append, retry_delay=0.01, poll_interval=0.02,
+        rate_limiter=TokenBucket(rate=1000, capacity=1000)
+    )
+    yield executor
+    executor.stop()
+
+
+def test_retryable_errors_are_retried(executor, broker):
+    broker.fail_next(2, status_code=503)
+    record = executor.buy_bracket('AAPL', 10, 100.0, 2, 4)
+    wait_for(lambda: record['status'] == 'filled')
+    assert record['attempts'] == 3
+    assert len([order for order in broker.orders.values() if order.parent is None]) == 1
+
+
+def test_client_errors_fail_without_retry(executor, broker, finished):
+    broker.fail_next(1, status_code=422)
+    record = executor.wait(executor.buy_bracket('AAPL', 10, 100.0, 2, 4), timeout=5)
+    assert record['status'] == 'failed'
+    assert record['attempts'] == 1
+    assert broker.orders == {}
+    assert finished == [record]
+
+
+def test_lost_response_is_not_submitted_twice(executor, broker):
+    # The broker accepted the order but the response timed out: the retry finds it by client order ID
+    broker.fail_next(1, status_code=504, reach_broker=True)
+    record = executor.buy_bracket('AAPL', 10, 100.0, 2, 4)
+    wait_for(lambda: record['status'] == 'filled')
+    assert record['attempts'] == 1
+    assert broker.calls['submit_order'] == 1
+    assert broker.get_order_by_client_id(record['client_order_id']).id == record['order_id']
+
+
+def test_client_order_id_is_reused_on_retry(executor, broker):
+    broker.fail_next(1, status_code=500)
+    record = executor.buy_bracket('AAPL', 10, 100.0, 2, 4)
+    wait_for(lambda: record['status'] == 'filled')
+    assert record['attempts'] == 2
+    assert list(broker.by_client_id).count(record['client_order_id']) == 1
+
+
+def test_bracket_exit_fill_is_reported_and_cancels_its_sibling(executor, broker, fills, finished):
+    record = executor.buy_bracket('AAPL', 10, 100.0, 2, 4)
+    wait_for(lambda: record['status'] == 'filled')
+    assert not record['done'].is_set()  # the exits are still live
+    assert fills == [('AAPL', 'buy', 10.0)]
+
+    broker.set_price('AAPL', 104.5)  # take profit at 104.00
+    executor.wait(record, timeout=5)
+    assert record['done'].is_set()
+    assert fills == [('AAPL', 'buy', 10.0), ('AAPL', 'sell', 10.0)]
+    assert sorted(state['status'] for state in record['legs'].values()) == ['canceled', 'filled']
+    assert finished == [record]
+    assert 'AAPL' not in broker.positions
+
+
+def test_partial_exit_fills_are_reported(executor, broker, fills):
+    record = executor.buy_bracket('AAPL', 10, 100.0, 2, 4)
+    wait_for(lambda: record['status'] == 'filled')
+    take_profit = next(order for order in broker.orders.values() if order.parent is not None and order.type == 'limit')
+
+    with broker.lock:
+        take_profit.status, take_profit.filled_qty, take_profit.filled_avg_price = 'partially_filled', '4', '104'
+    wait_for(lambda: len(fills) == 2)
+    assert fills[-1] == ('AAPL', 'sell', 4.0)
+    assert not record['done'].is_set()
+
+
+def test_sell_cancels_resting_exits_first(executor, broker):
+    entry = executor.buy_bracket('AAPL', 10, 100.0, 2, 4)
+    wait_for(lambda: entry['status'] == 'filled')
+
+    sell = executor.wait(executor.sell('AAPL', 10), timeout=5)
+    assert sell['status'] == 'filled'
+    assert all(order.status in ('filled', 'canceled') for order in broker.orders.values())
+    assert 'AAPL' not in broker.positions
+    executor.wait(entry, timeout=5)
+    assert sorted(state['status'] for state in entry['legs'].values()) == ['canceled', 'canceled']
+
+
+def test_tracking_lists_open_orders_once_per_interval(executor, broker):
+    records = [executor.buy_bracket(symbol, 10, 100.0, 2, 4) for symbol in ('AAPL', 'MSFT')]
+    wait_for(lambda: all(record['status'] == 'filled' for record in records))
+    broker.calls.clear()
+
+    # Four live exit legs, and no per-order lookups while they rest
+    time.sleep(0.3)
+    assert broker.calls.get('get_order_by_id', 0) == 0
+    assert 0 < broker.calls['get_orders'] <= 0.3 / executor.poll_interval + 1
@@ -0,0 +1,46 @@
+"""Vectorized score_signals against the per-bar generate_signal for every strategy"""
+
+import numpy as np
+import pytest
+
+from strategy_engine import STRATEGIES
+from synthetic_data import SyntheticMarketData
+from trading_ai import SpineRipAI, compute_technicals, score_signals
+
+
+@pytest.fixture(scope='module')
+def ai():
+    return SpineRipAI()
+
+
+def _frames():
+    history = SyntheticMarketData(seed=11).generate('SCORE', days=3, end='2024-03-14 16:00')
+    frames = {f"bars={n}": history.iloc[-n:].reset_index(drop=True) for n in [1, 30, 60, 390]}
+    flat = history.iloc[-120:].reset_index(drop=True)
+    flat.loc[60:, ['open', 'high', 'low', 'close']] = 100.0
+    frames['flat'] = flat
+    return {name: compute_technicals(df.copy()) for name, df in frames.items()}
+
+
+FRAMES = _frames()
+
+
+@pytest.mark.parametrize('frame', list(FRAMES))
+@pytest.mark.parametrize('strategy', list(STRATEGIES))
+def test_last_row_matches_generate_signal(ai, strategy, frame):
+    df = FRAMES[frame]
+    scores = score_signals(df, strategy)
+    signal = ai.generate_signal(df, strategy=strategy)
+    assert len(scores['confidence']) == len(df)
+    assert scores['confidence'][-1] == signal['confidence']
+    assert scores['action'][-1] == signal['action']
+
+
+@pytest.mark.parametrize('strategy', list(STRATEGIES))
+def test_every_row_matches_generate_signal(ai, strategy):
+    df = FRAMES['bars=390']
+    scores = score_signals(df, strategy)
+    for row in np.linspace(0, len(df) - 1, 25).astype(int):
+        signal = ai.generate_signal(df.iloc[:row + 1], strategy=strategy)
+        assert scores['confidence'][row] == signal['confidence'], row
+        assert scores['action'][row] == signal['action'], row
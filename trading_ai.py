@@ -4,35 +4,95 @@ Uses Alpaca API + pandas-ta for technical analysis
 """
 
 import os
-import json
-import requests
+import importlib.util
 from datetime import datetime, timedelta
-import pandas as pd
 
-# Install: pip install pandas-ta-classic alpaca-py
-try:
-    import pandas_ta_classic as ta
-except ImportError:
-    print("Installing pandas-ta-classic...")
-    os.system("pip install pandas-ta-classic alpaca-py")
+# pandas, pandas-ta-classic and alpaca-py load on first use (pip install pandas pandas-ta-classic alpaca-py);
+# without pandas the demo analyzes synthetic bars as NumPy records
+
+from indicator_engine import IndicatorEngine
+from multi_timeframe import MultiTimeframe
+from indicator_kernels import get_backend
+from indicator_registry import compute_frame
+from strategy_engine import (
+    STRATEGIES, DEFAULT_STRATEGY, DESCRIPTION_KEYS, get_strategy, evaluate_strategies, latest_row
+)
+from bar_cache import BarCache, split_bars, minute_bars_request, to_records
+from synthetic_data import SyntheticMarketData
+
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+# Indicator columns read by generate_signal / score_signals
+SIGNAL_COLUMNS = get_strategy(DEFAULT_STRATEGY).indicator_columns
+
+
+def pandas_ta_technicals(df):
+    """Compute every indicator column with pandas-ta (the reference implementation)"""
     import pandas_ta_classic as ta
+    
+    # Trend Indicators
+    df['sma_20'] = ta.sma(df['close'], length=20)
+    df['sma_50'] = ta.sma(df['close'], length=50)
+    df['ema_12'] = ta.ema(df['close'], length=12)
+    df['ema_26'] = ta.ema(df['close'], length=26)
+    
+    # Momentum Indicators
+    df['rsi'] = ta.rsi(df['close'], length=14)
+    macd = ta.macd(df['close'])
+    df['macd'] = macd['MACD_12_26_9']
+    df['macd_signal'] = macd['MACDs_12_26_9']
+    df['macd_hist'] = macd['MACDh_12_26_9']
+    
+    # Volatility Indicators
+    bbands = ta.bbands(df['close'], length=20)
+    df['bb_upper'] = bbands['BBU_20_2.0']
+    df['bb_middle'] = bbands['BBM_20_2.0']
+    df['bb_lower'] = bbands['BBL_20_2.0']
+    
+    # Volume Indicators
+    df['obv'] = ta.obv(df['close'], df['volume'])
+    
+    # Stochastic
+    stoch = ta.stoch(df['high'], df['low'], df['close'])
+    df['stoch_k'] = stoch['STOCHk_14_3_3']
+    df['stoch_d'] = stoch['STOCHd_14_3_3']
+    
+    # ADX (Trend Strength)
+    adx = ta.adx(df['high'], df['low'], df['close'])
+    df['adx'] = adx['ADX_14']
+    
+    return df
+
+
+def compute_technicals(df, columns=None):
+    """Compute indicator columns over the full frame (columns: only these and what they depend on)"""
+    
+    # The pandas-ta backend always computes every column
+    if get_backend() == 'pandas-ta':
+        return pandas_ta_technicals(df)
+    
+    for col, values in compute_frame(df, columns=columns).items():
+        df[col] = values
+    return df
+
 
-from alpaca.trading.client import TradingClient
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+def score_signals(df, strategy=DEFAULT_STRATEGY):
+    """Score a strategy's rules for every row at once (NumPy arrays)"""
+    return get_strategy(strategy).evaluate(df)
 
 
 class SpineRipAI:
     """AI-powered trading assistant for day trading"""
     
-    def __init__(self, api_key=None, api_secret=None, paper=True):
+    def __init__(self, api_key=None, api_secret=None, paper=True, bar_cache=None):
         """Initialize with Alpaca API credentials"""
         self.api_key = api_key or os.getenv("ALPACA_API_KEY")
         self.api_secret = api_secret or os.getenv("ALPACA_API_SECRET")
         self.paper = paper
+        self.indicator_engine = IndicatorEngine(compute_technicals)
+        self.timeframes = MultiTimeframe(self.indicator_engine)  # 5m/15m/1h bars resampled from the minute bars
+        self.bar_cache = bar_cache
         
         if not self.api_key or not self.api_secret:
             print("⚠️  No Alpaca API credentials found!")
@@ -41,197 +101,129 @@ class SpineRipAI:
             print("  - $100,000 virtual money")
             print("  - Test strategies risk-free")
             print("  - Real-time market data")
+            self.market_generator = SyntheticMarketData()
+            self.demo_data = {}
             self.demo_mode = True
         else:
-            self.trading_client = TradingClient(self.api_key, self.api_secret, paper=paper)
-            self.data_client = StockHistoricalDataClient(self.api_key, self.api_secret)
+            from alpaca_clients import trading_client, data_client
+            self.trading_client = trading_client(self.api_key, self.api_secret, paper)
+            self.data_client = data_client(self.api_key, self.api_secret)
+            self.bar_cache = bar_cache or BarCache()
             self.demo_mode = False
     
     def get_market_data(self, symbol, days=30):
         """Get historical market data for analysis"""
         if self.demo_mode:
-            # Generate demo data
-            dates = pd.date_range(end=datetime.now(), periods=days*390, freq='1min')
-            df = pd.DataFrame({
-                'timestamp': dates,
-                'open': 100 + pd.Series(range(len(dates))).apply(lambda x: x % 20 - 10),
-                'high': 105 + pd.Series(range(len(dates))).apply(lambda x: x % 20 - 5),
-                'low': 95 + pd.Series(range(len(dates))).apply(lambda x: x % 20 - 15),
-                'close': 100 + pd.Series(range(len(dates))).apply(lambda x: x % 20 - 10),
-                'volume': [1000000 + (i % 500000) for i in range(len(dates))]
-            })
-            return df
+            if not HAS_PANDAS:
+                return self.market_generator.generate_records(symbol, days=days)
+            
+            # Generate demo data (extended bar by bar as the clock moves on)
+            bars = days * 390
+            df = self.demo_data.get(symbol)
+            if df is None or len(df) < bars:
+                df = self.market_generator.generate(symbol, days=days)
+            else:
+                df = self.market_generator.extend(symbol, df, keep=max(bars, len(df)))
+            self.demo_data[symbol] = df
+            return df.iloc[-bars:].copy()
         
-        # Real Alpaca data
-        request = StockBarsRequest(
-            symbol_or_symbols=symbol,
-            timeframe=TimeFrame.Minute,
-            start=datetime.now() - timedelta(days=days)
-        )
+        # Real Alpaca data (only bars newer than the local cache are fetched)
+        if self.bar_cache is not None:
+            return self.bar_cache.get_bars(self.data_client, symbol, days=days)
         
+        request = minute_bars_request(symbol, datetime.now() - timedelta(days=days))
         bars = self.data_client.get_stock_bars(request)
         df = bars.df
         df.reset_index(inplace=True)
         return df
     
-    def analyze_technicals(self, df):
-        """Analyze with 15+ technical indicators"""
-        
-        # Trend Indicators
-        df['sma_20'] = ta.sma(df['close'], length=20)
-        df['sma_50'] = ta.sma(df['close'], length=50)
-        df['ema_12'] = ta.ema(df['close'], length=12)
-        df['ema_26'] = ta.ema(df['close'], length=26)
-        
-        # Momentum Indicators
-        df['rsi'] = ta.rsi(df['close'], length=14)
-        macd = ta.macd(df['close'])
-        df['macd'] = macd['MACD_12_26_9']
-        df['macd_signal'] = macd['MACDs_12_26_9']
-        df['macd_hist'] = macd['MACDh_12_26_9']
+    def get_market_data_many(self, symbols, days=30, chunk_size=100):
+        """Get historical market data for many symbols with batched requests"""
+        if self.demo_mode:
+            return {symbol: self.get_market_data(symbol, days=days) for symbol in symbols}
         
-        # Volatility Indicators
-        bbands = ta.bbands(df['close'], length=20)
-        df['bb_upper'] = bbands['BBU_20_2.0']
-        df['bb_middle'] = bbands['BBM_20_2.0']
-        df['bb_lower'] = bbands['BBL_20_2.0']
+        if self.bar_cache is not None:
+            return self.bar_cache.get_bars_many(self.data_client, symbols, days=days, chunk_size=chunk_size)
         
-        # Volume Indicators
-        df['obv'] = ta.obv(df['close'], df['volume'])
+        # One request per chunk of symbols, split back into per-symbol frames
+        frames = {}
+        for i in range(0, len(symbols), chunk_size):
+            request = minute_bars_request(list(symbols[i:i + chunk_size]), datetime.now() - timedelta(days=days))
+            bars = self.data_client.get_stock_bars(request)
+            frames.update(split_bars(bars.df))
         
-        # Stochastic
-        stoch = ta.stoch(df['high'], df['low'], df['close'])
-        df['stoch_k'] = stoch['STOCHk_14_3_3']
-        df['stoch_d'] = stoch['STOCHd_14_3_3']
+        return frames
+    
+    def get_bar_records_many(self, symbols, days=2, chunk_size=100):
+        """{symbol: BAR_DTYPE records}; straight from the bar cache when there is one (screening path)"""
+        if not self.demo_mode and self.bar_cache is not None:
+            return self.bar_cache.get_records_many(self.data_client, symbols, days=days, chunk_size=chunk_size)
+        frames = self.get_market_data_many(symbols, days=days, chunk_size=chunk_size)
+        return {symbol: to_records(df) for symbol, df in frames.items()}
+    
+    def analyze_technicals(self, df, symbol=None, columns=None):
+        """Analyze with 15+ technical indicators (columns: compute only these, e.g. SIGNAL_COLUMNS)"""
         
-        # ADX (Trend Strength)
-        adx = ta.adx(df['high'], df['low'], df['close'])
-        df['adx'] = adx['ADX_14']
+        # With a symbol, only bars newer than the previous call are computed
+        # (the incremental state needs every column, so columns does not apply)
+        if symbol is not None:
+            return self.indicator_engine.update(symbol, df)
         
-        return df
+        return compute_technicals(df, columns=columns)
     
-    def generate_signal(self, df):
+    def generate_signal(self, df, strategy=DEFAULT_STRATEGY):
         """Generate BUY/SELL/HOLD signal with confidence"""
         
-        latest = df.iloc[-1]
-        signals = []
-        confidence = 0
-        
-        # RSI Signals
-        if latest['rsi'] < 30:
-            signals.append("🔵 RSI Oversold (Bullish)")
-            confidence += 20
-        elif latest['rsi'] > 70:
-            signals.append("🔴 RSI Overbought (Bearish)")
-            confidence -= 20
-        
-        # MACD Signals
-        if latest['macd'] > latest['macd_signal']:
-            signals.append("🔵 MACD Bullish Crossover")
-            confidence += 15
-        else:
-            signals.append("🔴 MACD Bearish")
-            confidence -= 15
-        
-        # Moving Average Signals
-        if latest['close'] > latest['sma_20'] > latest['sma_50']:
-            signals.append("🔵 Price Above MAs (Uptrend)")
-            confidence += 15
-        elif latest['close'] < latest['sma_20'] < latest['sma_50']:
-            signals.append("🔴 Price Below MAs (Downtrend)")
-            confidence -= 15
-        
-        # Bollinger Bands
-        if latest['close'] < latest['bb_lower']:
-            signals.append("🔵 Below Lower Band (Oversold)")
-            confidence += 10
-        elif latest['close'] > latest['bb_upper']:
-            signals.append("🔴 Above Upper Band (Overbought)")
-            confidence -= 10
-        
-        # Stochastic
-        if latest['stoch_k'] < 20 and latest['stoch_d'] < 20:
-            signals.append("🔵 Stochastic Oversold")
-            confidence += 10
-        elif latest['stoch_k'] > 80 and latest['stoch_d'] > 80:
-            signals.append("🔴 Stochastic Overbought")
-            confidence -= 10
-        
-        # ADX (Trend Strength)
-        if latest['adx'] > 25:
-            signals.append(f"💪 Strong Trend (ADX: {latest['adx']:.1f})")
-        else:
-            signals.append(f"📊 Weak Trend (ADX: {latest['adx']:.1f})")
-        
-        # Final Signal
-        if confidence >= 30:
-            action = "🟢 STRONG BUY"
-        elif confidence >= 15:
-            action = "🔵 BUY"
-        elif confidence <= -30:
-            action = "🔴 STRONG SELL"
-        elif confidence <= -15:
-            action = "🟠 SELL"
-        else:
-            action = "⚪ HOLD"
+        # Accepts a DataFrame or a BarRing view (structured records, zero-copy)
+        rules = get_strategy(strategy)
+        latest = latest_row(df, rules.columns + ['rsi', 'macd', 'adx'])
+        signal = rules.evaluate_latest(df, latest)
         
         return {
-            'action': action,
-            'confidence': confidence,
-            'signals': signals,
+            'action': signal['action'],
+            'confidence': signal['confidence'],
+            'signals': signal['signals'],
             'price': latest['close'],
             'rsi': latest['rsi'],
             'macd': latest['macd'],
-            'adx': latest['adx']
+            'adx': latest['adx'],
+            'strategy': signal['strategy']
         }
     
+    def timeframe_signals(self, symbol, bars, strategy=DEFAULT_STRATEGY, timeframes=None):
+        """{timeframe: signal} on the strategy's confirming timeframes, resampled from minute bars (no extra requests)"""
+        rules = get_strategy(strategy)
+        timeframes = rules.confirm_timeframes if timeframes is None else timeframes
+        if not timeframes:
+            return {}
+        views = self.timeframes.analyze(symbol, bars, timeframes)
+        return {timeframe: rules.evaluate_latest(view) for timeframe, view in views.items() if len(view)}
+    
+    def evaluate_strategies(self, df, strategies=None):
+        """Latest-bar signal from several strategies (all by default) without recomputing indicators"""
+        return evaluate_strategies(df, strategies)
+    
+    def score_signals(self, df, strategy=DEFAULT_STRATEGY):
+        """Confidence, action and signal flags for every row"""
+        return score_signals(df, strategy)
+    
+    def signal_history(self, df, strategy=DEFAULT_STRATEGY):
+        """Signal for every bar as a DataFrame (for dashboards and reviews)"""
+        import pandas as pd
+        scores = score_signals(df, strategy)
+        history = pd.DataFrame({
+            'close': df['close'].to_numpy(),
+            'confidence': scores['confidence'],
+            'action': scores['action']
+        }, index=df.index)
+        if 'timestamp' in df.columns:
+            history.insert(0, 'timestamp', df['timestamp'].to_numpy())
+        return history
+    
     def explain_strategy(self, strategy_name):
         """Explain trading strategies in simple terms"""
-        
-        strategies = {
-            'scalping': {
-                'name': 'Scalping',
-                'timeframe': '1-5 minutes',
-                'description': 'Quick trades for small profits. Buy low, sell high within minutes.',
-                'indicators': ['Level 2 data', 'Volume', 'Price action'],
-                'risk': 'Medium - Many small trades',
-                'profit_target': '0.1% - 0.5% per trade'
-            },
-            'momentum': {
-                'name': 'Momentum Trading',
-                'timeframe': '15-60 minutes',
-                'description': 'Ride the wave! Buy stocks moving up strongly, sell when momentum slows.',
-                'indicators': ['RSI', 'MACD', 'Volume'],
-                'risk': 'Medium-High - Fast moving stocks',
-                'profit_target': '1% - 3% per trade'
-            },
-            'breakout': {
-                'name': 'Breakout Trading',
-                'timeframe': '30 minutes - 2 hours',
-                'description': 'Wait for stock to break resistance, then ride the move up.',
-                'indicators': ['Support/Resistance', 'Volume', 'Bollinger Bands'],
-                'risk': 'Medium - Wait for confirmation',
-                'profit_target': '2% - 5% per trade'
-            },
-            'reversal': {
-                'name': 'Reversal Trading',
-                'timeframe': '1-4 hours',
-                'description': 'Buy when downtrend ends, sell when uptrend ends. Catch the turn.',
-                'indicators': ['RSI', 'Stochastic', 'Candlestick patterns'],
-                'risk': 'High - Catching falling knives',
-                'profit_target': '3% - 7% per trade'
-            },
-            'gap': {
-                'name': 'Gap Trading',
-                'timeframe': 'Market open (9:30-11:00 AM)',
-                'description': 'Trade stocks that gap up/down at open due to news.',
-                'indicators': ['Pre-market volume', 'News', 'Gap size'],
-                'risk': 'High - Volatile opens',
-                'profit_target': '2% - 10% per trade'
-            }
-        }
-        
-        return strategies.get(strategy_name.lower(), strategies['momentum'])
+        spec = STRATEGIES.get(strategy_name.lower(), STRATEGIES['momentum'])
+        return {key: spec[key] for key in DESCRIPTION_KEYS}
     
     def get_watchlist(self):
         """Get recommended stocks for day trading"""
@@ -270,9 +262,8 @@ def demo():
     
     # Analyze AAPL
     print("📊 Analyzing AAPL...\n")
-    df = ai.get_market_data("AAPL", days=30)
-    df = ai.analyze_technicals(df)
-    signal = ai.generate_signal(df)
+    bars = ai.get_market_data("AAPL", days=30)
+    signal = ai.generate_signal(bars)  # computes the indicators it reads (DataFrame or NumPy records)
     
     print(f"💰 Current Price: ${signal['price']:.2f}")
     print(f"📈 Signal: {signal['action']}")
@@ -6,21 +6,17 @@ Executes trades automatically based on AI signals
 import os
 import sys
 import time
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from trading_ai import SpineRipAI
 from license_manager import check_license_and_prompt
+from rate_limiter import TokenBucket
+from instrumentation import Instrumentation
+from account_snapshot import AccountSnapshot
+from broker_base import FakeAPIError, enum_value
 
-try:
-    from alpaca.trading.client import TradingClient
-    from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest
-    from alpaca.trading.enums import OrderSide, TimeInForce
-except ImportError:
-    print("Installing alpaca-py...")
-    os.system("pip install alpaca-py")
-    from alpaca.trading.client import TradingClient
-    from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest
-    from alpaca.trading.enums import OrderSide, TimeInForce
+# The analysis stack (pandas, numpy) and alpaca-py load when a bot is created,
+# so the demo banner and the --run license check start instantly
 
 
 class SpineRipBot:
@@ -28,6 +24,10 @@ class SpineRipBot:
     
     def __init__(self, api_key=None, api_secret=None, paper=True):
         """Initialize bot with Alpaca credentials"""
+        from trading_ai import SpineRipAI
+        from bot_checkpoint import BotCheckpoint
+        from portfolio_history import PortfolioHistory
+        
         self.ai = SpineRipAI(api_key, api_secret, paper)
         self.api_key = api_key or os.getenv("ALPACA_API_KEY")
         self.api_secret = api_secret or os.getenv("ALPACA_API_SECRET")
@@ -36,37 +36,93 @@ class SpineRipBot:
         self.trades_today = 0
         self.max_trades_per_day = 10
         
+        self.order_executor = None
+        self.broker = None  # sim_broker.SimulatedBroker holding the demo account
         if not self.ai.demo_mode:
-            self.trading_client = TradingClient(self.api_key, self.api_secret, paper=paper)
+            from alpaca_clients import trading_client
+            self.trading_client = trading_client(self.api_key, self.api_secret, paper)  # same pooled client as self.ai
+        else:
+            # Demo orders fill against the bars the bot analyzes, with slippage and submission latency
+            from sim_broker import SimulatedBroker
+            self.broker = SimulatedBroker(cash=10000.00, on_fill=self._on_simulated_fill)
+            self.trading_client = self.broker
         
         # Trading parameters
         self.confidence_threshold = 30  # Minimum confidence to trade
+        self.strategy = 'confluence'  # Rule set from strategy_engine.STRATEGIES
+        self.multi_timeframe = False  # Only trade when the strategy's confirm_timeframes agree
         self.position_size_percent = 10  # Use 10% of account per trade
         self.stop_loss_percent = 2  # 2% stop loss
         self.take_profit_percent = 4  # 4% take profit
+        
+        # Concurrent scanning
+        self.max_workers = 8  # Threads fetching market data
+        self.batch_size = 50  # Symbols per bars request
+        self.screen_batch_size = 500  # Symbols per bars request when screening (a few new bars each)
+        self.indicator_workers = min(4, os.cpu_count() or 1)  # Processes for cold-start indicators
+        self.rate_limiter = TokenBucket(rate=3, capacity=5)  # Data API requests per second
+        self.trade_lock = threading.RLock()  # Serializes orders and trades_today
+        self._batch_indicators = None
+        self.scanner = None  # market_scanner.MarketScanner once screening is used
+        
+        # Stage timers/counters (no-ops until enabled)
+        self.instrumentation = Instrumentation(enabled=False)
+        
+        # Account + positions shared by every decision in a cycle
+        self.snapshot = AccountSnapshot(self._fetch_account_info, self._fetch_positions, ttl=30)
+        
+        # Orders go through a background queue; exits are broker-held bracket legs
+        if not self.ai.demo_mode:
+            from order_executor import OrderExecutor
+            self.order_executor = OrderExecutor(
+                self.trading_client, on_fill=self._on_fill, on_done=self._on_order_done,
+                instrumentation=self.instrumentation
+            )
+        
+        # Warm restarts: trades_today, indicator state and bar history survive a restart
+        self.checkpoint = BotCheckpoint()  # None disables checkpointing
+        self.checkpoint_interval = 300  # Seconds between checkpoints while running
+        self._last_checkpoint = None
+        
+        # Realized round trips for PortfolioTracker's trade statistics (None disables), stored as
+        # sells fill: entries come from buy fills, or the broker's average for positions opened earlier
+        self.portfolio_history = PortfolioHistory.default(self.ai.demo_mode)
+        self.entries = {}  # symbol -> [qty, avg entry price]
+        self.ordered = set()  # symbols this process placed orders for (their fills keep entries current)
+        self._fills_seen = {}  # order id -> (qty, value) of partial fills already booked
+        self.fill_lock = threading.Lock()  # Fills arrive on the executor / simulated broker threads
     
     def get_account_info(self):
-        """Get account balance and buying power"""
-        if self.ai.demo_mode:
-            return {
-                'cash': 10000.00,
-                'buying_power': 40000.00,
-                'portfolio_value': 10000.00
-            }
-        
-        account = self.trading_client.get_account()
+        """Get account balance and buying power (cached snapshot)"""
+        return self.snapshot.account()
+    
+    def get_positions(self):
+        """Get current open positions (cached snapshot)"""
+        return self.snapshot.positions()
+    
+    def get_position(self, symbol):
+        """Get the open position for a symbol, or None"""
+        return self.snapshot.position(symbol)
+    
+    def _fetch_account_info(self):
+        """Get account balance and buying power from Alpaca (demo: the simulated broker)"""
+        with self.instrumentation.timer('account'):
+            account = self.trading_client.get_account()
         return {
             'cash': float(account.cash),
             'buying_power': float(account.buying_power),
             'portfolio_value': float(account.portfolio_value)
         }
     
-    def get_positions(self):
-        """Get current open positions"""
-        if self.ai.demo_mode:
-            return []
-        
-        return self.trading_client.get_all_positions()
+    def _fetch_positions(self):
+        """Get current open positions from Alpaca (demo: the simulated broker)"""
+        with self.instrumentation.timer('positions'):
+            positions = self.trading_client.get_all_positions()
+        with self.fill_lock:
+            for position in positions:
+                if position.symbol not in self.ordered:
+                    self.entries.setdefault(position.symbol, [float(position.qty), float(position.avg_entry_price)])
+        return positions
     
     def calculate_position_size(self, price, account_balance):
         """Calculate how many shares to buy"""
@@ -76,81 +132,130 @@ class SpineRipBot:
     
     def place_buy_order(self, symbol, shares, current_price):
         """Place a buy order with stop loss and take profit"""
-        if self.ai.demo_mode:
-            print(f"📝 DEMO: Would buy {shares} shares of {symbol} at ${current_price:.2f}")
-            return {
-                'order_id': f'demo_{int(time.time())}',
-                'symbol': symbol,
-                'shares': shares,
-                'price': current_price,
-                'status': 'filled'
-            }
-        
-        # Market order to buy
-        market_order = MarketOrderRequest(
-            symbol=symbol,
-            qty=shares,
-            side=OrderSide.BUY,
-            time_in_force=TimeInForce.DAY
-        )
+        self.ordered.add(symbol)
+        if self.broker is not None:
+            return self._place_simulated_buy(symbol, shares, current_price)
         
-        order = self.trading_client.submit_order(market_order)
+        # Market entry with broker-held stop loss and take profit (bracket order)
+        record = self.order_executor.buy_bracket(
+            symbol, shares, current_price, self.stop_loss_percent, self.take_profit_percent
+        )
+        self.snapshot.invalidate()  # cash and positions changed
         
-        # Calculate stop loss and take profit
-        stop_loss_price = current_price * (1 - self.stop_loss_percent / 100)
-        take_profit_price = current_price * (1 + self.take_profit_percent / 100)
+        stop_loss_price = record['request'].stop_loss.stop_price
+        take_profit_price = record['request'].take_profit.limit_price
         
-        print(f"✅ BUY: {shares} shares of {symbol} at ${current_price:.2f}")
+        print(f"📤 BUY: {shares} shares of {symbol} at ${current_price:.2f} (bracket order queued)")
         print(f"   🛑 Stop Loss: ${stop_loss_price:.2f} (-{self.stop_loss_percent}%)")
         print(f"   🎯 Take Profit: ${take_profit_price:.2f} (+{self.take_profit_percent}%)")
         
         return {
-            'order_id': order.id,
+            'order_id': record['client_order_id'],
             'symbol': symbol,
             'shares': shares,
             'price': current_price,
             'stop_loss': stop_loss_price,
             'take_profit': take_profit_price,
-            'status': order.status
+            'status': record['status']
         }
     
     def place_sell_order(self, symbol, shares, current_price):
-        """Place a sell order"""
-        if self.ai.demo_mode:
-            print(f"📝 DEMO: Would sell {shares} shares of {symbol} at ${current_price:.2f}")
-            return {
-                'order_id': f'demo_{int(time.time())}',
-                'symbol': symbol,
-                'shares': shares,
-                'price': current_price,
-                'status': 'filled'
-            }
-        
-        market_order = MarketOrderRequest(
-            symbol=symbol,
-            qty=shares,
-            side=OrderSide.SELL,
-            time_in_force=TimeInForce.DAY
-        )
+        """Place a sell order (the round trip is stored once it fills)"""
+        self.ordered.add(symbol)
+        if self.broker is not None:
+            return self._place_simulated_sell(symbol, shares, current_price)
+        
+        # Cancels the position's bracket legs first so they don't hold the shares
+        record = self.order_executor.sell(symbol, shares)
+        self.snapshot.invalidate()  # cash and positions changed
+        
+        print(f"📤 SELL: {shares} shares of {symbol} at ${current_price:.2f} (queued)")
         
-        order = self.trading_client.submit_order(market_order)
+        return {
+            'order_id': record['client_order_id'],
+            'symbol': symbol,
+            'shares': shares,
+            'price': current_price,
+            'status': record['status']
+        }
+    
+    def _place_simulated_buy(self, symbol, shares, current_price):
+        """Demo: bracket order on the simulated broker (fills on the next bar)"""
+        from sim_broker import order_request
+        
+        stop_loss_price = round(current_price * (1 - self.stop_loss_percent / 100), 2)
+        take_profit_price = round(current_price * (1 + self.take_profit_percent / 100), 2)
+        try:
+            order = self.broker.submit_order(order_request(
+                symbol, shares, 'buy', order_class='bracket', take_profit=take_profit_price, stop_loss=stop_loss_price
+            ))
+        except FakeAPIError as e:
+            print(f"⚠️  DEMO: Buy {shares} {symbol} rejected: {str(e)}")
+            return None
+        self.snapshot.invalidate()
+        
+        print(f"📝 DEMO: BUY {shares} shares of {symbol} at ${current_price:.2f} (simulated bracket order)")
+        print(f"   🛑 Stop Loss: ${stop_loss_price:.2f} (-{self.stop_loss_percent}%)")
+        print(f"   🎯 Take Profit: ${take_profit_price:.2f} (+{self.take_profit_percent}%)")
+        
+        return {
+            'order_id': order.client_order_id,
+            'symbol': symbol,
+            'shares': shares,
+            'price': current_price,
+            'stop_loss': stop_loss_price,
+            'take_profit': take_profit_price,
+            'status': order.status
+        }
+    
+    def _place_simulated_sell(self, symbol, shares, current_price):
+        """Demo: market sell of the whole position (its exit legs are cancelled first)"""
+        try:
+            order = self.broker.close_position(symbol)
+        except FakeAPIError as e:
+            print(f"⚠️  DEMO: Sell {shares} {symbol} rejected: {str(e)}")
+            return None
+        self.snapshot.invalidate()
         
-        print(f"✅ SELL: {shares} shares of {symbol} at ${current_price:.2f}")
+        print(f"📝 DEMO: SELL {shares} shares of {symbol} at ${current_price:.2f} (simulated market order)")
         
         return {
-            'order_id': order.id,
+            'order_id': order.client_order_id,
             'symbol': symbol,
             'shares': shares,
             'price': current_price,
             'status': order.status
         }
     
+    def _protected_symbols(self):
+        """Symbols with a resting sell order at the broker (bracket/OCO exits), or None if unknown"""
+        try:
+            if self.broker is not None:
+                orders = self.broker.get_orders()
+            else:
+                from alpaca.trading.requests import GetOrdersRequest
+                from alpaca.trading.enums import QueryOrderStatus
+                orders = self.trading_client.get_orders(GetOrdersRequest(status=QueryOrderStatus.OPEN))
+        except Exception as e:
+            print(f"⚠️  Could not list open orders: {str(e)}")
+            return None
+        return {order.symbol for order in orders if str(enum_value(order.side)) == 'sell'}
+    
     def check_positions(self):
-        """Monitor positions and check stop loss/take profit"""
+        """Fallback stop loss/take profit for positions the broker holds no exit orders for"""
+        # Bracket legs enforce the same thresholds at the broker; selling those positions here as well
+        # would race the legs for the shares
         positions = self.get_positions()
+        if not positions:
+            return
+        protected = self._protected_symbols()
+        if protected is None:
+            return
         
         for position in positions:
             symbol = position.symbol
+            if symbol in protected:
+                continue
             current_price = float(position.current_price)
             avg_entry_price = float(position.avg_entry_price)
             qty = int(position.qty)
@@ -170,43 +275,77 @@ class SpineRipBot:
                 self.place_sell_order(symbol, qty, current_price)
                 continue
     
-    def analyze_and_trade(self, symbol):
-        """Analyze symbol and execute trade if signal is strong"""
+    def analyze_symbol(self, symbol, df=None):
+        """Analyze symbol and return its signal"""
         
         # Get market data and analyze
-        df = self.ai.get_market_data(symbol, days=30)
-        df = self.ai.analyze_technicals(df)
-        signal = self.ai.generate_signal(df)
+        timer = self.instrumentation.timer
+        if df is None:
+            with timer('fetch', symbol):
+                df = self.ai.get_market_data(symbol, days=30)
+        if self.broker is not None:
+            self.broker.update_frame(symbol, df)  # demo orders fill against the new bars
+        with timer('indicators', symbol):
+            df = self.ai.analyze_technicals(df, symbol=symbol)
+        with timer('signal', symbol):
+            signal = self.ai.generate_signal(df, strategy=self.strategy)
+        if self.multi_timeframe:
+            with timer('timeframes', symbol):
+                self.confirm_signal(symbol, df, signal)
+        return signal
+    
+    def confirm_signal(self, symbol, bars, signal):
+        """Attach the higher-timeframe confidences and whether they agree with the signal"""
+        from multi_timeframe import confirms
+        from strategy_engine import get_strategy
+        
+        timeframes = self.ai.timeframe_signals(symbol, bars, strategy=self.strategy)
+        signal['timeframes'] = {timeframe: higher['confidence'] for timeframe, higher in timeframes.items()}
+        required = get_strategy(self.strategy).confirm_timeframes
+        signal['confirmed'] = confirms(signal['confidence'], signal['timeframes'], required)
+        return signal
+    
+    def execute_signal(self, symbol, signal):
+        """Execute trade if signal is strong (serialized across workers)"""
         
         # Check if we should trade
         if abs(signal['confidence']) < self.confidence_threshold:
             print(f"⚪ {symbol}: {signal['action']} (Confidence: {signal['confidence']}) - SKIPPING")
             return None
         
-        # Get account info
-        account = self.get_account_info()
+        if not signal.get('confirmed', True):
+            higher = ', '.join(f"{timeframe} {confidence:+d}" for timeframe, confidence in signal['timeframes'].items())
+            print(f"⏸️  {symbol}: {signal['action']} (Confidence: {signal['confidence']}) not confirmed "
+                  f"[{higher or 'no higher-timeframe bars yet'}] - SKIPPING")
+            return None
         
-        # Strong buy signal
-        if signal['confidence'] >= self.confidence_threshold:
-            if self.trades_today >= self.max_trades_per_day:
-                print(f"⚠️  Max trades reached today ({self.max_trades_per_day})")
-                return None
-            
-            shares = self.calculate_position_size(signal['price'], account['cash'])
+        with self.trade_lock:
+            # Get account info
+            account = self.get_account_info()
             
-            print(f"\n🟢 {symbol}: {signal['action']} (Confidence: {signal['confidence']})")
-            print(f"   💰 Price: ${signal['price']:.2f}")
-            print(f"   📊 RSI: {signal['rsi']:.1f}, MACD: {signal['macd']:.2f}, ADX: {signal['adx']:.1f}")
+            # Strong buy signal
+            if signal['confidence'] >= self.confidence_threshold:
+                if self.trades_today >= self.max_trades_per_day:
+                    print(f"⚠️  Max trades reached today ({self.max_trades_per_day})")
+                    return None
+                
+                shares = self.calculate_position_size(signal['price'], account['cash'])
+                
+                print(f"\n🟢 {symbol}: {signal['action']} (Confidence: {signal['confidence']})")
+                print(f"   💰 Price: ${signal['price']:.2f}")
+                print(f"   📊 RSI: {signal['rsi']:.1f}, MACD: {signal['macd']:.2f}, ADX: {signal['adx']:.1f}")
+                
+                # Counted when placed so concurrent signals respect the limit; a live order that ends
+                # without a fill hands its trade back (_on_order_done), a rejected simulated one never takes it
+                order = self.place_buy_order(symbol, shares, signal['price'])
+                if order is not None:
+                    self.trades_today += 1
+                return order
             
-            order = self.place_buy_order(symbol, shares, signal['price'])
-            self.trades_today += 1
-            return order
-        
-        # Strong sell signal - only if we have position
-        elif signal['confidence'] <= -self.confidence_threshold:
-            positions = self.get_positions()
-            for position in positions:
-                if position.symbol == symbol:
+            # Strong sell signal - only if we have position
+            elif signal['confidence'] <= -self.confidence_threshold:
+                position = self.get_position(symbol)
+                if position is not None:
                     shares = int(position.qty)
                     print(f"\n🔴 {symbol}: {signal['action']} (Confidence: {signal['confidence']})")
                     order = self.place_sell_order(symbol, shares, signal['price'])
@@ -214,18 +353,211 @@ class SpineRipBot:
         
         return None
     
-    def run(self, watchlist=None, scan_interval=60):
-        """Run bot continuously"""
+    def analyze_and_trade(self, symbol):
+        """Analyze symbol and execute trade if signal is strong"""
+        signal = self.analyze_symbol(symbol)
+        return self.execute_signal(symbol, signal)
+    
+    def _fetch_market_data(self, symbols, days=30, records=False):
+        """Fetch a batch of symbols' bars within the shared request budget"""
+        with self.instrumentation.timer('rate_limit_wait'):
+            self.rate_limiter.acquire()
+        with self.instrumentation.timer('fetch'):
+            if records:
+                return self.ai.get_bar_records_many(symbols, days=days, chunk_size=len(symbols))
+            return self.ai.get_market_data_many(symbols, days=days, chunk_size=len(symbols))
+    
+    def fetch_frames(self, symbols, days=30, batch_size=None, records=False):
+        """Bars for many symbols (records: BAR_DTYPE arrays instead of DataFrames), batched on a thread pool"""
+        frames = {}
+        batch_size = batch_size or self.batch_size
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._fetch_market_data, batch, days, records): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    frames.update(future.result())
+                except Exception as e:
+                    self.instrumentation.count('errors')
+                    print(f"❌ Error fetching {', '.join(batch[:5])}{' ...' if len(batch) > 5 else ''}: {str(e)}")
+        return frames
+    
+    def screen_universe(self):
+        """Rank the whole universe on cheap prefilters; the top candidates become this cycle's watchlist"""
+        if self.scanner is None:
+            from market_scanner import MarketScanner
+            self.scanner = MarketScanner(self.ai)
         
-        if watchlist is None:
+        with self.instrumentation.timer('screen'):
+            candidates = self.scanner.scan(
+                fetch=lambda symbols, days: self.fetch_frames(
+                    symbols, days, batch_size=self.screen_batch_size, records=True
+                )
+            )
+        self.scanner.report()
+        return candidates
+    
+    def _get_batch_indicators(self):
+        """Lazily create the batch indicator engine (and its process pool)"""
+        if self._batch_indicators is None:
+            from batch_indicators import BatchIndicators
+            self._batch_indicators = BatchIndicators(workers=self.indicator_workers)
+        return self._batch_indicators
+    
+    def shutdown(self):
+        """Stop worker processes and flush queued orders"""
+        if self._batch_indicators is not None:
+            self._batch_indicators.shutdown()
+            self._batch_indicators = None
+        if self.order_executor is not None:
+            self.order_executor.stop()
+    
+    def restore_checkpoint(self, store=None):
+        """Reload the last checkpoint (store: a BarStreamer's bar rings)"""
+        if self.checkpoint is None:
+            return None
+        
+        started = time.perf_counter()
+        try:
+            restored = self.checkpoint.restore(self, store)
+        except Exception as e:
+            print(f"❌ Error restoring checkpoint (starting cold): {str(e)}")
+            return None
+        if restored is None:
+            return None
+        
+        elapsed = time.perf_counter() - started
+        self.instrumentation.observe('checkpoint_restore', elapsed)
+        print(f"♻️  Restored checkpoint in {elapsed:.2f}s: {restored['indicators']} indicator states, "
+              f"{restored['rings']} bar buffers, {restored['trades_today']} trades today")
+        return restored
+    
+    def save_checkpoint(self, store=None, force=True):
+        """Write a checkpoint (force=False: only once checkpoint_interval has passed)"""
+        if self.checkpoint is None:
+            return None
+        now = time.monotonic()
+        if not force and self._last_checkpoint is not None and now - self._last_checkpoint < self.checkpoint_interval:
+            return None
+        
+        try:
+            with self.instrumentation.timer('checkpoint_save'):
+                state = self.checkpoint.save(self, store)
+        except Exception as e:
+            self.instrumentation.count('errors')
+            print(f"❌ Error saving checkpoint: {str(e)}")
+            return None
+        self._last_checkpoint = now
+        return state
+    
+    def _on_fill(self, record, order):
+        """Order executor callback: report the fill, book it and refresh account state"""
+        self.snapshot.invalidate()
+        side = str(enum_value(order.side)).upper()
+        print(f"✅ FILLED: {side} {float(order.filled_qty):g} {record['symbol']} @ ${float(order.filled_avg_price):.2f}")
+        self._book_fill(record['symbol'], side, order)
+    
+    def _on_order_done(self, record):
+        """Order executor callback: a buy that ended unfilled (rejected, canceled, failed) frees its trade"""
+        if record['side'] != 'buy' or record['filled_qty'] > 0:
+            return
+        with self.trade_lock:
+            self.trades_today = max(self.trades_today - 1, 0)
+        print(f"↩️  BUY {record['symbol']} ended {record['status']} without a fill - trade not counted")
+    
+    def _book_fill(self, symbol, side, order):
+        """Apply the newly filled part of an order to the entries; sells store a realized round trip"""
+        # Fills report cumulative qty and average price, so partial fills are booked by difference
+        filled = float(order.filled_qty or 0)
+        value = filled * float(order.filled_avg_price or 0)
+        with self.fill_lock:
+            seen_qty, seen_value = self._fills_seen.pop(order.id, (0.0, 0.0))
+            if str(enum_value(order.status)) != 'filled':
+                self._fills_seen[order.id] = (filled, value)
+            qty = filled - seen_qty
+            if qty <= 0:
+                return
+            price = (value - seen_value) / qty
+            
+            held = self.entries.get(symbol, [0.0, 0.0])
+            if side == 'BUY':
+                total = held[0] + qty
+                self.entries[symbol] = [total, (held[0] * held[1] + qty * price) / total]
+                return
+            
+            if held[0] - qty > 0:
+                self.entries[symbol] = [held[0] - qty, held[1]]
+            else:
+                self.entries.pop(symbol, None)
+            
+            # Under the lock: fills from two threads would otherwise interleave their appends
+            if not held[0]:
+                print(f"⚠️  No entry price for {symbol} - realized trade not stored")
+            elif self.portfolio_history is not None:
+                self.portfolio_history.record_trade(symbol, qty, held[1], price)
+    
+    def _on_simulated_fill(self, order):
+        """Simulated broker callback: reported like a live fill"""
+        self._on_fill({'symbol': order.symbol}, order)
+    
+    def scan_watchlist(self, watchlist):
+        """Fetch and analyze the watchlist concurrently, then trade one symbol at a time"""
+        
+        # I/O: batched bar requests on a thread pool, paced by the token bucket
+        frames = self.fetch_frames(watchlist)
+        
+        # CPU: symbols without reusable indicator state are computed together as one 2-D batch
+        # (a lone cold symbol is cheaper through analyze_technicals)
+        engine = self.ai.indicator_engine
+        cold = {symbol: df for symbol, df in frames.items() if engine.needs_full_pass(symbol, df)}
+        if len(cold) > 1:
+            started = time.perf_counter()
+            try:
+                analyzed, carries = self._get_batch_indicators().analyze(cold)
+                for symbol, df in analyzed.items():
+                    frames[symbol] = engine.adopt(symbol, df, carries[symbol])
+            except Exception as e:
+                self.instrumentation.count('errors')
+                print(f"❌ Error in batch indicators (falling back per symbol): {str(e)}")
+            self.instrumentation.observe('indicators_batch', time.perf_counter() - started)
+        
+        # Signals and orders, in watchlist order
+        orders = []
+        for symbol in watchlist:
+            if symbol not in frames:
+                continue
+            try:
+                signal = self.analyze_symbol(symbol, frames[symbol])
+                with self.instrumentation.timer('execute', symbol):
+                    order = self.execute_signal(symbol, signal)
+                if order:
+                    orders.append(order)
+            except Exception as e:
+                self.instrumentation.count('errors', symbol=symbol)
+                print(f"❌ Error analyzing {symbol}: {str(e)}")
+        
+        return orders
+    
+    def run(self, watchlist=None, scan_interval=60, screen=False):
+        """Run bot continuously (screen: pick each cycle's watchlist from the whole universe)"""
+        
+        if watchlist is None and not screen:
             all_lists = self.ai.get_watchlist()
             watchlist = all_lists['High Volume']  # Default to high volume stocks
         
         print("\n" + "="*60)
         print("🤖 SPINERIP TRADING BOT STARTED")
         print("="*60 + "\n")
-        print(f"📋 Watchlist: {', '.join(watchlist)}")
+        if screen:
+            print("📋 Watchlist: top screener candidates each cycle")
+        else:
+            print(f"📋 Watchlist: {', '.join(watchlist)}")
         print(f"⏱️  Scan Interval: {scan_interval} seconds")
+        print(f"🧠 Strategy: {self.strategy}")
+        if self.multi_timeframe:
+            from strategy_engine import get_strategy
+            print(f"🕰️  Confirming on: {', '.join(get_strategy(self.strategy).confirm_timeframes) or 'none'}")
         print(f"🎯 Confidence Threshold: {self.confidence_threshold}")
         print(f"💰 Position Size: {self.position_size_percent}% of account")
         print(f"🛑 Stop Loss: {self.stop_loss_percent}%")
@@ -238,6 +570,8 @@ class SpineRipBot:
         print(f"💪 Buying Power: ${account['buying_power']:,.2f}")
         print(f"📈 Portfolio Value: ${account['portfolio_value']:,.2f}")
         
+        self.restore_checkpoint()
+        
         print("\n" + "="*60)
         print("🔄 Starting market scan...")
         print("="*60 + "\n")
@@ -250,16 +584,18 @@ class SpineRipBot:
                 cycle += 1
                 print(f"\n--- Scan Cycle {cycle} ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ---")
                 
-                # Check existing positions
-                self.check_positions()
+                # Fresh account/positions snapshot for this cycle
+                self.snapshot.invalidate()
                 
-                # Scan watchlist
-                for symbol in watchlist:
-                    try:
-                        self.analyze_and_trade(symbol)
-                        time.sleep(1)  # Rate limiting
-                    except Exception as e:
-                        print(f"❌ Error analyzing {symbol}: {str(e)}")
+                with self.instrumentation.profile_cycle(), self.instrumentation.timer('cycle'):
+                    # Check existing positions
+                    with self.instrumentation.timer('check_positions'):
+                        self.check_positions()
+                    
+                    # Scan watchlist (concurrent fetch, rate limited)
+                    self.scan_watchlist(self.screen_universe() if screen else watchlist)
+                self.instrumentation.count('cycles')
+                self.save_checkpoint(force=False)
                 
                 # Show summary
                 account = self.get_account_info()
@@ -279,6 +615,81 @@ class SpineRipBot:
             print(f"\n\n❌ Bot error: {str(e)}")
             self.running = False
         
+        self.save_checkpoint()
+        self.shutdown()
+        self.report_metrics()
+        
+        print("\n" + "="*60)
+        print("🛑 BOT STOPPED")
+        print("="*60 + "\n")
+    
+    def report_metrics(self, basename="bot_metrics"):
+        """Print stage timings and export them as JSON and Prometheus text"""
+        if not self.instrumentation.enabled:
+            return None
+        
+        print("\n⏱️  STAGE TIMINGS")
+        print("-" * 60)
+        for line in self.instrumentation.summary():
+            print(line)
+        
+        if self.instrumentation.last_profile:
+            print("\n🔬 PROFILED CYCLE")
+            print(self.instrumentation.last_profile)
+        
+        base = os.path.join(os.path.dirname(__file__), basename)
+        self.instrumentation.to_json(base + ".json")
+        with open(base + ".prom", 'w') as f:
+            f.write(self.instrumentation.to_prometheus())
+        print(f"✅ Metrics exported to: {base}.json / {base}.prom")
+        return base
+    
+    def run_streaming(self, watchlist=None, stream=None, coalesce=None):
+        """Run bot on live bars, analyzing each symbol as its new bar arrives"""
+        # coalesce (default: live streams only) folds bars that arrive during an analysis into one decision
+        import pandas as pd
+        from bar_stream import BarStreamer, ReplayStream, create_stream
+        
+        if watchlist is None:
+            all_lists = self.ai.get_watchlist()
+            watchlist = all_lists['High Volume']  # Default to high volume stocks
+        
+        if stream is None:
+            if self.ai.demo_mode:
+                # Replay the next session of generated bars in place of the websocket
+                frames = {}
+                for symbol in watchlist:
+                    history = self.ai.get_market_data(symbol, days=30)
+                    future = pd.Timestamp(history['timestamp'].iloc[-1]) + pd.Timedelta(days=4)
+                    bars = self.ai.market_generator.extend(symbol, history, end=future)
+                    frames[symbol] = bars.iloc[len(history):len(history) + 390]
+                stream = ReplayStream(frames)
+            else:
+                stream = create_stream(self.api_key, self.api_secret)
+        
+        print("\n" + "="*60)
+        print("📡 SPINERIP TRADING BOT STREAMING")
+        print("="*60 + "\n")
+        print(f"📋 Watchlist: {', '.join(watchlist)}")
+        print(f"🧠 Strategy: {self.strategy}")
+        print(f"🎯 Confidence Threshold: {self.confidence_threshold}")
+        
+        if coalesce is None:
+            coalesce = not isinstance(stream, ReplayStream)  # replays decide on every bar
+        streamer = BarStreamer(self, watchlist, stream, coalesce=coalesce)
+        self.restore_checkpoint(streamer.store)
+        
+        self.running = True
+        try:
+            streamer.run()
+        except Exception as e:
+            print(f"\n\n❌ Bot error: {str(e)}")
+        self.running = False
+        
+        self.save_checkpoint(streamer.store)
+        self.shutdown()
+        self.report_metrics()
+        
         print("\n" + "="*60)
         print("🛑 BOT STOPPED")
         print("="*60 + "\n")
@@ -334,7 +745,11 @@ def demo():
     print("🚀 QUICK START")
     print("="*70 + "\n")
     
-    # Demo bot
+    # Demo bot (its indicator state and checkpoints use pandas; python trading_ai.py runs without it)
+    from trading_ai import HAS_PANDAS
+    if not HAS_PANDAS:
+        print("❌ The bot demo needs pandas: pip install pandas")
+        return
     bot = SpineRipBot()
     
     print("Running 3 demo scan cycles...\n")
@@ -372,7 +787,19 @@ if __name__ == "__main__":
         
         print("\n🚀 License verified! Starting bot...\n")
         bot = SpineRipBot()
-        bot.run(scan_interval=60)
+        if "--metrics" in sys.argv:
+            bot.instrumentation.enable()
+        if "--profile" in sys.argv:
+            bot.instrumentation.enable()
+            bot.instrumentation.profile_next_cycle(os.path.join(os.path.dirname(__file__), "bot_cycle.prof"))
+        if "--confirm" in sys.argv:
+            bot.multi_timeframe = True
+        if "--fresh" in sys.argv:
+            bot.checkpoint.clear()
+        if "--stream" in sys.argv:
+            bot.run_streaming()
+        else:
+            bot.run(scan_interval=60, screen="--screen" in sys.argv)
     else:
         # Demo mode
         demo()